@@ -0,0 +1,269 @@
+"""
+Benchmarks for ThumbnailChoiceBlock and ThumbnailRadioSelect.
+
+Generates synthetic thumbnail directory trees and choice sets, times the hot
+paths of the block and widget, and writes the results as JSON so that runs can
+be compared to spot regressions.
+
+Usage (from the repository root):
+
+    python benchmarks/run.py
+    python benchmarks/run.py --sizes 100,1000 --depths 0,2 --repeat 5
+    python benchmarks/run.py --output benchmark-results.json
+
+Cold timings clear the relevant class-level caches before every run; warm
+timings prime them once and then measure the cached path.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_settings")
+
+import django
+
+django.setup()
+
+import wagtail
+from django.test.utils import override_settings
+from wagtail import blocks
+from wagtail.blocks import BlockWidget
+
+from wagtail_thumbnail_choice_block import (
+    ThumbnailChoiceBlock,
+    ThumbnailRadioSelect,
+)
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 16 16"><path d="M0 0h16v16H0z"/></svg>'
+FILES_PER_DIR = 50
+FANOUT = 4
+STREAM_CHILDREN = 50
+
+
+def make_tree(root, files, depth):
+    """
+    Write `files` SVGs under `root`, spread over directories `depth` levels
+    deep with FILES_PER_DIR files per leaf directory. Depth 0 is a flat
+    directory.
+    """
+    for i in range(files):
+        directory = root
+        leaf = i // FILES_PER_DIR
+        for level in range(depth):
+            directory = directory / f"group-{(leaf // FANOUT**level) % FANOUT}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"icon-{i}.svg").write_text(SVG)
+
+
+def clear_caches():
+    ThumbnailChoiceBlock._scan_cache.clear()
+    ThumbnailChoiceBlock._callable_cache.clear()
+    ThumbnailRadioSelect._render_cache.clear()
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn `repeat` times (calling setup before each run, untimed)."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+        "runs": repeat,
+    }
+
+
+def measure_peak_memory(fn, setup=None):
+    """Return the peak memory allocated by one run of fn, in bytes."""
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_directory(results, files, depth, repeat):
+    tmp_dir = Path(tempfile.mkdtemp())
+    try:
+        make_tree(tmp_dir / "icons", files, depth)
+        params = {"files": files, "depth": depth}
+
+        with override_settings(STATICFILES_DIRS=[str(tmp_dir)]):
+            clear_caches()
+            block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+            value = block._choices_source[-1][0]
+
+            def record(name, timing):
+                results.append({"benchmark": name, **params, **timing})
+                print(
+                    f"{name:<32} files={files:<6} depth={depth} "
+                    f"median={timing['median'] * 1000:.2f}ms",
+                    file=sys.stderr,
+                )
+
+            record(
+                "find_static_directory",
+                measure(lambda: block._find_static_directory("icons"), repeat),
+            )
+            record("scan_directory", measure(block._scan_directory, repeat))
+            record(
+                "block_init_cold",
+                measure(
+                    lambda: ThumbnailChoiceBlock(thumbnail_directory="icons"),
+                    repeat,
+                    setup=clear_caches,
+                ),
+            )
+            record(
+                "block_init_warm",
+                measure(
+                    lambda: ThumbnailChoiceBlock(thumbnail_directory="icons"), repeat
+                ),
+            )
+            record("get_field", measure(block.get_field, repeat))
+            record(
+                "get_form_state", measure(lambda: block.get_form_state(value), repeat)
+            )
+            bench_render(record, block, value, repeat)
+            bench_stream(record, block, value, repeat)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_choices(results, size, repeat):
+    choices = [(f"icon-{i}", f"Icon {i}") for i in range(size)]
+    thumbnails = {value: f"/static/icons/{value}.svg" for value, _label in choices}
+    params = {"choices": size}
+
+    def record(name, timing):
+        results.append({"benchmark": name, **params, **timing})
+        print(
+            f"{name:<32} choices={size:<6} median={timing['median'] * 1000:.2f}ms",
+            file=sys.stderr,
+        )
+
+    clear_caches()
+    block = ThumbnailChoiceBlock(choices=lambda: choices, thumbnails=lambda: thumbnails)
+    value = choices[-1][0]
+
+    record("choices_get_field", measure(block.get_field, repeat))
+    record(
+        "choices_get_form_state", measure(lambda: block.get_form_state(value), repeat)
+    )
+    record("choices_clean", measure(lambda: block.clean(value), repeat))
+    bench_render(record, block, value, repeat, prefix="choices_")
+    bench_stream(record, block, value, repeat, prefix="choices_")
+
+
+def bench_render(record, block, value, repeat, prefix=""):
+    widget = block.field.widget
+
+    def render():
+        widget.render("icon", value, attrs={"id": "icon"})
+
+    record(
+        f"{prefix}widget_render_cold",
+        measure(render, repeat, setup=ThumbnailRadioSelect._render_cache.clear),
+    )
+    render()
+    record(f"{prefix}widget_render_warm", measure(render, repeat))
+
+    # The streaming renderer (the default) against the template it replaces.
+    # Peak memory is recorded in bytes, alongside the timing.
+    for mode, streaming in (("stream", True), ("template", False)):
+        widget.streaming_render = streaming
+        timing = measure(render, repeat, setup=ThumbnailRadioSelect._render_cache.clear)
+        timing["peak_memory"] = measure_peak_memory(
+            render, setup=ThumbnailRadioSelect._render_cache.clear
+        )
+        record(f"{prefix}widget_render_{mode}", timing)
+    del widget.streaming_render
+
+
+def bench_stream(record, block, value, repeat, prefix=""):
+    """Render a StreamField admin form with STREAM_CHILDREN occurrences of the block."""
+    stream_block = blocks.StreamBlock([("icon", block)])
+    stream_value = stream_block.to_python(
+        [{"type": "icon", "value": value}] * STREAM_CHILDREN
+    )
+
+    def render():
+        return BlockWidget(stream_block).render_with_errors("body", stream_value)
+
+    timing = measure(render, repeat, setup=ThumbnailRadioSelect._render_cache.clear)
+    # Size of the rendered form, including the Telepath block definitions
+    timing["bytes"] = len(render().encode())
+    record(f"{prefix}streamfield_render_cold", timing)
+    record(f"{prefix}streamfield_render_warm", measure(render, repeat))
+
+
+def parse_ints(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=parse_ints,
+        default=[100, 1000, 10000, 50000],
+        help="comma-separated file/choice counts",
+    )
+    parser.add_argument(
+        "--depths",
+        type=parse_ints,
+        default=[0, 2, 4],
+        help="comma-separated directory depths",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing")
+    parser.add_argument(
+        "--output", help="write JSON results to this file (default: stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for depth in args.depths:
+            bench_directory(results, size, depth, args.repeat)
+        bench_choices(results, size, args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "wagtail": wagtail.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
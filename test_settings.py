@@ -27,6 +27,14 @@ INSTALLED_APPS = [
     "wagtail_thumbnail_choice_block",
 ]
 
+# The debug toolbar panel is optional; its tests are skipped without it.
+try:
+    import debug_toolbar  # noqa: F401
+except ImportError:
+    pass
+else:
+    INSTALLED_APPS.append("debug_toolbar")
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
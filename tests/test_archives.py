@@ -0,0 +1,134 @@
+"""
+Tests for zip archive icon packs.
+"""
+
+import json
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.archives import ZipArchiveStorage, get_archive
+
+
+def make_archive(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("icons/", "")
+        archive.writestr("icons/sun.svg", "<svg>sun</svg>" * 20, zipfile.ZIP_DEFLATED)
+        archive.writestr("icons/arrows/left.svg", "<svg>left</svg>")
+        archive.writestr("icons/readme.txt", "Icons")
+
+
+# Built at import time, like a block declared in a models.py, while
+# test_settings' ROOT_URLCONF has no URLs to reverse
+IMPORT_TIME_DIR = Path(tempfile.mkdtemp())
+make_archive(IMPORT_TIME_DIR / "icons.zip")
+IMPORT_TIME_BLOCK = ThumbnailChoiceBlock(
+    thumbnail_directory="icons",
+    thumbnail_directory_storage=ZipArchiveStorage(
+        IMPORT_TIME_DIR / "icons.zip", "import-time-icons"
+    ),
+)
+
+
+def tearDownModule():
+    shutil.rmtree(IMPORT_TIME_DIR, ignore_errors=True)
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class TestZipArchiveStorage(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        make_archive(self.tmp_dir / "icons.zip")
+        self.storage = ZipArchiveStorage(self.tmp_dir / "icons.zip", "test-icons")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def test_listdir(self):
+        assert self.storage.listdir("") == (["icons"], [])
+        assert self.storage.listdir("icons/") == (
+            ["arrows"],
+            ["readme.txt", "sun.svg"],
+        )
+        with self.assertRaises(FileNotFoundError):
+            self.storage.listdir("missing")
+
+    def test_read(self):
+        assert self.storage.read("icons/sun.svg") == b"<svg>sun</svg>" * 20
+        with self.storage.open("icons/arrows/left.svg") as f:
+            assert f.read() == b"<svg>left</svg>"
+        assert self.storage.size("icons/arrows/left.svg") == 15
+        assert self.storage.exists("icons/arrows")
+        assert not self.storage.exists("icons/moon.svg")
+
+    def test_url_changes_with_contents(self):
+        url = self.storage.url("icons/sun.svg")
+        with zipfile.ZipFile(self.tmp_dir / "icons-2.zip", "w") as archive:
+            archive.writestr("icons/sun.svg", "<svg>new sun</svg>")
+        storage = ZipArchiveStorage(self.tmp_dir / "icons-2.zip", "test-icons-2")
+
+        assert url.startswith(
+            "/admin/thumbnail-choice/archives/test-icons/icons/sun.svg?v="
+        )
+        assert url.split("?")[1] != storage.url("icons/sun.svg").split("?")[1]
+
+    def test_base_url(self):
+        storage = ZipArchiveStorage(
+            self.tmp_dir / "icons.zip", "test-icons", base_url="/icon-packs/icons/"
+        )
+
+        assert storage.url("icons/sun.svg").startswith(
+            "/icon-packs/icons/icons/sun.svg?v="
+        )
+
+    def test_registered_by_name(self):
+        assert get_archive("test-icons") is self.storage
+
+    def test_block_scans_archive(self):
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_storage=self.storage
+        )
+
+        assert block._choices_source == [("arrows/left", "Left"), ("sun", "Sun")]
+        assert block.get_thumbnail_url("sun") == self.storage.url("icons/sun.svg")
+
+    def test_block_built_before_urlconf(self):
+        assert IMPORT_TIME_BLOCK.get_thumbnail_url("sun").startswith(
+            "/admin/thumbnail-choice/archives/import-time-icons/icons/sun.svg?v="
+        )
+        state = IMPORT_TIME_BLOCK.field.widget.get_js_state()
+        assert json.dumps(state)
+        assert state["urlPrefix"] == (
+            "/admin/thumbnail-choice/archives/import-time-icons/icons/"
+        )
+
+    def test_view(self):
+        response = self.client.get(self.storage.url("icons/sun.svg"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/svg+xml"
+        assert response.content == b"<svg>sun</svg>" * 20
+        assert response["ETag"] == self.storage.etag("icons/sun.svg")
+        assert "max-age=31536000" in response["Cache-Control"]
+        assert "immutable" in response["Cache-Control"]
+
+        response = self.client.get(
+            "/admin/thumbnail-choice/archives/test-icons/icons/sun.svg",
+            HTTP_IF_NONE_MATCH=self.storage.etag("icons/sun.svg"),
+        )
+        assert response.status_code == 304
+
+    def test_view_not_found(self):
+        response = self.client.get(
+            "/admin/thumbnail-choice/archives/test-icons/icons/moon.svg"
+        )
+        assert response.status_code == 404
+
+        response = self.client.get("/admin/thumbnail-choice/archives/missing/a.svg")
+        assert response.status_code == 404
@@ -2,6 +2,8 @@
 Tests for ThumbnailChoiceBlock.
 """
 
+import json
+import posixpath
 import re
 import shutil
 import tempfile
@@ -33,6 +35,12 @@ class TestThumbnailChoiceBlock(TestCase):
         assert block._thumbnail_size == 40  # Default size
         assert block._thumbnail_is_one_color is False
 
+    def test_class_docstring(self):
+        """Test that the class docstring isn't shadowed by class attributes."""
+        assert ThumbnailChoiceBlock.__doc__.strip().startswith(
+            "A Wagtail ChoiceBlock that displays thumbnail images"
+        )
+
     def test_block_initialization_with_one_color_thumbnails(self):
         """Test that block stores the one-color thumbnail flag."""
         block = ThumbnailChoiceBlock(
@@ -534,6 +542,211 @@ class TestThumbnailChoiceBlock(TestCase):
         assert block.get_thumbnail_url("moon") == ""
 
 
+class TestThumbnailChoiceBlockCallableCache(TestCase):
+    """Tests for memoizing callable sources with callable_cache_timeout."""
+
+    def setUp(self):
+        ThumbnailChoiceBlock._callable_cache.clear()
+        self.calls = []
+
+    def tearDown(self):
+        ThumbnailChoiceBlock._callable_cache.clear()
+
+    def get_choices(self):
+        self.calls.append("choices")
+        return [("a", "Option A"), ("b", "Option B")]
+
+    def get_thumbnails(self):
+        self.calls.append("thumbnails")
+        return {"a": "/test/a.png"}
+
+    def test_callables_run_every_time_without_timeout(self):
+        block = ThumbnailChoiceBlock(
+            choices=self.get_choices, thumbnails=self.get_thumbnails
+        )
+        calls_after_init = len(self.calls)
+
+        block.get_form_state("a")
+        block.get_form_state("a")
+
+        assert len(self.calls) == calls_after_init + 4
+        assert ThumbnailChoiceBlock._callable_cache == {}
+
+    def test_callables_memoized_within_timeout(self):
+        block = ThumbnailChoiceBlock(
+            choices=self.get_choices,
+            thumbnails=self.get_thumbnails,
+            callable_cache_timeout=60,
+        )
+        block.get_form_state("a")
+        block.get_form_state("b")
+        block.get_thumbnail_url("a")
+
+        assert self.calls.count("choices") == 1
+        assert self.calls.count("thumbnails") == 1
+        assert block.get_thumbnail_url("a") == "/test/a.png"
+
+    def test_memoized_results_shared_between_blocks(self):
+        block1 = ThumbnailChoiceBlock(
+            choices=self.get_choices, callable_cache_timeout=60
+        )
+        block2 = ThumbnailChoiceBlock(
+            choices=self.get_choices, callable_cache_timeout=60
+        )
+        block1.get_form_state("a")
+        block2.get_form_state("a")
+
+        assert self.calls.count("choices") == 1
+
+    def test_memoized_result_expires_after_timeout(self):
+        block = ThumbnailChoiceBlock(
+            choices=self.get_choices, callable_cache_timeout=60
+        )
+        with patch(
+            "wagtail_thumbnail_choice_block.blocks.time.monotonic",
+            return_value=10**9,
+        ):
+            block.get_form_state("a")
+
+        assert self.calls.count("choices") == 2
+
+    def test_invalidate_single_source(self):
+        block = ThumbnailChoiceBlock(
+            choices=self.get_choices,
+            thumbnails=self.get_thumbnails,
+            callable_cache_timeout=60,
+        )
+        ThumbnailChoiceBlock.invalidate_callable_cache(self.get_choices)
+        block.get_form_state("a")
+
+        assert self.calls.count("choices") == 2
+        assert self.calls.count("thumbnails") == 1
+
+    def test_invalidate_all_sources(self):
+        block = ThumbnailChoiceBlock(
+            choices=self.get_choices,
+            thumbnails=self.get_thumbnails,
+            callable_cache_timeout=60,
+        )
+        ThumbnailChoiceBlock.invalidate_callable_cache()
+        block.get_form_state("a")
+
+        assert self.calls.count("choices") == 2
+        assert self.calls.count("thumbnails") == 2
+
+    def test_invalidate_accepts_signal_kwargs(self):
+        from functools import partial
+
+        from django.contrib.auth.models import Group
+        from django.db.models.signals import post_save
+
+        receiver = partial(
+            ThumbnailChoiceBlock.invalidate_callable_cache, self.get_choices
+        )
+        post_save.connect(receiver, sender=Group, weak=False)
+        try:
+            block = ThumbnailChoiceBlock(
+                choices=self.get_choices, callable_cache_timeout=60
+            )
+            Group.objects.create(name="editors")
+            block.get_form_state("a")
+        finally:
+            post_save.disconnect(receiver, sender=Group)
+
+        assert self.calls.count("choices") == 2
+
+
+class TestThumbnailChoiceBlockAsyncSources(TestCase):
+    """Tests for async def choices/thumbnails/thumbnail_templates."""
+
+    def setUp(self):
+        ThumbnailChoiceBlock._callable_cache.clear()
+
+    def tearDown(self):
+        ThumbnailChoiceBlock._callable_cache.clear()
+
+    def test_async_sources_are_resolved(self):
+        async def get_choices():
+            return [("a", "Option A")]
+
+        async def get_thumbnails():
+            return {"a": "/async/a.png"}
+
+        async def get_thumbnail_templates():
+            return {"a": "icons/a.html"}
+
+        block = ThumbnailChoiceBlock(
+            choices=get_choices,
+            thumbnails=get_thumbnails,
+            thumbnail_templates=get_thumbnail_templates,
+        )
+        block.get_form_state("a")
+
+        assert ("a", "Option A") in list(block.field.choices)
+        assert block.field.widget.thumbnail_mapping == {"a": "/async/a.png"}
+        assert block.field.widget.thumbnail_template_mapping == {"a": "icons/a.html"}
+        assert block.get_thumbnail_url("a") == "/async/a.png"
+
+    def test_async_sources_are_resolved_concurrently(self):
+        import asyncio
+        import time
+
+        delay = 0.2
+
+        async def get_choices():
+            await asyncio.sleep(delay)
+            return [("a", "Option A")]
+
+        async def get_thumbnails():
+            await asyncio.sleep(delay)
+            return {"a": "/async/a.png"}
+
+        async def get_thumbnail_templates():
+            await asyncio.sleep(delay)
+            return {}
+
+        block = ThumbnailChoiceBlock(
+            choices=[("a", "Option A")],
+            thumbnails={"a": "/async/a.png"},
+        )
+        start = time.monotonic()
+        resolved = block._resolve_sources(
+            get_choices, get_thumbnails, get_thumbnail_templates
+        )
+        elapsed = time.monotonic() - start
+
+        assert resolved == [[("a", "Option A")], {"a": "/async/a.png"}, {}]
+        assert elapsed < delay * 2
+
+    def test_mixed_sync_async_and_static_sources(self):
+        async def get_thumbnails():
+            return {"a": "/async/a.png"}
+
+        def get_choices():
+            return [("a", "Option A")]
+
+        block = ThumbnailChoiceBlock(choices=[("a", "Option A")])
+
+        assert block._resolve_sources(get_choices, get_thumbnails, None) == [
+            [("a", "Option A")],
+            {"a": "/async/a.png"},
+            None,
+        ]
+
+    def test_async_results_are_memoized(self):
+        calls = []
+
+        async def get_choices():
+            calls.append(1)
+            return [("a", "Option A")]
+
+        block = ThumbnailChoiceBlock(choices=get_choices, callable_cache_timeout=60)
+        block.get_form_state("a")
+        block.get_form_state("a")
+
+        assert len(calls) == 1
+
+
 class TestThumbnailChoiceBlockDirectoryMode(TestCase):
     """Tests for ThumbnailChoiceBlock with thumbnail_directory parameter."""
 
@@ -1135,7 +1348,7 @@ class TestThumbnailChoiceBlockDirectoryMode(TestCase):
 
         assert len(scan_calls) == 1
 
-    def test_lambda_value_fn_does_not_share_cache(self):
+    def test_equivalent_lambda_value_fns_share_cache(self):
         (self.icons_dir / "sun-16.svg").write_text("<svg/>")
 
         scan_calls = []
@@ -1161,7 +1374,78 @@ class TestThumbnailChoiceBlockDirectoryMode(TestCase):
                     thumbnail_directory_value_fn=lambda p: p.upper(),
                 )
 
-        assert len(scan_calls) == 2
+        assert len(scan_calls) == 1
+
+    def test_different_label_fn_or_sort_key_does_not_share_cache(self):
+        (self.icons_dir / "sun-16.svg").write_text("<svg/>")
+
+        block1 = self._make_block()
+        block2 = self._make_block(thumbnail_directory_label_fn=str.upper)
+        block3 = self._make_block(thumbnail_directory_sort_key=lambda path: path.stem)
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 3
+        assert block1._choices_source == [("sun-16", "Sun 16")]
+        assert block2._choices_source == [("sun-16", "SUN-16")]
+        assert block3._choices_source == block1._choices_source
+
+    # --- include / exclude / max_depth ---
+
+    def _make_tree(self):
+        for name in ("sun.svg", "sun@2x.png", "brand/logo.svg", "brand/src/logo.png"):
+            path = self.icons_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("<svg/>")
+
+    def test_include_patterns(self):
+        self._make_tree()
+
+        block = self._make_block(thumbnail_directory_include="*.svg")
+
+        assert [v for v, _ in block._choices_source] == ["brand/logo", "sun"]
+
+    def test_include_pattern_with_slash_matches_relative_path(self):
+        self._make_tree()
+
+        block = self._make_block(thumbnail_directory_include=["brand/*"])
+
+        assert [v for v, _ in block._choices_source] == [
+            "brand/logo",
+            "brand/src/logo",
+        ]
+
+    def test_exclude_prunes_directories_before_listing(self):
+        self._make_tree()
+        listed = []
+        iterdir = Path.iterdir
+
+        def recording_iterdir(path):
+            listed.append(path.name)
+            return iterdir(path)
+
+        with patch.object(Path, "iterdir", recording_iterdir):
+            block = self._make_block(thumbnail_directory_exclude=["src", "*@2x.*"])
+
+        assert [v for v, _ in block._choices_source] == ["brand/logo", "sun"]
+        assert "src" not in listed
+
+    def test_max_depth(self):
+        self._make_tree()
+
+        block = self._make_block(thumbnail_directory_max_depth=0)
+        assert [v for v, _ in block._choices_source] == ["sun", "sun@2x"]
+
+        block = self._make_block(thumbnail_directory_max_depth=1)
+        assert "brand/logo" in dict(block._choices_source)
+        assert "brand/src/logo" not in dict(block._choices_source)
+
+    def test_scan_cache_is_keyed_on_filters(self):
+        self._make_tree()
+
+        self._make_block()
+        self._make_block(thumbnail_directory_exclude="src")
+        self._make_block(thumbnail_directory_max_depth=0)
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 3
 
     # --- get_thumbnail_url ---
 
@@ -1194,3 +1478,183 @@ class TestThumbnailChoiceBlockDirectoryMode(TestCase):
         block = self._make_block()
         url = block.get_thumbnail_url("arrows/left")
         assert url.endswith("arrows/left.svg")
+
+
+MANIFEST_STORAGES = {
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+    }
+}
+
+
+class TestThumbnailChoiceBlockMultipleRoots(TestCase):
+    """Tests for a thumbnail_directory made of several roots."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        for name in (
+            "base/sun.svg",
+            "base/moon.svg",
+            "base/arrows/left.svg",
+            "base/legacy/old.svg",
+            "brand/sun.png",
+            "brand/arrows/right.svg",
+            "brand/star.svg",
+        ):
+            path = Path(self.tmp_dir) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("<svg/>")
+        self.settings = override_settings(STATICFILES_DIRS=[self.tmp_dir])
+        self.settings.enable()
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def test_roots_are_merged(self):
+        block = ThumbnailChoiceBlock(thumbnail_directory=["base", "brand"])
+
+        assert block._choices_source == [
+            ("arrows/left", "Left"),
+            ("arrows/right", "Right"),
+            ("legacy/old", "Old"),
+            ("moon", "Moon"),
+            ("star", "Star"),
+            ("sun", "Sun"),
+        ]
+        assert [item["label"] for item in block._tree_items if item["depth"] == 0] == [
+            "Arrows",
+            "Legacy",
+            "Moon",
+            "Star",
+            "Sun",
+        ]
+        assert block.get_thumbnail_url("moon") == "/static/base/moon.svg"
+        assert block.get_thumbnail_url("star") == "/static/brand/star.svg"
+
+    def test_later_roots_shadow_earlier_ones(self):
+        block = ThumbnailChoiceBlock(thumbnail_directory=["base", "brand"])
+        assert block.get_thumbnail_url("sun") == "/static/brand/sun.png"
+
+        block = ThumbnailChoiceBlock(thumbnail_directory=["brand", "base"])
+        assert block.get_thumbnail_url("sun") == "/static/base/sun.svg"
+
+    def test_shadowing_by_value_drops_emptied_headings(self):
+        # Both "legacy/old" and "star" become "old"; brand's file wins
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory=["base", "brand"],
+            thumbnail_directory_value_fn=lambda rel_path: (
+                "old" if rel_path in ("legacy/old", "star") else rel_path
+            ),
+        )
+
+        assert block.get_thumbnail_url("old") == "/static/brand/star.svg"
+        labels = [item["label"] for item in block._tree_items]
+        assert "Legacy" not in labels
+        assert labels.count("Star") == 1
+
+    def test_value_fn_collision_within_a_root_raises(self):
+        with self.assertRaises(ImproperlyConfigured) as cm:
+            ThumbnailChoiceBlock(
+                thumbnail_directory=["base", "brand"],
+                thumbnail_directory_value_fn=lambda rel_path: "same",
+            )
+
+        assert "inside 'base'" in str(cm.exception)
+
+    def test_override_root_does_not_hide_collision_within_a_root(self):
+        for name in ("base/a/x.svg", "base/b/x.svg", "brand/a/x.svg"):
+            path = Path(self.tmp_dir) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("<svg/>")
+
+        with self.assertRaises(ImproperlyConfigured) as cm:
+            ThumbnailChoiceBlock(
+                thumbnail_directory=["base", "brand"],
+                thumbnail_directory_value_fn=posixpath.basename,
+            )
+
+        assert "inside 'base'" in str(cm.exception)
+
+    def test_one_scan_cache_entry(self):
+        block = ThumbnailChoiceBlock(thumbnail_directory=["base", "brand"])
+        other = ThumbnailChoiceBlock(thumbnail_directory=("base", "brand"))
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 1
+        assert other._tree_items is block._tree_items
+
+    def test_missing_root_raises(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ThumbnailChoiceBlock(thumbnail_directory=["base", "missing"])
+
+
+class TestThumbnailChoiceBlockManifestUrls(TestCase):
+    """Directory mode uses hashed names from a static files manifest."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.icons_dir = Path(self.tmp_dir) / "icons"
+        (self.icons_dir / "arrows").mkdir(parents=True)
+        (self.icons_dir / "sun.svg").write_text("<svg/>")
+        (self.icons_dir / "moon.svg").write_text("<svg/>")
+        (self.icons_dir / "arrows" / "left.svg").write_text("<svg/>")
+        self.static_root = Path(self.tmp_dir) / "static_root"
+        self.static_root.mkdir()
+        (self.static_root / "staticfiles.json").write_text(
+            json.dumps(
+                {
+                    "version": "1.1",
+                    "paths": {
+                        "icons/sun.svg": "icons/sun.1a2b3c.svg",
+                        "icons/arrows/left.svg": "icons/arrows/left.4d5e6f.svg",
+                    },
+                }
+            )
+        )
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def _make_block(self, debug=False):
+        with (
+            override_settings(
+                STORAGES=MANIFEST_STORAGES, STATIC_ROOT=self.static_root, DEBUG=debug
+            ),
+            patch.object(
+                ThumbnailChoiceBlock,
+                "_find_static_directory",
+                return_value=self.icons_dir,
+            ),
+        ):
+            return ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+    def test_uses_hashed_names(self):
+        block = self._make_block()
+
+        assert block.get_thumbnail_url("sun") == "/static/icons/sun.1a2b3c.svg"
+        assert (
+            block.get_thumbnail_url("arrows/left")
+            == "/static/icons/arrows/left.4d5e6f.svg"
+        )
+        option = next(i for i in block._tree_items if i.get("value") == "sun")
+        assert option["thumbnail_url"] == "/static/icons/sun.1a2b3c.svg"
+
+    def test_unhashed_files_keep_plain_url(self):
+        block = self._make_block()
+
+        assert block.get_thumbnail_url("moon") == "/static/icons/moon.svg"
+
+    def test_debug_uses_plain_urls(self):
+        block = self._make_block(debug=True)
+
+        assert block.get_thumbnail_url("sun") == "/static/icons/sun.svg"
+
+    @patch("django.contrib.staticfiles.storage.ManifestStaticFilesStorage.url")
+    def test_does_not_call_storage_url_per_file(self, mock_url):
+        self._make_block()
+
+        mock_url.assert_not_called()
@@ -0,0 +1,159 @@
+"""
+Tests for bulk thumbnail resolution and the thumbnail_choice_tags library.
+"""
+
+from unittest.mock import patch
+
+from django.template import Context, Template
+from django.test import TestCase
+from wagtail import blocks
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.blocks import (
+    get_bound_thumbnail,
+    get_stream_thumbnails,
+    iter_thumbnail_choice_values,
+)
+
+
+class TestBlockBulkResolution(TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def get_thumbnails(self):
+        self.calls.append("thumbnails")
+        return {"a": "/test/a.png", "b": "/test/b.png"}
+
+    def test_get_thumbnail_urls_resolves_once(self):
+        block = ThumbnailChoiceBlock(
+            choices=[("a", "A"), ("b", "B")], thumbnails=self.get_thumbnails
+        )
+        self.calls.clear()
+
+        urls = block.get_thumbnail_urls(["a", "b", "a", "missing"])
+
+        assert urls == {"a": "/test/a.png", "b": "/test/b.png", "missing": ""}
+        assert self.calls == ["thumbnails"]
+
+    @patch("wagtail_thumbnail_choice_block.widgets.render_to_string")
+    def test_get_thumbnails_renders_each_value_once(self, mock_render):
+        mock_render.side_effect = lambda template, context: (
+            f"<i>{context['value']}:{context['label']}</i>"
+        )
+        block = ThumbnailChoiceBlock(
+            choices=[("star", "Star"), ("check", "Check")],
+            thumbnails={"check": "/test/check.png"},
+            thumbnail_templates={"star": "icons/icon.html"},
+        )
+
+        thumbnails = block.get_thumbnails(["star", "check", "star"])
+
+        assert thumbnails == {
+            "star": {"url": "", "html": "<i>star:Star</i>"},
+            "check": {"url": "/test/check.png", "html": ""},
+        }
+        assert mock_render.call_count == 1
+
+
+class TestStreamThumbnails(TestCase):
+    def setUp(self):
+        self.icon_block = ThumbnailChoiceBlock(
+            choices=[("sun", "Sun"), ("moon", "Moon")],
+            thumbnails={"sun": "/icons/sun.svg", "moon": "/icons/moon.svg"},
+        )
+        self.stream_block = blocks.StreamBlock(
+            [
+                ("icon", self.icon_block),
+                (
+                    "card",
+                    blocks.StructBlock(
+                        [("title", blocks.CharBlock()), ("icon", self.icon_block)]
+                    ),
+                ),
+                ("icons", blocks.ListBlock(self.icon_block)),
+                ("text", blocks.CharBlock()),
+            ]
+        )
+        self.stream_value = self.stream_block.to_python(
+            [
+                {"type": "icon", "value": "sun"},
+                {"type": "card", "value": {"title": "Night", "icon": "moon"}},
+                {"type": "icons", "value": ["sun", "moon", ""]},
+                {"type": "text", "value": "sun"},
+            ]
+        )
+
+    def test_iter_values_descends_into_struct_and_list_blocks(self):
+        values = [
+            value
+            for _block, value in iter_thumbnail_choice_values(
+                self.stream_block, self.stream_value
+            )
+        ]
+
+        assert values == ["sun", "moon", "sun", "moon"]
+
+    def test_get_stream_thumbnails_resolves_each_block_once(self):
+        with patch.object(
+            ThumbnailChoiceBlock,
+            "get_thumbnails",
+            autospec=True,
+            side_effect=ThumbnailChoiceBlock.get_thumbnails,
+        ) as mock_get_thumbnails:
+            thumbnails = get_stream_thumbnails(self.stream_value)
+
+        assert mock_get_thumbnails.call_count == 1
+        assert set(thumbnails) == {id(self.icon_block)}
+        card = self.stream_value[1].value.bound_blocks["icon"]
+        assert get_bound_thumbnail(thumbnails, self.stream_value[0]) == {
+            "url": "/icons/sun.svg",
+            "html": "",
+        }
+        assert get_bound_thumbnail(thumbnails, card)["url"] == "/icons/moon.svg"
+
+    def test_get_stream_thumbnails_accepts_iterable_of_stream_values(self):
+        other = self.stream_block.to_python([{"type": "icon", "value": "moon"}])
+
+        thumbnails = get_stream_thumbnails([self.stream_value, other, None])
+
+        assert set(thumbnails[id(self.icon_block)]) == {"sun", "moon"}
+
+    def test_blocks_storing_the_same_value_keep_their_own_thumbnails(self):
+        light = ThumbnailChoiceBlock(
+            choices=[("a", "A")], thumbnails={"a": "/light/a.svg"}
+        )
+        dark = ThumbnailChoiceBlock(
+            choices=[("a", "A")], thumbnails={"a": "/dark/a.svg"}
+        )
+        stream_block = blocks.StreamBlock([("light", light), ("dark", dark)])
+        stream_value = stream_block.to_python(
+            [{"type": "light", "value": "a"}, {"type": "dark", "value": "a"}]
+        )
+
+        thumbnails = get_stream_thumbnails(stream_value)
+
+        assert get_bound_thumbnail(thumbnails, stream_value[0])["url"] == (
+            "/light/a.svg"
+        )
+        assert get_bound_thumbnail(thumbnails, stream_value[1])["url"] == (
+            "/dark/a.svg"
+        )
+
+    def test_template_tag_and_filters(self):
+        template = Template(
+            "{% load thumbnail_choice_tags %}"
+            "{% stream_thumbnails body as thumbnails %}"
+            "{% for child in body %}{% if child.block_type == 'icon' %}"
+            "{{ thumbnails|thumbnail_url:child }}|"
+            "{{ thumbnails|thumbnail_html:child }}|"
+            "{% elif child.block_type == 'card' %}"
+            "{{ thumbnails|thumbnail_url:child.value.bound_blocks.icon }}|"
+            "{% elif child.block_type == 'text' %}"
+            "{{ thumbnails|thumbnail_url:child }}"
+            "{% endif %}{% endfor %}"
+            "{{ thumbnails|thumbnail_url:'missing' }}"
+        )
+
+        html = template.render(Context({"body": self.stream_value}))
+
+        assert html == "/icons/sun.svg||/icons/moon.svg|"
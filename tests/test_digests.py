@@ -0,0 +1,128 @@
+"""
+Tests for content-hash deduplication of directory thumbnails.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock, metrics
+from wagtail_thumbnail_choice_block.digests import (
+    clear_digests,
+    path_digest,
+    storage_digest,
+)
+from wagtail_thumbnail_choice_block.frozen import scan_key
+
+
+class TestDigests(TestCase):
+    def setUp(self):
+        clear_digests()
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        clear_digests()
+
+    def test_path_digest_is_cached_until_file_changes(self):
+        path = self.tmp_dir / "sun.svg"
+        path.write_text("<svg/>")
+        digest = path_digest(path)
+
+        with patch.object(Path, "open", side_effect=AssertionError):
+            assert path_digest(path) == digest
+
+        path.write_text("<svg></svg>")
+        os.utime(path, ns=(1, 1))
+        assert path_digest(path) != digest
+
+    def test_identical_files_share_a_digest(self):
+        (self.tmp_dir / "a.svg").write_text("<svg/>")
+        (self.tmp_dir / "b.svg").write_text("<svg/>")
+
+        assert path_digest(self.tmp_dir / "a.svg") == path_digest(
+            self.tmp_dir / "b.svg"
+        )
+
+    def test_storage_digest(self):
+        storage = InMemoryStorage()
+        storage.save("a.svg", ContentFile(b"<svg/>"))
+        storage.save("b.svg", ContentFile(b"<svg/>"))
+        digest = storage_digest(storage, "a.svg")
+
+        assert storage_digest(storage, "b.svg") == digest
+        with patch.object(storage, "open", side_effect=AssertionError):
+            assert storage_digest(storage, "a.svg") == digest
+
+
+class TestDirectoryDedupe(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        clear_digests()
+        self.tmp_dir = tempfile.mkdtemp()
+        icons_dir = Path(self.tmp_dir) / "icons"
+        for folder in ("16", "24"):
+            (icons_dir / folder).mkdir(parents=True)
+            (icons_dir / folder / "sun.svg").write_text("<svg>sun</svg>")
+        (icons_dir / "24" / "moon.svg").write_text("<svg>moon</svg>")
+        self.settings = override_settings(STATICFILES_DIRS=[self.tmp_dir])
+        self.settings.enable()
+
+        self.events = []
+        metrics.metric_recorded.connect(self.record_event)
+
+    def tearDown(self):
+        metrics.metric_recorded.disconnect(self.record_event)
+        self.settings.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+        clear_digests()
+
+    def record_event(self, sender, name, kind, value, instance, tags, **kwargs):
+        self.events.append((name, value))
+
+    def test_identical_files_share_first_url(self):
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_dedupe=True
+        )
+
+        assert block.get_thumbnail_urls(["16/sun", "24/sun", "24/moon"]) == {
+            "16/sun": "/static/icons/16/sun.svg",
+            "24/sun": "/static/icons/16/sun.svg",
+            "24/moon": "/static/icons/24/moon.svg",
+        }
+        assert ("scan_directory.duplicates", 1) in self.events
+
+    def test_off_by_default(self):
+        block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+        assert block.get_thumbnail_url("24/sun") == "/static/icons/24/sun.svg"
+        assert "scan_directory.duplicates" not in dict(self.events)
+
+    def test_scan_cache_is_keyed_on_dedupe(self):
+        ThumbnailChoiceBlock(thumbnail_directory="icons")
+        ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_dedupe=True
+        )
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 2
+        assert scan_key("icons", None, None, None, dedupe=True).endswith("|dedupe=True")
+
+    def test_storage(self):
+        storage = InMemoryStorage(base_url="/media/")
+        storage.save("icons/a/sun.svg", ContentFile(b"<svg/>"))
+        storage.save("icons/b/sun.svg", ContentFile(b"<svg/>"))
+
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons",
+            thumbnail_directory_storage=storage,
+            thumbnail_directory_dedupe=True,
+        )
+
+        assert block.get_thumbnail_url("b/sun") == "/media/icons/a/sun.svg"
@@ -0,0 +1,114 @@
+"""
+Tests for ThumbnailChoiceField.
+"""
+
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.fields import (
+    ThumbnailChoiceField,
+    build_choice_index,
+)
+
+
+class TestBuildChoiceIndex(TestCase):
+    def test_indexes_flat_choices_by_string_value(self):
+        index = build_choice_index([("a", "A"), (1, "One")])
+
+        assert index == {"a": "a", "1": 1}
+
+    def test_indexes_optgroup_choices(self):
+        index = build_choice_index([("Group", [("a", "A"), ("b", "B")]), ("c", "C")])
+
+        assert index == {"a": "a", "b": "b", "c": "c"}
+
+    def test_first_choice_wins_on_string_collision(self):
+        index = build_choice_index([(1, "One"), ("1", "Also one")])
+
+        assert index["1"] == 1
+
+
+class TestThumbnailChoiceField(TestCase):
+    def test_valid_value(self):
+        field = ThumbnailChoiceField(choices=[("a", "A"), (2, "Two")])
+
+        assert field.valid_value("a")
+        assert field.valid_value("2")
+        assert field.valid_value(2)
+        assert not field.valid_value("b")
+
+    def test_clean_rejects_unknown_value(self):
+        field = ThumbnailChoiceField(choices=[("a", "A")])
+
+        assert field.clean("a") == "a"
+        with self.assertRaises(ValidationError):
+            field.clean("b")
+
+    def test_index_built_once_per_choices_list(self):
+        field = ThumbnailChoiceField(choices=[("a", "A"), ("b", "B")])
+
+        with patch(
+            "wagtail_thumbnail_choice_block.fields.build_choice_index",
+            wraps=build_choice_index,
+        ) as mock_build:
+            for _ in range(10):
+                field.valid_value("a")
+
+        assert mock_build.call_count == 1
+
+    def test_index_rebuilt_when_choices_reassigned(self):
+        field = ThumbnailChoiceField(choices=[("a", "A")])
+        assert field.valid_value("a")
+
+        field.choices = [("b", "B")]
+
+        assert field.valid_value("b")
+        assert not field.valid_value("a")
+
+    def test_callable_choices_are_not_cached(self):
+        data = {"choices": [("a", "A")]}
+        field = ThumbnailChoiceField(choices=lambda: data["choices"])
+        assert field.valid_value("a")
+
+        data["choices"] = [("b", "B")]
+
+        assert field.valid_value("b")
+        assert not field.valid_value("a")
+
+
+class TestThumbnailChoiceBlockIndex(TestCase):
+    def test_block_uses_thumbnail_choice_field(self):
+        block = ThumbnailChoiceBlock(choices=[("a", "A")])
+
+        assert isinstance(block.field, ThumbnailChoiceField)
+
+    def test_clean_validates_against_refreshed_callable_choices(self):
+        data = {"choices": [("a", "A")]}
+        block = ThumbnailChoiceBlock(choices=lambda: data["choices"])
+        assert block.clean("a") == "a"
+
+        data["choices"] = [("b", "B")]
+        block.get_form_state("b")
+
+        assert block.clean("b") == "b"
+        with self.assertRaises(ValidationError):
+            block.clean("a")
+
+    def test_normalize_restores_original_key_type(self):
+        block = ThumbnailChoiceBlock(choices=[(1, "One"), (2, "Two")])
+
+        assert block.to_python("2") == 2
+        assert block.normalize("1") == 1
+        assert block.to_python("3") == "3"
+        assert block.to_python(None) is None
+
+    def test_large_choice_set_validation(self):
+        choices = [(f"icon-{i}", f"Icon {i}") for i in range(5000)]
+        block = ThumbnailChoiceBlock(choices=choices)
+
+        assert block.clean("icon-4999") == "icon-4999"
+        with self.assertRaises(ValidationError):
+            block.clean("icon-5000")
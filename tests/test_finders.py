@@ -0,0 +1,88 @@
+"""
+Tests for the static roots index.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import finders
+
+
+class TestFindStaticDirectory(TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.first = self.tmp_dir / "first"
+        self.second = self.tmp_dir / "second"
+        self.static_root = self.tmp_dir / "static_root"
+        (self.first / "icons").mkdir(parents=True)
+        (self.second / "icons" / "arrows").mkdir(parents=True)
+        (self.static_root / "logos").mkdir(parents=True)
+        self.settings_override = override_settings(
+            STATICFILES_DIRS=[str(self.first), str(self.second)],
+            STATIC_ROOT=str(self.static_root),
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_first_root_containing_directory_wins(self):
+        assert finders.find_static_directory("icons") == self.first / "icons"
+
+    def test_nested_directory_skips_roots_without_it(self):
+        assert (
+            finders.find_static_directory("icons/arrows")
+            == self.second / "icons" / "arrows"
+        )
+
+    def test_falls_back_to_static_root(self):
+        assert finders.find_static_directory("logos") == self.static_root / "logos"
+
+    def test_missing_directory(self):
+        assert finders.find_static_directory("missing") is None
+
+    def test_empty_path(self):
+        assert finders.find_static_directory("") is None
+        assert finders.find_static_directory("/") is None
+
+    def test_slashes_are_ignored(self):
+        assert finders.find_static_directory("/icons") == self.first / "icons"
+        assert (
+            finders.find_static_directory("icons//arrows/")
+            == self.second / "icons" / "arrows"
+        )
+
+    def test_roots_are_listed_once(self):
+        finders.find_static_directory("icons")
+
+        with patch.object(finders, "_build_index") as mock_build:
+            finders.find_static_directory("icons")
+            finders.find_static_directory("icons/arrows")
+            finders.find_static_directory("logos")
+
+        mock_build.assert_not_called()
+
+    def test_finds_directory_created_after_indexing(self):
+        finders.find_static_directory("icons")
+        (self.second / "flags").mkdir()
+
+        assert finders.find_static_directory("flags") == self.second / "flags"
+
+    def test_setting_change_clears_index(self):
+        finders.find_static_directory("icons")
+
+        with override_settings(STATICFILES_DIRS=[str(self.second)]):
+            assert finders.find_static_directory("icons") == self.second / "icons"
+        assert finders.find_static_directory("icons") == self.first / "icons"
+
+    def test_roots_are_deduplicated_and_ordered(self):
+        roots = finders.get_static_roots()
+
+        assert roots.count(self.first) == 1
+        assert roots.index(self.first) < roots.index(self.second)
+        assert roots[-1] == self.static_root
@@ -0,0 +1,185 @@
+"""
+Tests for frozen directory scans and the thumbnail_choice_freeze command.
+"""
+
+import functools
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.frozen import callable_key, scan_key
+
+
+def upper_label(stem):
+    return stem.upper()
+
+
+class UpperLabel:
+    def __call__(self, stem):
+        return stem.upper()
+
+
+class TestCallableKey(TestCase):
+    def test_module_function(self):
+        assert callable_key(upper_label) == "tests.test_frozen.upper_label"
+
+    def test_none(self):
+        assert callable_key(None) == ""
+
+    def test_lambdas_are_told_apart_by_code(self):
+        first = lambda stem: stem.upper()
+        second = lambda stem: stem.upper()
+        third = lambda stem: stem.lower()
+
+        assert callable_key(first) == callable_key(second)
+        assert callable_key(first) != callable_key(third)
+
+    def test_closures_and_defaults(self):
+        def make(length):
+            def label(stem, suffix=""):
+                return stem[:length] + suffix
+
+            return label
+
+        assert callable_key(make(3)) == callable_key(make(3))
+        assert callable_key(make(3)) != callable_key(make(4))
+        assert callable_key(make(object())) is None
+
+    def test_partial(self):
+        assert callable_key(functools.partial(upper_label)) == callable_key(
+            functools.partial(upper_label)
+        )
+        assert callable_key(functools.partial(str.replace, "-", " ")) != (
+            callable_key(functools.partial(str.replace, "_", " "))
+        )
+
+        partial = functools.partial(upper_label, object())
+        assert callable_key(partial) is None
+        assert scan_key("icons", None, partial, None) is None
+
+
+class TestFrozenScans(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        icons_dir = Path(self.tmp_dir) / "icons"
+        (icons_dir / "arrows").mkdir(parents=True)
+        (icons_dir / "sun.svg").write_text("<svg/>")
+        (icons_dir / "arrows" / "left.svg").write_text("<svg/>")
+        self.frozen_file = Path(self.tmp_dir) / "frozen.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def make_block(self, **kwargs):
+        with override_settings(STATICFILES_DIRS=[self.tmp_dir]):
+            return ThumbnailChoiceBlock(thumbnail_directory="icons", **kwargs)
+
+    def freeze(self, *blocks, **kwargs):
+        stdout, stderr = StringIO(), StringIO()
+        module = (
+            "wagtail_thumbnail_choice_block.management.commands.thumbnail_choice_freeze"
+        )
+        with (
+            patch(
+                f"{module}.find_thumbnail_choice_blocks",
+                return_value=[
+                    (f"tests.Page.body.{i}", b) for i, b in enumerate(blocks)
+                ],
+            ),
+            patch(f"{module}.staticfiles_storage") as storage,
+            override_settings(STATICFILES_DIRS=[self.tmp_dir]),
+        ):
+            storage.url.side_effect = lambda path: f"/static/{path}?v=abc"
+            call_command(
+                "thumbnail_choice_freeze", stdout=stdout, stderr=stderr, **kwargs
+            )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_freeze_writes_scan_with_storage_urls(self):
+        block = self.make_block(thumbnail_directory_label_fn=upper_label)
+
+        stdout, _stderr = self.freeze(block, output=str(self.frozen_file))
+
+        assert "tests.Page.body.0: icons, 2 files" in stdout
+        assert "Froze 1 directory scan(s)" in stdout
+        data = json.loads(self.frozen_file.read_text())
+        (scan,) = data["scans"].values()
+        assert scan["files"] == ["icons/arrows/left.svg", "icons/sun.svg"]
+        assert scan["choices"] == [["arrows/left", "LEFT"], ["sun", "SUN"]]
+        assert scan["thumbnails"]["sun"] == "/static/icons/sun.svg?v=abc"
+
+    def test_freeze_reports_duplicates(self):
+        # sun.svg and arrows/left.svg are both "<svg/>"
+        block = self.make_block(thumbnail_directory_dedupe=True)
+
+        stdout, _stderr = self.freeze(block, output=str(self.frozen_file))
+
+        assert "icons, 1 files (1 duplicates)" in stdout
+        (scan,) = json.loads(self.frozen_file.read_text())["scans"].values()
+        assert scan["thumbnails"]["sun"] == "/static/icons/arrows/left.svg?v=abc"
+
+    def test_freeze_requires_output(self):
+        with self.assertRaises(CommandError):
+            self.freeze(self.make_block())
+
+    def test_freeze_skips_unidentifiable_callables(self):
+        block = self.make_block(thumbnail_directory_label_fn=UpperLabel())
+
+        _stdout, stderr = self.freeze(block, output=str(self.frozen_file))
+
+        assert "skipped" in stderr
+        assert json.loads(self.frozen_file.read_text())["scans"] == {}
+
+    def test_block_uses_frozen_scan_without_walking(self):
+        self.freeze(self.make_block(), output=str(self.frozen_file))
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+        with (
+            override_settings(WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS=self.frozen_file),
+            patch.object(ThumbnailChoiceBlock, "_scan_directory") as mock_scan,
+        ):
+            block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+        mock_scan.assert_not_called()
+        assert block.get_thumbnail_url("sun") == "/static/icons/sun.svg?v=abc"
+        assert ("arrows/left", "Left") in block._choices_source
+        assert block._tree_items[0] == {
+            "type": "heading",
+            "label": "Arrows",
+            "depth": 0,
+        }
+
+    def test_block_scans_when_not_frozen(self):
+        self.freeze(output=str(self.frozen_file))
+
+        with override_settings(WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS=self.frozen_file):
+            block = self.make_block()
+
+        assert block.get_thumbnail_url("sun") == "/static/icons/sun.svg"
+
+    def test_auto_reload_ignores_frozen_scan(self):
+        self.freeze(self.make_block(), output=str(self.frozen_file))
+
+        with override_settings(WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS=self.frozen_file):
+            block = self.make_block(thumbnail_directory_auto_reload=True)
+
+        assert block.get_thumbnail_url("sun") == "/static/icons/sun.svg"
+
+    def test_missing_file_is_reported(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+        with (
+            override_settings(WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS=self.frozen_file),
+            self.assertRaises(ImproperlyConfigured),
+        ):
+            self.make_block()
@@ -0,0 +1,196 @@
+"""
+Tests for directory mode through the Django Storage API.
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage, storages
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.listing import (
+    list_storage_directory,
+    match_patterns,
+)
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "listings": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "listings",
+    },
+}
+LISTING_CACHE = {"CACHE": "listings"}
+
+
+def make_storage():
+    storage = InMemoryStorage(base_url="https://cdn.example.com/")
+    for name in (
+        "icons/sun.svg",
+        "icons/notes.txt",
+        "icons/arrows/left.svg",
+        "icons/arrows/small/up.png",
+        "icons/.hidden/secret.svg",
+    ):
+        storage.save(name, ContentFile(b"<svg/>"))
+    return storage
+
+
+class TestListStorageDirectory(TestCase):
+    def setUp(self):
+        self.storage = make_storage()
+
+    def test_lists_every_directory(self):
+        listing = list_storage_directory(self.storage, "icons")
+
+        assert listing == {
+            # Hidden directories are listed but not descended into
+            "icons": ([".hidden", "arrows"], ["notes.txt", "sun.svg"]),
+            "icons/arrows": (["small"], ["left.svg"]),
+            "icons/arrows/small": ([], ["up.png"]),
+        }
+
+    def test_one_listdir_call_per_directory(self):
+        with patch.object(
+            self.storage, "listdir", wraps=self.storage.listdir
+        ) as mock_listdir:
+            list_storage_directory(self.storage, "icons/")
+
+        assert sorted(call.args[0] for call in mock_listdir.call_args_list) == [
+            "icons",
+            "icons/arrows",
+            "icons/arrows/small",
+        ]
+
+    def test_exclude_and_max_depth_prune_directories(self):
+        with patch.object(
+            self.storage, "listdir", wraps=self.storage.listdir
+        ) as mock_listdir:
+            list_storage_directory(self.storage, "icons", exclude=["small"])
+            list_storage_directory(self.storage, "icons", exclude=["arrows/*"])
+            list_storage_directory(self.storage, "icons", max_depth=0)
+
+        assert [call.args[0] for call in mock_listdir.call_args_list] == [
+            "icons",
+            "icons/arrows",
+            "icons",
+            "icons/arrows",
+            "icons",
+        ]
+
+    def test_match_patterns(self):
+        assert match_patterns("arrows/left.svg", ["*.svg"])
+        assert match_patterns("arrows/left.svg", ["arrows/*"])
+        assert not match_patterns("arrows/left.svg", ["left"])
+        assert not match_patterns("arrows/left.svg", ["small/*"])
+
+    @override_settings(
+        CACHES=CACHES, WAGTAIL_THUMBNAIL_CHOICE_LISTING_CACHE=LISTING_CACHE
+    )
+    def test_listing_is_cached(self):
+        caches["listings"].clear()
+        listing = list_storage_directory(self.storage, "icons")
+
+        with patch.object(
+            self.storage, "listdir", return_value=([], [])
+        ) as mock_listdir:
+            assert list_storage_directory(self.storage, "icons") == listing
+            mock_listdir.assert_not_called()
+
+            list_storage_directory(self.storage, "icons", use_cache=False)
+            assert mock_listdir.called
+
+
+class TestThumbnailChoiceBlockStorage(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        self.storage = make_storage()
+
+    def tearDown(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def test_scans_storage(self):
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_storage=self.storage
+        )
+
+        assert block._choices_source == [
+            ("arrows/left", "Left"),
+            ("arrows/small/up", "Up"),
+            ("sun", "Sun"),
+        ]
+        assert (
+            block.get_thumbnail_url("arrows/left")
+            == "https://cdn.example.com/icons/arrows/left.svg"
+        )
+        assert [item["label"] for item in block._tree_items] == [
+            "Arrows",
+            "Left",
+            "Small",
+            "Up",
+            "Sun",
+        ]
+
+    def test_custom_sort_key_receives_paths(self):
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons",
+            thumbnail_directory_storage=self.storage,
+            thumbnail_directory_sort_key=lambda path: (path.suffix != "", path.name),
+        )
+
+        assert block._tree_items[0]["label"] == "Arrows"
+        assert block._tree_items[-1]["label"] == "Sun"
+
+    @override_settings(
+        STORAGES={"icons": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+    )
+    def test_storage_alias(self):
+        storages["icons"].save("icons/moon.svg", ContentFile(b"<svg/>"))
+
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_storage="icons"
+        )
+
+        assert block._choices_source == [("moon", "Moon")]
+
+    def test_each_storage_has_its_own_scan_cache_entry(self):
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_storage=self.storage
+        )
+        other = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_storage=make_storage()
+        )
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 2
+        assert block._choices_source == other._choices_source
+
+    def test_multiple_roots(self):
+        self.storage.save("brand/sun.png", ContentFile(b"<svg/>"))
+
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory=["icons", "brand"],
+            thumbnail_directory_storage=self.storage,
+        )
+
+        assert block.get_thumbnail_url("sun") == "https://cdn.example.com/brand/sun.png"
+        assert len(block._choices_source) == 3
+
+    def test_missing_directory(self):
+        with self.assertRaises(ImproperlyConfigured) as cm:
+            ThumbnailChoiceBlock(
+                thumbnail_directory="missing", thumbnail_directory_storage=self.storage
+            )
+
+        assert str(cm.exception) == (
+            "ThumbnailChoiceBlock: thumbnail_directory 'missing' not found "
+            "in any staticfiles location or STATIC_ROOT."
+        )
+
+    def test_storage_requires_directory(self):
+        with self.assertRaises(ValueError):
+            ThumbnailChoiceBlock(
+                choices=[("a", "A")], thumbnail_directory_storage=self.storage
+            )
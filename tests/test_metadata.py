@@ -0,0 +1,132 @@
+"""
+Tests for reading thumbnail metadata during directory scans.
+"""
+
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.frozen import scan_key
+from wagtail_thumbnail_choice_block.metadata import raster_metadata, svg_metadata
+
+
+def make_image(format, size=(8, 6), color=(255, 0, 0, 255), mode="RGBA"):
+    image = Image.new(mode, size, color if mode == "RGBA" else color[:3])
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+class TestSvgMetadata(TestCase):
+    def test_view_box(self):
+        assert svg_metadata('<svg viewBox="0 0 24 16"><path/></svg>') == {
+            "width": 24,
+            "height": 16,
+        }
+        assert svg_metadata('<svg viewBox="0,0,24.5,16"/>') == {
+            "width": 24.5,
+            "height": 16,
+        }
+
+    def test_width_and_height(self):
+        assert svg_metadata('<svg width="32px" height="20"><path/></svg>') == {
+            "width": 32,
+            "height": 20,
+        }
+
+    def test_unusable_sizes(self):
+        assert svg_metadata('<svg width="100%" height="100%"/>') == {}
+        assert svg_metadata('<svg viewBox="0 0 0 0"/>') == {}
+        assert svg_metadata("<html></html>") == {}
+
+
+class TestRasterMetadata(TestCase):
+    def test_opaque_png(self):
+        metadata = raster_metadata(io.BytesIO(make_image("PNG")))
+
+        assert metadata == {"width": 8, "height": 6, "placeholder": "#ff0000"}
+
+    def test_transparent_png_has_no_placeholder(self):
+        metadata = raster_metadata(
+            io.BytesIO(make_image("PNG", color=(255, 0, 0, 128)))
+        )
+
+        assert metadata == {"width": 8, "height": 6}
+
+    def test_jpeg(self):
+        metadata = raster_metadata(
+            io.BytesIO(make_image("JPEG", size=(40, 30), mode="RGB"))
+        )
+
+        assert (metadata["width"], metadata["height"]) == (40, 30)
+        assert metadata["placeholder"].startswith("#f")
+
+    def test_unreadable(self):
+        assert raster_metadata(io.BytesIO(b"not an image")) == {}
+
+
+class TestDirectoryMetadata(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        icons_dir = Path(self.tmp_dir) / "icons"
+        icons_dir.mkdir()
+        (icons_dir / "sun.svg").write_text('<svg viewBox="0 0 24 24"/>')
+        (icons_dir / "photo.png").write_bytes(make_image("PNG", size=(64, 48)))
+        self.settings = override_settings(STATICFILES_DIRS=[self.tmp_dir])
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def test_scan_records_metadata(self):
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_metadata=True
+        )
+
+        items = {item["value"]: item for item in block._tree_items}
+        assert (items["sun"]["width"], items["sun"]["height"]) == (24, 24)
+        assert items["photo"]["placeholder"] == "#ff0000"
+
+        html = block.field.widget.render("icon", "sun")
+        assert 'width="64" height="48"' in html
+        assert 'width="24" height="24"' in html
+        assert "--thumbnail-placeholder: #ff0000;" in html
+
+    def test_off_by_default(self):
+        block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+        assert "width" not in block._tree_items[0]
+        assert block.field.widget.thumbnail_metadata_mapping == {}
+
+    def test_scan_cache_is_keyed_on_metadata(self):
+        ThumbnailChoiceBlock(thumbnail_directory="icons")
+        ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_directory_metadata=True
+        )
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 2
+        assert scan_key("icons", None, None, None, metadata=True).endswith(
+            "|metadata=True"
+        )
+
+    def test_storage(self):
+        storage = InMemoryStorage()
+        storage.save("icons/photo.png", ContentFile(make_image("PNG")))
+
+        block = ThumbnailChoiceBlock(
+            thumbnail_directory="icons",
+            thumbnail_directory_storage=storage,
+            thumbnail_directory_metadata=True,
+        )
+
+        assert block._tree_items[0]["width"] == 8
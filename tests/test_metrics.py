@@ -0,0 +1,189 @@
+"""
+Tests for the instrumentation hooks and metrics backends.
+"""
+
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock, metrics
+from wagtail_thumbnail_choice_block.widgets import ThumbnailRadioSelect
+
+IN_MEMORY = {"BACKEND": "wagtail_thumbnail_choice_block.metrics.InMemoryMetricsBackend"}
+CACHE = {
+    "BACKEND": "wagtail_thumbnail_choice_block.metrics.CacheMetricsBackend",
+    "OPTIONS": {"cache": "metrics"},
+}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "metrics": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "metrics",
+    },
+}
+
+
+class TestMetricsHooks(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        ThumbnailRadioSelect._render_cache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.icons_dir = Path(self.tmp_dir) / "icons"
+        self.icons_dir.mkdir()
+        (self.icons_dir / "sun.svg").write_text("<svg/>")
+        (self.icons_dir / "moon.svg").write_text("<svg/>")
+
+        self.events = []
+        metrics.metric_recorded.connect(self.record_event)
+
+    def tearDown(self):
+        metrics.metric_recorded.disconnect(self.record_event)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def record_event(self, sender, name, kind, value, instance, tags, **kwargs):
+        self.events.append((name, kind, value, instance))
+
+    def event_names(self):
+        return [name for name, _kind, _value, _instance in self.events]
+
+    def test_directory_scan_is_instrumented(self):
+        with override_settings(STATICFILES_DIRS=[self.tmp_dir]):
+            block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+            ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+        names = self.event_names()
+        assert names.count("scan_cache.miss") == 1
+        assert names.count("scan_cache.hit") == 1
+        assert names.count("find_static_directory") == 1
+        assert names.count("scan_directory") == 1
+        entries = [e for e in self.events if e[0] == "scan_directory.entries"]
+        assert entries == [("scan_directory.entries", "value", 2, block)]
+
+    def test_callable_resolution_is_instrumented(self):
+        block = ThumbnailChoiceBlock(choices=lambda: [("a", "A")])
+        self.events.clear()
+
+        block.get_form_state("a")
+
+        names = self.event_names()
+        assert names.count("callable_cache.miss") == 1
+        assert names.count("resolve_callable") == 1
+        timing = next(e for e in self.events if e[0] == "resolve_callable")
+        assert timing[1] == "timing"
+        assert timing[3] is block
+
+    @patch("wagtail_thumbnail_choice_block.widgets.render_to_string")
+    def test_widget_render_is_instrumented(self, mock_render):
+        mock_render.return_value = "<span>icon</span>"
+        widget = ThumbnailRadioSelect(
+            choices=[("a", "A"), ("b", "B")],
+            thumbnail_template_mapping={"a": "icon.html", "b": "icon.html"},
+            thumbnail_size=20,
+        )
+
+        html = widget.render("icon", "a")
+        widget.render("icon", "a")
+
+        names = self.event_names()
+        assert names.count("render_cache.miss") == 1
+        assert names.count("render_cache.hit") == 1
+        assert names.count("render_template") == 2
+        assert names.count("widget_render") == 1
+        assert names.count("widget_render.bytes") == 2  # cache hits included
+        size = next(e for e in self.events if e[0] == "widget_render.bytes")
+        assert size[2] == len(html.encode())
+        options = next(e for e in self.events if e[0] == "widget_render.options")
+        assert options[2] == 2
+
+    def test_every_recorded_metric_is_declared(self):
+        with override_settings(STATICFILES_DIRS=[self.tmp_dir]):
+            block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+        block.field.widget.render("icon", "sun")
+
+        for name, kind, _value, _instance in self.events:
+            assert metrics.METRICS[name] == kind
+
+
+class TestMetricsBackends(TestCase):
+    def test_default_backend_is_noop(self):
+        assert isinstance(metrics.get_backend(), metrics.NoopMetricsBackend)
+        assert metrics.get_backend().snapshot() is None
+
+    @override_settings(WAGTAIL_THUMBNAIL_CHOICE_METRICS=IN_MEMORY)
+    def test_in_memory_backend_aggregates(self):
+        metrics.incr("render_cache.hit")
+        metrics.incr("render_cache.hit", 2)
+        metrics.timing("widget_render", 0.5)
+        metrics.timing("widget_render", 1.5)
+        metrics.observe("widget_render.bytes", 100)
+
+        snapshot = metrics.get_backend().snapshot()
+
+        assert snapshot["counters"] == {"render_cache.hit": 3}
+        assert snapshot["timings"]["widget_render"] == {
+            "count": 2,
+            "total": 2.0,
+            "max": 1.5,
+        }
+        assert snapshot["values"]["widget_render.bytes"]["total"] == 100
+
+    @override_settings(CACHES=CACHES, WAGTAIL_THUMBNAIL_CHOICE_METRICS=CACHE)
+    def test_cache_backend_aggregates(self):
+        metrics.get_backend().reset()
+        metrics.incr("scan_cache.miss")
+        metrics.incr("scan_cache.miss")
+        metrics.timing("scan_directory", 0.25)
+        metrics.observe("scan_directory.entries", 40)
+
+        snapshot = metrics.get_backend().snapshot()
+
+        assert snapshot == {
+            "counters": {"scan_cache.miss": 2},
+            "timings": {"scan_directory": {"count": 1, "total": 0.25}},
+            "values": {"scan_directory.entries": {"count": 1, "total": 40}},
+        }
+
+    def test_statsd_backend_forwards_to_client(self):
+        client = MagicMock()
+        backend = metrics.StatsdMetricsBackend(client=client, prefix="icons")
+
+        backend.incr("render_cache.hit", 1, {})
+        backend.timing("widget_render", 0.002, {})
+        backend.observe("widget_render.bytes", 512, {})
+
+        client.incr.assert_called_once_with("icons.render_cache.hit", 1)
+        client.timing.assert_any_call("icons.widget_render", 2.0)
+        client.timing.assert_any_call("icons.widget_render.bytes", 512)
+
+
+class TestMetricsCommand(TestCase):
+    def test_command_fails_for_backend_without_counters(self):
+        with self.assertRaises(CommandError):
+            call_command("thumbnail_choice_metrics", stdout=StringIO())
+
+    @override_settings(WAGTAIL_THUMBNAIL_CHOICE_METRICS=IN_MEMORY)
+    def test_command_fails_for_process_local_backend(self):
+        with self.assertRaises(CommandError) as cm:
+            call_command("thumbnail_choice_metrics", stdout=StringIO())
+
+        assert "CacheMetricsBackend" in str(cm.exception)
+        assert "InMemoryMetricsBackend." not in str(cm.exception)
+
+    @override_settings(CACHES=CACHES, WAGTAIL_THUMBNAIL_CHOICE_METRICS=CACHE)
+    def test_command_dumps_and_resets_counters(self):
+        metrics.get_backend().reset()
+        metrics.incr("render_cache.miss")
+
+        out = StringIO()
+        call_command("thumbnail_choice_metrics", "--reset", stdout=out)
+
+        assert json.loads(out.getvalue())["counters"] == {"render_cache.miss": 1}
+        assert metrics.get_backend().snapshot()["counters"] == {}
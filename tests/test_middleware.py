@@ -0,0 +1,90 @@
+"""
+Tests for the request-scoped resolution of callable sources.
+"""
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.cache import get_request_cache, request_cache_scope
+from wagtail_thumbnail_choice_block.middleware import (
+    ThumbnailChoiceRequestCacheMiddleware,
+)
+
+
+class TestRequestCache(TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def get_choices(self):
+        self.calls.append("choices")
+        return [("a", "Option A"), ("b", "Option B")]
+
+    def get_thumbnails(self):
+        self.calls.append("thumbnails")
+        return {"a": "/test/a.png"}
+
+    def render_blocks(self, count=5):
+        for _ in range(count):
+            block = ThumbnailChoiceBlock(
+                choices=self.get_choices, thumbnails=self.get_thumbnails
+            )
+            block.get_form_state("a")
+            block.get_thumbnail_url("a")
+
+    def test_no_scope_outside_request(self):
+        assert get_request_cache() is None
+
+        self.render_blocks(count=2)
+
+        assert self.calls.count("choices") > 2
+
+    def test_scope_resolves_each_callable_once(self):
+        with request_cache_scope():
+            self.render_blocks()
+
+        assert self.calls == ["choices", "thumbnails"]
+        assert get_request_cache() is None
+
+    def test_nested_scope_starts_empty(self):
+        with request_cache_scope():
+            self.render_blocks(count=1)
+            with request_cache_scope():
+                self.render_blocks(count=1)
+
+        assert self.calls.count("choices") == 2
+
+    def test_invalidate_drops_request_memo(self):
+        with request_cache_scope():
+            self.render_blocks(count=1)
+            ThumbnailChoiceBlock.invalidate_callable_cache(self.get_choices)
+            self.render_blocks(count=1)
+
+        assert self.calls.count("choices") == 2
+        assert self.calls.count("thumbnails") == 1
+
+    def test_middleware_scopes_sync_request(self):
+        def view(request):
+            self.render_blocks()
+            return HttpResponse("ok")
+
+        middleware = ThumbnailChoiceRequestCacheMiddleware(view)
+        middleware(RequestFactory().get("/"))
+        middleware(RequestFactory().get("/"))
+
+        # Once per request, not once per block.
+        assert self.calls.count("choices") == 2
+        assert self.calls.count("thumbnails") == 2
+        assert get_request_cache() is None
+
+    def test_middleware_scopes_async_request(self):
+        async def view(request):
+            assert get_request_cache() == {}
+            return HttpResponse("ok")
+
+        middleware = ThumbnailChoiceRequestCacheMiddleware(view)
+        response = async_to_sync(middleware)(RequestFactory().get("/"))
+
+        assert response.content == b"ok"
+        assert get_request_cache() is None
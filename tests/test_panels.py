@@ -0,0 +1,126 @@
+"""
+Tests for the Django Debug Toolbar panel.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail import blocks
+from wagtail.blocks import BlockWidget
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock, metrics
+from wagtail_thumbnail_choice_block.widgets import ThumbnailRadioSelect
+
+pytest.importorskip("debug_toolbar")
+
+from debug_toolbar.toolbar import DebugToolbar
+
+from wagtail_thumbnail_choice_block.panels import ThumbnailChoicePanel
+
+PANELS = ["wagtail_thumbnail_choice_block.panels.ThumbnailChoicePanel"]
+
+
+@override_settings(DEBUG_TOOLBAR_PANELS=PANELS)
+class TestThumbnailChoicePanel(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._callable_cache.clear()
+        ThumbnailRadioSelect._render_cache.clear()
+        self.request = RequestFactory().get("/admin/pages/1/edit/")
+        self.toolbar = DebugToolbar(self.request, lambda request: HttpResponse())
+        self.panel = self.toolbar.get_panel_by_id(ThumbnailChoicePanel.panel_id)
+
+    def tearDown(self):
+        self.panel.disable_instrumentation()
+        ThumbnailChoiceBlock._callable_cache.clear()
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def collect(self, fn):
+        """Run fn with the panel instrumented and return the recorded stats."""
+        self.panel.enable_instrumentation()
+        try:
+            fn()
+        finally:
+            self.panel.disable_instrumentation()
+        self.panel.generate_stats(self.request, HttpResponse())
+        return self.panel.get_stats()
+
+    @patch("wagtail_thumbnail_choice_block.widgets.render_to_string")
+    def test_lists_each_rendered_block(self, mock_render):
+        """Every block in a rendered StreamField gets one row with its costs."""
+        mock_render.return_value = "<span>icon</span>"
+        icon = ThumbnailChoiceBlock(
+            choices=lambda: [("a", "A"), ("b", "B")],
+            thumbnail_templates={"a": "icon.html", "b": "icon.html"},
+        )
+        colour = ThumbnailChoiceBlock(choices=[("red", "Red")], thumbnails={})
+        stream_block = blocks.StreamBlock([("icon", icon), ("colour", colour)])
+        stream_value = stream_block.to_python(
+            [{"type": "icon", "value": "a"}, {"type": "colour", "value": "red"}]
+        )
+
+        stats = self.collect(
+            lambda: BlockWidget(stream_block).render_with_errors("body", stream_value)
+        )
+
+        rows = {row["name"]: row for row in stats["blocks"]}
+        assert set(rows) == {"icon", "colour"}
+        assert rows["icon"]["options"] == 3  # includes the blank choice
+        assert rows["icon"]["render_cache_misses"] == 1
+        assert rows["icon"]["template_renders"] == 2
+        assert rows["icon"]["callable_time"] > 0
+        # The page editor gets widget state rather than HTML
+        assert rows["icon"]["bytes"] == 0
+        assert rows["icon"]["state_bytes"] > 0
+        assert rows["colour"]["callable_time"] == 0
+        assert stats["total_state_bytes"] == sum(
+            row["state_bytes"] for row in stats["blocks"]
+        )
+
+    def test_records_cache_hits_and_bytes_for_cached_renders(self):
+        block = ThumbnailChoiceBlock(choices=[("a", "A")], thumbnails={})
+        widget = block.field.widget
+        html = widget.render("icon", "a")
+
+        stats = self.collect(lambda: widget.render("icon", "a"))
+
+        (row,) = stats["blocks"]
+        assert row["render_cache_hits"] == 1
+        assert row["render_cache_misses"] == 0
+        assert row["render_time"] == 0
+        assert row["bytes"] == len(html.encode())
+
+    def test_records_widget_state_bytes_apart_from_html(self):
+        block = ThumbnailChoiceBlock(choices=[("a", "A")], thumbnails={})
+        widget = block.field.widget
+
+        stats = self.collect(widget.get_js_state)
+
+        (row,) = stats["blocks"]
+        assert row["bytes"] == 0
+        assert row["state_bytes"] > 0
+        assert stats["total_state_bytes"] == row["state_bytes"]
+        assert "Widget state bytes" in self.panel.content
+
+    def test_ignores_metrics_outside_instrumentation(self):
+        block = ThumbnailChoiceBlock(choices=[("a", "A")], thumbnails={})
+        block.field.widget.render("icon", "a")
+        metrics.incr("render_cache.hit", instance=block.field.widget)
+
+        self.panel.generate_stats(self.request, HttpResponse())
+
+        assert self.panel.get_stats()["blocks"] == []
+
+    def test_content_renders(self):
+        block = ThumbnailChoiceBlock(choices=[("a", "A")], thumbnails={})
+        self.collect(lambda: block.field.widget.render("icon", "a"))
+
+        assert "1 hit / 0 miss" not in self.panel.content
+        assert "0 hit / 1 miss" in self.panel.content
+        assert "1 block in" in self.panel.nav_subtitle
+
+    def test_content_renders_without_blocks(self):
+        self.collect(lambda: None)
+
+        assert "No thumbnail choice blocks were rendered." in self.panel.content
@@ -0,0 +1,206 @@
+"""
+Tests for choice providers and the search-driven widget.
+"""
+
+import json
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.test import RequestFactory, TestCase, override_settings
+
+try:
+    from wagtail.admin.telepath import JSContext
+except ImportError:  # Wagtail < 6.1
+    from wagtail.telepath import JSContext
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.providers import (
+    ChoiceProvider,
+    QuerySetChoiceProvider,
+    get_choice_provider,
+)
+from wagtail_thumbnail_choice_block.views import search
+from wagtail_thumbnail_choice_block.widgets import (
+    ThumbnailRadioSelect,
+    ThumbnailSearchSelect,
+)
+
+
+class GroupProvider(QuerySetChoiceProvider):
+    def get_thumbnail_url(self, obj):
+        return f"/static/groups/{obj.name.lower()}.svg"
+
+
+def make_provider(**kwargs):
+    kwargs.setdefault("value_field", "name")
+    kwargs.setdefault("label_field", "name")
+    return GroupProvider(Group, **kwargs)
+
+
+class TestChoiceProvider(TestCase):
+    def test_incomplete_provider_cannot_be_created(self):
+        class SearchOnlyProvider(ChoiceProvider):
+            def search(self, query, offset, limit):
+                return []
+
+        with self.assertRaises(TypeError):
+            SearchOnlyProvider(name="search-only")
+
+
+class TestQuerySetChoiceProvider(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ("Alpha", "Beta", "Alphabet", "Gamma"):
+            Group.objects.create(name=name)
+
+    def test_default_name(self):
+        assert make_provider().name == "auth.group.name"
+        assert make_provider(name="groups").name == "groups"
+
+    def test_requires_search_fields_or_label_field(self):
+        with self.assertRaises(ImproperlyConfigured):
+            QuerySetChoiceProvider(Group)
+
+    def test_search_icontains(self):
+        choices = make_provider().search("alpha", 0, 10)
+
+        assert choices == [
+            {
+                "value": "Alpha",
+                "label": "Alpha",
+                "thumbnail_url": "/static/groups/alpha.svg",
+            },
+            {
+                "value": "Alphabet",
+                "label": "Alphabet",
+                "thumbnail_url": "/static/groups/alphabet.svg",
+            },
+        ]
+
+    def test_search_page(self):
+        provider = make_provider(page_size=2)
+
+        choices, has_next = provider.search_page("a", 1)
+        assert [choice["value"] for choice in choices] == ["Alpha", "Alphabet"]
+        assert has_next
+
+        # Ordered by the first search field
+        choices, has_next = provider.search_page("a", 2)
+        assert [choice["value"] for choice in choices] == ["Beta", "Gamma"]
+
+    def test_get_is_one_query(self):
+        provider = make_provider()
+
+        with self.assertNumQueries(1):
+            assert provider.get("Beta")["label"] == "Beta"
+        assert provider.get("Delta") is None
+
+    def test_get_invalid_primary_key(self):
+        provider = QuerySetChoiceProvider(Group, label_field="name")
+
+        assert provider.get("not-a-number") is None
+
+    def test_get_many_is_one_query(self):
+        provider = make_provider()
+
+        with self.assertNumQueries(1):
+            choices = provider.get_many(["Beta", "Gamma", "Delta"])
+
+        assert sorted(choices) == ["Beta", "Gamma"]
+
+
+class TestSearchView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ("Alpha", "Beta", "Alphabet"):
+            Group.objects.create(name=name)
+
+    def setUp(self):
+        self.provider = make_provider(name="test-groups", page_size=1)
+        ThumbnailChoiceBlock(choice_provider=self.provider)
+        self.factory = RequestFactory()
+
+    def get(self, **params):
+        response = search(self.factory.get("/", params), "test-groups")
+        return json.loads(response.content)
+
+    def test_search(self):
+        data = self.get(q="alp")
+
+        assert [choice["value"] for choice in data["results"]] == ["Alpha"]
+        assert data["has_next"]
+
+        data = self.get(q="alp", page=2)
+        assert [choice["value"] for choice in data["results"]] == ["Alphabet"]
+        assert not data["has_next"]
+
+    def test_lookup_value(self):
+        assert self.get(value="Beta")["results"][0]["label"] == "Beta"
+        assert self.get(value="Delta")["results"] == []
+
+    def test_unknown_provider(self):
+        from django.http import Http404
+
+        with self.assertRaises(Http404):
+            search(self.factory.get("/"), "missing")
+
+
+@override_settings(ROOT_URLCONF="tests.urls")
+class TestThumbnailChoiceBlockProvider(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Group.objects.create(name="Alpha")
+
+    def setUp(self):
+        self.provider = make_provider()
+        self.block = ThumbnailChoiceBlock(choice_provider=self.provider)
+
+    def test_registers_provider(self):
+        assert get_choice_provider("auth.group.name") is self.provider
+
+    def test_provider_is_exclusive(self):
+        with self.assertRaises(ValueError):
+            ThumbnailChoiceBlock(choices=[("a", "A")], choice_provider=self.provider)
+
+    def test_widget_renders_selection_only(self):
+        Group.objects.create(name="Beta")
+        widget = self.block.field.widget
+
+        assert isinstance(widget, ThumbnailSearchSelect)
+        html = widget.render("icon", "Alpha")
+
+        assert (
+            'data-search-url="/admin/thumbnail-choice/search/auth.group.name/"' in html
+        )
+        assert 'value="Alpha"' in html
+        assert "/static/groups/alpha.svg" in html
+        assert "Beta" not in html
+
+    def test_telepath_render_makes_no_queries(self):
+        with self.assertNumQueries(0):
+            self.block.field.widget.render("__NAME__", None, attrs={"id": "__ID__"})
+
+    def test_widget_media(self):
+        assert str(self.block.field.widget.media) == str(
+            ThumbnailRadioSelect(thumbnail_size=40).media
+        )
+
+    def test_packs_with_own_adapter(self):
+        with self.assertNumQueries(0):
+            packed = JSContext().pack(self.block.field.widget)
+
+        assert packed["_type"] == (
+            "wagtail_thumbnail_choice_block.widgets.ThumbnailSearchSelect"
+        )
+        assert 'name="__NAME__"' in packed["_args"][0]
+
+    def test_clean_validates_through_provider(self):
+        with self.assertNumQueries(1):
+            assert self.block.clean("Alpha") == "Alpha"
+        with self.assertRaises(ValidationError):
+            self.block.clean("Delta")
+        assert self.block.clean("") == ""
+
+    def test_get_thumbnail_url(self):
+        assert self.block.get_thumbnail_url("Alpha") == "/static/groups/alpha.svg"
+        assert self.block.get_thumbnail_url("Delta") == ""
@@ -0,0 +1,200 @@
+"""
+Tests for single-flight cache fills.
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import (
+    ThumbnailChoiceBlock,
+    ThumbnailRadioSelect,
+    metrics,
+)
+from wagtail_thumbnail_choice_block.singleflight import SingleFlight, build_shared
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    },
+}
+
+
+def run_threads(count, target):
+    barrier = threading.Barrier(count)
+    results = []
+
+    def run():
+        barrier.wait()
+        results.append(target())
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(TestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        flights = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        results = run_threads(5, lambda: flights.do("key", compute))
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flights._flights == {}
+
+    def test_waiting_calls_get_the_exception(self):
+        flights = SingleFlight()
+        errors = []
+
+        def compute():
+            time.sleep(0.2)
+            raise ValueError("scan failed")
+
+        def call():
+            try:
+                flights.do("key", compute)
+            except ValueError as error:
+                errors.append(error)
+
+        run_threads(3, call)
+
+        assert len(errors) == 3
+        assert flights._flights == {}
+
+    def test_reentrant_call_does_not_deadlock(self):
+        flights = SingleFlight()
+
+        assert flights.do("key", lambda: flights.do("key", lambda: 1) + 1) == 2
+
+
+@override_settings(CACHES=CACHES)
+class TestBuildShared(TestCase):
+    def setUp(self):
+        self.cache = caches["shared"]
+        self.cache.clear()
+        self.options = {"timeout": 60, "version": None, "lock_timeout": 1}
+
+    def test_without_lock(self):
+        options = {**self.options, "lock_timeout": None}
+
+        assert build_shared(self.cache, "key", lambda: "built", options) == "built"
+        assert self.cache.get("key") == "built"
+
+    def test_builds_and_releases_lock(self):
+        assert build_shared(self.cache, "key", lambda: "built", self.options) == (
+            "built"
+        )
+        assert self.cache.get("key") == "built"
+        assert self.cache.get("key:lock") is None
+
+    def test_waits_for_lock_holder(self):
+        self.cache.add("key:lock", 1)
+        timer = threading.Timer(0.1, lambda: self.cache.set("key", "theirs"))
+        timer.start()
+
+        try:
+            result = build_shared(self.cache, "key", lambda: "mine", self.options)
+        finally:
+            timer.join()
+
+        assert result == "theirs"
+
+    def test_builds_when_lock_expires(self):
+        self.cache.add("key:lock", 1, timeout=0.2)
+        options = {**self.options, "lock_timeout": 0.2}
+
+        assert build_shared(self.cache, "key", lambda: "mine", options) == "mine"
+
+    @override_settings(
+        WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE={"CACHE": "shared", "LOCK_TIMEOUT": 5}
+    )
+    def test_widget_render_uses_lock(self):
+        block = ThumbnailChoiceBlock(
+            choices=[("sun", "Sun")], thumbnails={"sun": "/static/sun.svg"}
+        )
+        widget = block.field.widget
+        ThumbnailRadioSelect._render_cache.clear()
+
+        with patch.object(self.cache, "add", wraps=self.cache.add) as mock_add:
+            widget.render("icon", "sun")
+
+        assert mock_add.call_args.args[0].endswith(":lock")
+
+
+class TestConcurrentColdStarts(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        icons_dir = Path(self.tmp_dir) / "icons"
+        icons_dir.mkdir()
+        (icons_dir / "sun.svg").write_text("<svg/>")
+        self.settings = override_settings(STATICFILES_DIRS=[self.tmp_dir])
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+    def test_one_scan_for_concurrent_blocks(self):
+        scans = []
+        original_scan = ThumbnailChoiceBlock._scan_directory
+
+        def slow_scan(block):
+            scans.append(1)
+            time.sleep(0.2)
+            return original_scan(block)
+
+        with patch.object(ThumbnailChoiceBlock, "_scan_directory", slow_scan):
+            blocks = run_threads(
+                4, lambda: ThumbnailChoiceBlock(thumbnail_directory="icons")
+            )
+
+        assert len(scans) == 1
+        assert all(block._choices_source == [("sun", "Sun")] for block in blocks)
+
+    def test_one_render_for_concurrent_widgets(self):
+        block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+        widget = block.field.widget
+        ThumbnailRadioSelect._render_cache.clear()
+        events = []
+        renders = []
+
+        def record(sender, name, **kwargs):
+            events.append(name)
+
+        metrics.metric_recorded.connect(record)
+        try:
+            original_render = type(widget)._render_uncached
+
+            def slow_render(self, *args):
+                renders.append(1)
+                time.sleep(0.2)
+                return original_render(self, *args)
+
+            with patch.object(type(widget), "_render_uncached", slow_render):
+                html = run_threads(4, lambda: widget.render("icon-unique", "sun"))
+        finally:
+            metrics.metric_recorded.disconnect(record)
+
+        assert len(set(html)) == 1
+        assert len(renders) == 1
+        assert events.count("single_flight.wait") == 3
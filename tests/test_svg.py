@@ -0,0 +1,286 @@
+"""
+Tests for inlining small SVG thumbnails.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from urllib.parse import unquote
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.test import TestCase, override_settings
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.frozen import scan_key
+from wagtail_thumbnail_choice_block.svg import (
+    current_color_svg,
+    get_static_svg,
+    is_safe_markup,
+    minify_svg,
+    svg_data_uri,
+)
+from wagtail_thumbnail_choice_block.widgets import ThumbnailRadioSelect
+
+INKSCAPE_SVG = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!-- Created with Inkscape (http://www.inkscape.org/) -->
+<svg
+   xmlns="http://www.w3.org/2000/svg"
+   xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+   xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"
+   viewBox="0 0 24 24"
+   inkscape:version="1.3"
+   sodipodi:docname="sun.svg">
+  <metadata id="metadata1"><rdf:RDF><cc:Work rdf:about=""/></rdf:RDF></metadata>
+  <sodipodi:namedview id="base" pagecolor="#ffffff" />
+  <title>Sun</title>
+  <circle cx="12" cy="12" r="5"
+     inkscape:label="disc" />
+</svg>
+"""
+
+SUN_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">'
+    '<title>Sun</title><circle cx="12" cy="12" r="5" /></svg>'
+)
+
+
+class TestMinifySvg(TestCase):
+    def test_strips_editor_data(self):
+        assert minify_svg(INKSCAPE_SVG) == SUN_SVG
+
+    def test_keeps_text_content(self):
+        assert minify_svg("<svg>\n  <text>Hello  world</text>\n</svg>") == (
+            "<svg><text>Hello world</text></svg>"
+        )
+
+    def test_data_uri_round_trips(self):
+        uri = svg_data_uri(SUN_SVG)
+
+        assert uri.startswith("data:image/svg+xml,")
+        assert "<" not in uri and '"' not in uri and "#" not in uri
+        assert unquote(uri[len("data:image/svg+xml,") :]) == SUN_SVG
+
+    def test_is_safe_markup(self):
+        assert is_safe_markup(SUN_SVG)
+        assert not is_safe_markup("<svg><script>alert(1)</script></svg>")
+        assert not is_safe_markup('<svg onload="alert(1)"></svg>')
+        assert not is_safe_markup('<svg><a href="javascript:alert(1)"/></svg>')
+        assert not is_safe_markup("<svg><style>path{fill:red}</style></svg>")
+        assert not is_safe_markup('<svg><clipPath id="clip0"/></svg>')
+
+
+class TestCurrentColorSvg(TestCase):
+    def test_repaints_single_color(self):
+        assert current_color_svg(
+            '<svg viewBox="0 0 2 2"><path fill="#000"/>'
+            '<path style="fill: black; stroke:#000000" fill-opacity=".5"/></svg>'
+        ) == (
+            '<svg viewBox="0 0 2 2" fill="currentColor"><path fill="currentColor"/>'
+            '<path style="fill: currentColor; stroke:currentColor" fill-opacity=".5"/>'
+            "</svg>"
+        )
+
+    def test_default_fill(self):
+        assert current_color_svg("<svg><path/></svg>") == (
+            '<svg fill="currentColor"><path/></svg>'
+        )
+
+    def test_keeps_unpainted_values(self):
+        assert current_color_svg('<svg fill="none" stroke="#333"><path/></svg>') == (
+            '<svg fill="none" stroke="currentColor"><path/></svg>'
+        )
+
+    def test_rejects_multicolor(self):
+        assert (
+            current_color_svg('<svg><path fill="red"/><path fill="blue"/></svg>')
+            is None
+        )
+        assert current_color_svg('<svg><path fill="url(#g)"/></svg>') is None
+        assert current_color_svg('<svg><image href="a.png"/></svg>') is None
+
+
+class InlineSvgTestCase(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.icons_dir = Path(self.tmp_dir) / "icons"
+        self.icons_dir.mkdir()
+        (self.icons_dir / "sun.svg").write_text(INKSCAPE_SVG)
+        (self.icons_dir / "moon.png").write_bytes(b"\x89PNG")
+        (self.icons_dir / "big.svg").write_text(
+            '<svg><path d="%s"/></svg>' % ("M0 0" * 1000)
+        )
+        self.settings = override_settings(STATICFILES_DIRS=[self.tmp_dir])
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+
+
+class TestDirectoryInlining(InlineSvgTestCase):
+    def make_block(self, **kwargs):
+        return ThumbnailChoiceBlock(
+            thumbnail_directory="icons", thumbnail_inline_svg_max_bytes=2048, **kwargs
+        )
+
+    def test_scan_minifies_small_svgs(self):
+        block = self.make_block()
+
+        inline = {item["value"]: item.get("inline_svg") for item in block._tree_items}
+        assert inline == {"big": None, "moon": None, "sun": SUN_SVG}
+
+    def test_data_uri_replaces_url(self):
+        widget = self.make_block().field.widget
+
+        assert widget.thumbnail_mapping["sun"] == svg_data_uri(SUN_SVG)
+        assert widget.thumbnail_mapping["big"] == "/static/icons/big.svg"
+        assert widget.thumbnail_mapping["moon"] == "/static/icons/moon.png"
+        assert widget.thumbnail_html_mapping == {}
+
+    def test_block_urls_are_unchanged(self):
+        block = self.make_block()
+
+        assert block.get_thumbnail_url("sun") == "/static/icons/sun.svg"
+
+    def test_markup(self):
+        block = self.make_block(thumbnail_inline_svg_format="markup")
+        widget = block.field.widget
+
+        assert widget.thumbnail_html_mapping == {"sun": SUN_SVG}
+        assert "sun" not in widget.thumbnail_mapping
+
+        html = widget.render("icon", "sun")
+        assert SUN_SVG in html
+        assert "/static/icons/sun.svg" not in html
+
+        state = widget.get_js_state()
+        assert state["fragments"] == [SUN_SVG]
+
+    def test_markup_survives_form_state(self):
+        block = self.make_block(thumbnail_inline_svg_format="markup")
+        block.get_form_state("sun")
+
+        assert block.field.widget.thumbnail_html_mapping == {"sun": SUN_SVG}
+
+    def test_one_color_data_uri_keeps_mask(self):
+        widget = self.make_block(thumbnail_is_one_color=True).field.widget
+
+        assert widget.thumbnail_html_mapping == {}
+        assert widget.thumbnail_mapping["sun"] == svg_data_uri(SUN_SVG)
+
+    def test_one_color_markup_is_repainted(self):
+        (self.icons_dir / "two-tone.svg").write_text(
+            '<svg><path fill="red"/><path fill="blue"/></svg>'
+        )
+        widget = self.make_block(
+            thumbnail_inline_svg_format="markup", thumbnail_is_one_color=True
+        ).field.widget
+
+        assert widget.thumbnail_html_mapping == {"sun": current_color_svg(SUN_SVG)}
+        assert widget.thumbnail_mapping["two-tone"].startswith("data:image/svg+xml,")
+
+        html = widget.render("icon", "sun")
+        assert current_color_svg(SUN_SVG) in html
+        # Masks for big.svg, moon.png and two-tone.svg only
+        assert html.count("--thumbnail-mask") == 3
+
+    def test_unsafe_markup_uses_data_uri(self):
+        (self.icons_dir / "sun.svg").write_text(
+            '<svg onload="alert(1)"><circle r="5"/></svg>'
+        )
+        widget = self.make_block(thumbnail_inline_svg_format="markup").field.widget
+
+        assert widget.thumbnail_html_mapping == {}
+        assert widget.thumbnail_mapping["sun"].startswith("data:image/svg+xml,")
+
+    def test_markup_with_ids_uses_data_uri(self):
+        for name, radius in (("badge", 4), ("star", 6)):
+            (self.icons_dir / f"{name}.svg").write_text(
+                f'<svg><clipPath id="clip0"><circle r="{radius}"/></clipPath>'
+                '<rect clip-path="url(#clip0)" width="24" height="24"/></svg>'
+            )
+        widget = self.make_block(thumbnail_inline_svg_format="markup").field.widget
+
+        assert widget.thumbnail_html_mapping == {"sun": SUN_SVG}
+        assert widget.thumbnail_mapping["badge"].startswith("data:image/svg+xml,")
+        assert widget.thumbnail_mapping["star"].startswith("data:image/svg+xml,")
+        assert 'id="clip0"' not in widget.render("icon", "sun")
+
+    def test_scan_cache_is_keyed_on_limit(self):
+        self.make_block()
+        ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+        assert len(ThumbnailChoiceBlock._scan_cache) == 2
+
+    def test_frozen_scan_key(self):
+        assert scan_key("icons", None, None, None) == "icons|||"
+        assert scan_key("icons", None, None, None, inline_svg_max_bytes=2048) == (
+            "icons||||inline_svg_max_bytes=2048"
+        )
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            self.make_block(thumbnail_inline_svg_format="base64")
+
+    def test_storage(self):
+        storage = InMemoryStorage(base_url="https://cdn.example.com/")
+        storage.save("icons/sun.svg", ContentFile(INKSCAPE_SVG.encode()))
+
+        block = self.make_block(thumbnail_directory_storage=storage)
+
+        assert block._tree_items[0]["inline_svg"] == SUN_SVG
+
+
+class TestStaticThumbnailInlining(InlineSvgTestCase):
+    def test_static_thumbnails(self):
+        block = ThumbnailChoiceBlock(
+            choices=[("sun", "Sun"), ("big", "Big"), ("remote", "Remote")],
+            thumbnails={
+                "sun": "/static/icons/sun.svg",
+                "big": "/static/icons/big.svg",
+                "remote": "https://example.com/sun.svg",
+            },
+            thumbnail_inline_svg_max_bytes=2048,
+        )
+        mapping = block.field.widget.thumbnail_mapping
+
+        assert mapping["sun"] == svg_data_uri(SUN_SVG)
+        assert mapping["big"] == "/static/icons/big.svg"
+        assert mapping["remote"] == "https://example.com/sun.svg"
+
+    def test_static_svgs_are_read_once(self):
+        assert get_static_svg("/static/icons/sun.svg", 2048) == SUN_SVG
+
+        (self.icons_dir / "sun.svg").write_text("<svg/>")
+        assert get_static_svg("/static/icons/sun.svg", 2048) == SUN_SVG
+
+    def test_widget_mapping_is_reused(self):
+        thumbnails = {"sun": "/static/icons/sun.svg"}
+        block = ThumbnailChoiceBlock(
+            choices=[("sun", "Sun")],
+            thumbnails=thumbnails,
+            thumbnail_inline_svg_max_bytes=2048,
+        )
+        mapping = block.field.widget.thumbnail_mapping
+        block.get_form_state("sun")
+
+        assert block.field.widget.thumbnail_mapping is mapping
+
+
+class TestThumbnailHtmlMapping(TestCase):
+    def test_template_html_takes_precedence(self):
+        widget = ThumbnailRadioSelect(
+            choices=[("a", "A"), ("b", "B")],
+            thumbnail_template_mapping={"a": "missing.html"},
+            thumbnail_html_mapping={"a": "<svg>a</svg>", "b": "<svg>b</svg>"},
+            thumbnail_size=40,
+        )
+
+        html = widget.render("icon", "a")
+
+        # A template that fails to render falls back to the HTML mapping
+        assert "<svg>a</svg>" in html
+        assert "<svg>b</svg>" in html
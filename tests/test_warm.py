@@ -0,0 +1,176 @@
+"""
+Tests for the shared render cache and the thumbnail_choice_warm command.
+"""
+
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import models
+from django.test import TestCase, override_settings
+from django.utils import translation
+from wagtail import blocks
+from wagtail.fields import StreamField
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+from wagtail_thumbnail_choice_block.blocks import iter_thumbnail_choice_blocks
+from wagtail_thumbnail_choice_block.discovery import (
+    find_thumbnail_choice_blocks,
+)
+from wagtail_thumbnail_choice_block.widgets import ThumbnailRadioSelect
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "renders": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "renders",
+    },
+}
+RENDER_CACHE = {"CACHE": "renders", "VERSION": 2}
+
+ICON_BLOCK = ThumbnailChoiceBlock(choices=[("a", "A"), ("b", "B")], thumbnails={})
+
+
+class IconPage(models.Model):
+    body = StreamField(
+        [
+            ("icon", ICON_BLOCK),
+            (
+                "hero",
+                blocks.StructBlock(
+                    [
+                        ("icons", blocks.ListBlock(ICON_BLOCK)),
+                        ("title", blocks.CharBlock()),
+                    ]
+                ),
+            ),
+        ],
+        use_json_field=True,
+    )
+
+    class Meta:
+        abstract = True
+        app_label = "tests"
+
+
+class TestIterThumbnailChoiceBlocks(TestCase):
+    def test_walks_nested_block_definitions(self):
+        stream_block = IconPage._meta.get_field("body").stream_block
+
+        found = list(iter_thumbnail_choice_blocks(stream_block, "body"))
+
+        assert [path for path, _block in found] == ["body.icon", "body.hero.icons"]
+        assert all(block is ICON_BLOCK for _path, block in found)
+
+    def test_find_lists_shared_blocks_once(self):
+        found = find_thumbnail_choice_blocks([IconPage])
+
+        assert found == [("tests.IconPage.body.icon", ICON_BLOCK)]
+
+
+@override_settings(CACHES=CACHES)
+class TestSharedRenderCache(TestCase):
+    def setUp(self):
+        ThumbnailRadioSelect._render_cache.clear()
+        caches["renders"].clear()
+
+    def tearDown(self):
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def make_widget(self, labels=("A", "B")):
+        return ThumbnailRadioSelect(
+            choices=list(zip(("a", "b"), labels)), thumbnail_size=40
+        )
+
+    def test_not_used_by_default(self):
+        self.make_widget().render("icon", "a")
+
+        assert ThumbnailRadioSelect._render_cache
+        assert not caches["renders"]._cache
+
+    @override_settings(WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE=RENDER_CACHE)
+    def test_local_miss_is_served_from_shared_cache(self):
+        html = self.make_widget().render("icon", "a")
+        # Another process starts with an empty per-process cache.
+        ThumbnailRadioSelect._render_cache.clear()
+
+        with patch.object(ThumbnailRadioSelect, "_render_uncached") as mock_render:
+            assert self.make_widget().render("icon", "a") == html
+        mock_render.assert_not_called()
+
+    @override_settings(WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE=RENDER_CACHE)
+    def test_shared_key_includes_labels_and_version(self):
+        widget = self.make_widget()
+        key = widget.render_cache_key("icon", "a")
+        widget.render("icon", "a")
+
+        relabelled = self.make_widget(labels=("Alpha", "Beta"))
+        assert relabelled.render_cache_key("icon", "a") == key
+        assert relabelled.shared_render_cache_key(
+            key
+        ) != widget.shared_render_cache_key(key)
+        assert caches["renders"].get(widget.shared_render_cache_key(key)) is None
+        assert caches["renders"].get(widget.shared_render_cache_key(key), version=2)
+
+
+@override_settings(CACHES=CACHES)
+class TestThumbnailChoiceWarmCommand(TestCase):
+    def setUp(self):
+        ThumbnailChoiceBlock._scan_cache.clear()
+        ThumbnailRadioSelect._render_cache.clear()
+        caches["renders"].clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        icons_dir = Path(self.tmp_dir) / "icons"
+        icons_dir.mkdir()
+        (icons_dir / "sun.svg").write_text("<svg/>")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        ThumbnailChoiceBlock._scan_cache.clear()
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def call(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        with patch(
+            "wagtail_thumbnail_choice_block.management.commands."
+            "thumbnail_choice_warm.get_stream_field_models",
+            return_value=[IconPage],
+        ):
+            call_command("thumbnail_choice_warm", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    @override_settings(WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE=RENDER_CACHE)
+    def test_prerenders_into_shared_cache(self):
+        stdout, stderr = self.call("--language", "en", "--language", "fr")
+
+        assert "tests.IconPage.body.icon: choices, 3 options" in stdout  # with blank
+        assert "Warmed 1 block(s) in 2 language(s)" in stdout
+        assert stderr == ""
+        # One entry per language, as Wagtail's telepath adapter sends it.
+        widget = ICON_BLOCK.field.widget
+        for language in ("en", "fr"):
+            with translation.override(language):
+                key = widget.js_state_cache_key()
+            assert caches["renders"].get(widget.shared_render_cache_key(key), version=2)
+
+    def test_warns_without_shared_cache(self):
+        _stdout, stderr = self.call()
+
+        assert "WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE is not set" in stderr
+
+    def test_reports_directory_blocks(self):
+        with override_settings(STATICFILES_DIRS=[self.tmp_dir]):
+            block = ThumbnailChoiceBlock(thumbnail_directory="icons")
+
+        with patch(
+            "wagtail_thumbnail_choice_block.management.commands."
+            "thumbnail_choice_warm.find_thumbnail_choice_blocks",
+            return_value=[("tests.IconPage.body.icon", block)],
+        ):
+            stdout, _stderr = self.call()
+
+        assert "tests.IconPage.body.icon: icons, 2 options" in stdout
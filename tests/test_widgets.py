@@ -2,10 +2,19 @@
 Tests for ThumbnailRadioSelect widget.
 """
 
-from unittest.mock import patch
+import json
+from unittest.mock import Mock, patch
 
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
 from django.test import TestCase
+from wagtail import blocks
 
+try:
+    from wagtail.admin.telepath import JSContext
+except ImportError:  # Wagtail < 6.1
+    from wagtail.telepath import JSContext
+
+from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
 from wagtail_thumbnail_choice_block.widgets import (
     ThumbnailRadioSelect,
     _css_escape_single_quoted,
@@ -939,3 +948,227 @@ class TestThumbnailRadioSelectTreeItems(TestCase):
 
         assert len(ThumbnailRadioSelect._render_cache) == 1
         assert html1 == html2
+
+
+class TestThumbnailRadioSelectStreaming(TestCase):
+    """iter_render must produce the same markup as the template."""
+
+    def setUp(self):
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def tearDown(self):
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def assert_streams_like_template(self, widget, value, attrs=None):
+        streamed = "".join(widget.iter_render("icon", value, attrs))
+        widget.streaming_render = False
+        rendered = widget.render("icon", value, attrs)
+
+        self.assertHTMLEqual(streamed, rendered)
+
+    def test_flat_choices(self):
+        widget = ThumbnailRadioSelect(
+            choices=[("", "---"), ("a", "A & <b>"), (2, 'Two "quoted"')],
+            thumbnail_mapping={"a": "/a.svg", 2: "/it's.svg"},
+            thumbnail_size=40,
+        )
+
+        self.assert_streams_like_template(widget, "a", {"id": "icon-id"})
+        self.assert_streams_like_template(widget, "2")
+        self.assert_streams_like_template(widget, "")
+
+    def test_tree_items(self):
+        widget = ThumbnailRadioSelect(
+            choices=[("", "---"), ("arrows/left", "Left")],
+            thumbnail_mapping={"arrows/left": "/left.svg"},
+            thumbnail_size=24,
+            thumbnail_is_one_color=True,
+            tree_items=[
+                {"type": "heading", "label": "Arrows", "depth": 0},
+                {
+                    "type": "option",
+                    "label": "Left",
+                    "depth": 1,
+                    "value": "arrows/left",
+                    "thumbnail_url": "/left.svg",
+                },
+            ],
+        )
+
+        self.assert_streams_like_template(widget, "arrows/left", {"id": "icon-id"})
+
+    def test_thumbnail_metadata(self):
+        widget = ThumbnailRadioSelect(
+            choices=[("sun", "Sun"), ("moon", "Moon")],
+            thumbnail_mapping={"sun": "/sun.png", "moon": "/moon.svg"},
+            thumbnail_metadata_mapping={
+                "sun": {"width": 64, "height": 48, "placeholder": "#a1b2c3"},
+                "moon": {"width": 24.5, "height": 24},
+            },
+            thumbnail_size=40,
+        )
+
+        self.assert_streams_like_template(widget, "sun", {"id": "icon-id"})
+        html = widget.render("icon", "sun")
+        assert 'width="64" height="48"' in html
+        assert "--thumbnail-placeholder: #a1b2c3;" in html
+
+    def test_thumbnail_templates(self):
+        widget = ThumbnailRadioSelect(
+            choices=[("star", "Star"), ("check", "Check")],
+            thumbnail_mapping={"star": "/star.svg"},
+            thumbnail_template_mapping={"star": "test_icon.html"},
+            thumbnail_size=40,
+        )
+
+        with patch(
+            "wagtail_thumbnail_choice_block.widgets.render_to_string",
+            return_value='<svg class="star"></svg>',
+        ):
+            self.assert_streams_like_template(widget, "check", {"id": "icon-id"})
+
+    def test_render_streams_by_default(self):
+        widget = ThumbnailRadioSelect(choices=[("a", "A")], thumbnail_size=40)
+
+        with patch.object(
+            ThumbnailRadioSelect, "iter_render", wraps=widget.iter_render
+        ) as mock_iter_render:
+            widget.render("icon", "a")
+
+        assert mock_iter_render.called
+
+    def test_overridden_template_is_rendered(self):
+        class CustomWidget(ThumbnailRadioSelect):
+            template_name = "custom/thumbnail_radio_select.html"
+
+        widget = CustomWidget(choices=[("a", "A")], thumbnail_size=40)
+
+        assert not widget._can_stream(None)
+
+    def test_stream_probe_only_hides_missing_templates(self):
+        widget = ThumbnailRadioSelect(choices=[("a", "A")], thumbnail_size=40)
+        renderer = Mock()
+
+        renderer.get_template.side_effect = TemplateDoesNotExist("missing")
+        assert not widget._can_stream(renderer)
+
+        renderer.get_template.side_effect = TemplateSyntaxError("broken")
+        with self.assertRaises(TemplateSyntaxError):
+            widget._can_stream(renderer)
+
+
+class TestThumbnailRadioSelectAdapter(TestCase):
+    """The Telepath adapter ships get_js_state() instead of rendered HTML."""
+
+    def setUp(self):
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def tearDown(self):
+        ThumbnailRadioSelect._render_cache.clear()
+
+    def make_widget(self, **kwargs):
+        kwargs.setdefault("thumbnail_size", 32)
+        return ThumbnailRadioSelect(
+            choices=[("", "---"), ("left", "Left"), ("right", "Right"), ("up", "Up")],
+            thumbnail_mapping={
+                "left": "/static/icons/arrows/left.svg",
+                "right": "/static/icons/arrows/right.svg",
+            },
+            thumbnail_template_mapping={"up": "up.html"},
+            thumbnail_is_one_color=True,
+            tree_items=[
+                {"type": "heading", "label": "Arrows", "depth": 0},
+                {"type": "option", "label": "Left", "depth": 1, "value": "left"},
+                {"type": "option", "label": "Right", "depth": 1, "value": "right"},
+                {"type": "option", "label": "Up", "depth": 0, "value": "up"},
+            ],
+            **kwargs,
+        )
+
+    def test_packs_compact_state(self):
+        with patch(
+            "wagtail_thumbnail_choice_block.widgets.render_to_string",
+            return_value="<svg></svg>",
+        ):
+            packed = JSContext().pack(self.make_widget())
+
+        assert packed["_type"] == (
+            "wagtail_thumbnail_choice_block.widgets.ThumbnailRadioSelect"
+        )
+        assert packed["_args"] == [
+            {
+                "size": 32,
+                "attrs": {"class": "one-color-icons"},
+                "placeholder": "Select an option...",
+                "noResults": "No matching options found.",
+                "urlPrefix": "/static/icons/arrows/",
+                "urls": ["left.svg", "right.svg"],
+                "fragments": ["<svg></svg>"],
+                "images": [],
+                "options": [
+                    ["", "---"],
+                    [None, "Arrows", 0],
+                    ["left", "Left", 1, 0],
+                    ["right", "Right", 1, 1],
+                    ["up", "Up", 0, None, 0],
+                ],
+            }
+        ]
+
+    def test_image_metadata(self):
+        widget = self.make_widget()
+        widget.thumbnail_metadata_mapping = {
+            "left": {"width": 24, "height": 24},
+            "right": {"width": 24, "height": 24},
+            "up": {"width": 16, "height": 16, "placeholder": "#000000"},
+        }
+
+        with patch(
+            "wagtail_thumbnail_choice_block.widgets.render_to_string",
+            return_value="<svg></svg>",
+        ):
+            state = widget.get_js_state()
+
+        assert state["images"] == [[24, 24], [16, 16, "#000000"]]
+        assert state["options"][2:] == [
+            ["left", "Left", 1, 0, None, 0],
+            ["right", "Right", 1, 1, None, 0],
+            ["up", "Up", 0, None, 0, 1],
+        ]
+
+    def test_state_is_cached(self):
+        with patch.object(
+            ThumbnailRadioSelect,
+            "_build_js_state",
+            autospec=True,
+            side_effect=lambda widget: ({}, 2),
+        ) as mock_build:
+            self.make_widget().get_js_state()
+            self.make_widget().get_js_state()
+
+        assert mock_build.call_count == 1
+
+    def test_state_is_cached_per_size_and_attrs(self):
+        with patch(
+            "wagtail_thumbnail_choice_block.widgets.render_to_string",
+            return_value="<svg></svg>",
+        ):
+            small = self.make_widget(thumbnail_size=40).get_js_state()
+            large = self.make_widget(thumbnail_size=80).get_js_state()
+            labelled = self.make_widget(
+                thumbnail_size=80, attrs={"aria-label": "Icon"}
+            ).get_js_state()
+
+        assert small["size"] == 40
+        assert large["size"] == 80
+        assert labelled["attrs"]["aria-label"] == "Icon"
+        assert "aria-label" not in large["attrs"]
+
+    def test_block_definition_does_not_render_html(self):
+        block = ThumbnailChoiceBlock(choices=[("a", "A")], thumbnails={"a": "/a.svg"})
+
+        with patch.object(ThumbnailRadioSelect, "render") as mock_render:
+            packed = JSContext().pack(blocks.StreamBlock([("icon", block)]))
+
+        mock_render.assert_not_called()
+        assert "thumbnail-radio-select" not in json.dumps(packed)
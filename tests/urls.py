@@ -0,0 +1,9 @@
+"""
+URLs for tests that render or call the package's admin views.
+"""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path("admin/thumbnail-choice/", include("wagtail_thumbnail_choice_block.urls")),
+]
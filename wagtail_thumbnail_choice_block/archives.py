@@ -0,0 +1,206 @@
+"""
+Zip icon packs for Wagtail Thumbnail Choice Block.
+
+ZipArchiveStorage is a read-only Django Storage over a zip file, for use as a
+thumbnail_directory_storage, so icon packs can be used without extracting
+them into a static directory:
+
+    icon_pack = ZipArchiveStorage(BASE_DIR / "icon-packs/icons-2.3.zip", "icons")
+
+    ThumbnailChoiceBlock(
+        thumbnail_directory="icons", thumbnail_directory_storage=icon_pack
+    )
+
+The archive is memory-mapped and its central directory read once, on first
+use, so listing the tree costs no further I/O and reading a file only touches
+(and, if it is deflated, inflates) that file's bytes. Files are served by
+views.archive_file with an ETag and a year-long max-age; their URLs carry the
+file's CRC-32, so they change whenever the file does.
+"""
+
+import mmap
+import os
+import posixpath
+import struct
+import threading
+import zipfile
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.urls import reverse
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import lazy
+
+# Local file header: signature, then the name and extra field lengths at 26
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+
+_registry = {}
+
+
+def get_archive(name):
+    """Return the ZipArchiveStorage registered as `name`, or None."""
+    return _registry.get(name)
+
+
+@deconstructible
+class ZipArchiveStorage(Storage):
+    """
+    A read-only storage of the files in a zip archive. Files must be stored
+    or deflated, the methods every zip tool supports.
+
+    Args:
+        path: The path of the zip file
+        name: The name the archive is registered under. Must be unique and the
+              same in every process (it appears in the archive's URLs).
+        base_url: Optional URL that views.archive_file is mounted at for this
+                  archive, e.g. "/icon-packs/icons/" (see the README). Defaults
+                  to the Wagtail admin's URL for it, which only admin users can
+                  load.
+    """
+
+    def __init__(self, path, name, base_url=None):
+        self.path = Path(path)
+        self.location = str(path)
+        self.name = name
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._archive = None
+        _registry[name] = self
+
+    def _load(self):
+        """
+        Return (mapping, members, directories, modified time), mapping the
+        archive and reading its central directory on first use. members is
+        {name: ZipInfo} and directories {name: (subdirectory names, file names)}.
+        """
+        if self._archive is None:
+            with self._lock:
+                if self._archive is None:
+                    self._archive = self._read_archive()
+        return self._archive
+
+    def _read_archive(self):
+        with self.path.open("rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            modified_time = os.fstat(f.fileno()).st_mtime
+        members = {}
+        directories = {"": (set(), [])}
+        with zipfile.ZipFile(mapping) as archive:
+            for info in archive.infolist():
+                name = info.filename.strip("/")
+                parent = ""
+                for part in name.split("/")[:-1]:
+                    path = posixpath.join(parent, part)
+                    directories[parent][0].add(part)
+                    directories.setdefault(path, (set(), []))
+                    parent = path
+                if info.is_dir():
+                    directories[parent][0].add(posixpath.basename(name))
+                    directories.setdefault(name, (set(), []))
+                else:
+                    directories[parent][1].append(posixpath.basename(name))
+                    members[name] = info
+        directories = {
+            path: (sorted(dirs), sorted(files))
+            for path, (dirs, files) in directories.items()
+        }
+        return mapping, members, directories, modified_time
+
+    @staticmethod
+    def _clean_name(name):
+        name = str(name).strip("/")
+        return posixpath.normpath(name) if name else ""
+
+    def _member(self, name):
+        info = self._load()[1].get(self._clean_name(name))
+        if info is None:
+            raise FileNotFoundError(f"'{name}' is not in {self.location}.")
+        return info
+
+    def read(self, name):
+        """Return the contents of the file `name`."""
+        info = self._member(name)
+        mapping = self._load()[0]
+        offset = info.header_offset
+        signature, name_length, extra_length = _LOCAL_HEADER.unpack_from(
+            mapping, offset
+        )
+        if signature != b"PK\x03\x04":
+            raise OSError(f"'{name}' has a corrupt header in {self.location}.")
+        start = offset + _LOCAL_HEADER.size + name_length + extra_length
+        data = mapping[start : start + info.compress_size]
+        if info.compress_type == zipfile.ZIP_STORED:
+            return data
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+        raise OSError(
+            f"'{name}' in {self.location} uses an unsupported compression method."
+        )
+
+    def etag(self, name):
+        """Return the ETag of the file `name`, from its CRC-32 and size."""
+        info = self._member(name)
+        return f'"{info.CRC:08x}-{info.file_size}"'
+
+    def _open(self, name, mode="rb"):
+        if "w" in mode or "a" in mode or "+" in mode:
+            raise OSError("ZipArchiveStorage is read-only.")
+        return ContentFile(self.read(name), name=name)
+
+    def _save(self, name, content):
+        raise NotImplementedError("ZipArchiveStorage is read-only.")
+
+    def delete(self, name):
+        raise NotImplementedError("ZipArchiveStorage is read-only.")
+
+    def exists(self, name):
+        _mapping, members, directories, _modified_time = self._load()
+        name = self._clean_name(name)
+        return name in members or name in directories
+
+    def listdir(self, path):
+        directories = self._load()[2]
+        try:
+            dirs, files = directories[self._clean_name(path)]
+        except KeyError:
+            raise FileNotFoundError(f"'{path}' is not in {self.location}.") from None
+        return list(dirs), list(files)
+
+    def size(self, name):
+        return self._member(name).file_size
+
+    def get_modified_time(self, name):
+        self._member(name)
+        modified_time = self._load()[3]
+        return datetime.fromtimestamp(
+            modified_time, tz=timezone.utc if settings.USE_TZ else None
+        )
+
+    def url(self, name):
+        """
+        Return the URL of the file `name`. Without a base_url it is resolved
+        through the URLconf, which may not be loadable yet when a block
+        declared in a models.py scans the archive, so the URL is returned as a
+        lazy string and only resolved when it is first used.
+        """
+        if self.base_url is not None:
+            return self._url(name)
+        return lazy(self._url, str)(name)
+
+    def _url(self, name):
+        name = self._clean_name(name)
+        if self.base_url is not None:
+            url = f"{self.base_url.rstrip('/')}/{quote(name)}"
+        else:
+            url = reverse(
+                "wagtail_thumbnail_choice_block:archive_file", args=[self.name, name]
+            )
+        info = self._load()[1].get(name)
+        if info is None:
+            return url
+        return f"{url}?v={info.CRC:08x}"
@@ -2,24 +2,41 @@
 Block classes for Wagtail Thumbnail Choice Block.
 """
 
+import asyncio
+import inspect
 import posixpath
-from pathlib import Path
+import time
+from pathlib import Path, PurePosixPath
+from typing import ClassVar
 
+from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import storages
+from django.utils.encoding import force_str
+from django.utils.safestring import mark_safe
 from wagtail import blocks
-
-from .widgets import ThumbnailRadioSelect
+from wagtail.blocks import StreamValue
+
+from . import digests, metrics, svg
+from .cache import get_request_cache
+from .fields import ThumbnailChoiceField
+from .finders import find_static_directory
+from .frozen import callable_key, get_frozen_scan, scan_key
+from .listing import is_pruned, list_storage_directory, match_patterns
+from .metadata import image_metadata
+from .providers import register_choice_provider
+from .singleflight import SingleFlight
+from .widgets import (
+    ThumbnailRadioSelect,
+    ThumbnailSearchSelect,
+    render_thumbnail_template,
+)
 
 IMAGE_EXTENSIONS = {".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp"}
 
 
 class ThumbnailChoiceBlock(blocks.ChoiceBlock):
-    # Class-level cache keyed by thumbnail_directory string. Populated the first
-    # time a given directory is scanned (auto_reload=False). Avoids redundant
-    # filesystem walks when many block instances share the same directory (e.g.
-    # multiple fields on the same page model or across Telepath serialisation).
-    _scan_cache: dict = {}
     """
     A Wagtail ChoiceBlock that displays thumbnail images for each choice.
 
@@ -29,7 +46,8 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
     Both `choices`, `thumbnails`, and `thumbnail_templates` can be either static
     data or callables that return the data. If callables are provided, they will be
     evaluated at render time, allowing for dynamic choices based on database queries
-    or other runtime data.
+    or other runtime data. Callables may also be `async def` functions; async
+    sources of the same block are awaited concurrently.
 
     Example (static `thumbnails`):
         ```python
@@ -148,6 +166,19 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
             )
         ```
 
+    Example (search-driven choices from a model):
+        ```python
+        from wagtail_thumbnail_choice_block import ThumbnailChoiceBlock
+        from wagtail_thumbnail_choice_block.providers import QuerySetChoiceProvider
+
+        class MySettings(blocks.StructBlock):
+            icon = ThumbnailChoiceBlock(
+                choice_provider=QuerySetChoiceProvider(
+                    "icons.Icon", value_field="slug", label_field="title"
+                ),
+            )
+        ```
+
     Args:
         choices: List of (value, label) tuples for the choices, or a callable
                  that returns such a list
@@ -174,7 +205,12 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
                             (e.g. per-path fill attributes) will not be
                             affected by this option. Defaults to False.
         thumbnail_directory: Path relative to a staticfiles-findable location
-                            (app static/, STATICFILES_DIRS, or STATIC_ROOT).
+                            (app static/, STATICFILES_DIRS, or STATIC_ROOT), or
+                            a list of such paths. Several roots are scanned
+                            together as one merged tree: a file in a later root
+                            replaces any file with the same value in earlier
+                            roots, so e.g. ["icons", "brand/icons"] lets a brand
+                            override some of a base icon set.
                             Mutually exclusive with choices, thumbnails, and
                             thumbnail_templates.
         thumbnail_directory_auto_reload: When True (and thumbnail_directory is set), re-scan the
@@ -199,9 +235,62 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
                  ImproperlyConfigured on the next render rather than at startup.
                  Defaults to None (the rel_path is stored as-is, which is the existing behaviour).
 
-                 Use a module-level function rather than a lambda. Each lambda literal is a
-                 distinct object, so two block instances using syntactically identical lambdas will
-                 not share a scan-cache entry and will each trigger a full filesystem scan.
+                 Blocks share a scan when their value_fn, label_fn and sort_key are
+                 equivalent: the same function, lambdas with the same code, or closures
+                 and functools.partial objects over equal values (see
+                 frozen.callable_key). Callable objects only share a scan with
+                 themselves.
+        thumbnail_directory_metadata: When True, each image's intrinsic width and height
+                 (an SVG's viewBox, or a raster image's header) and, for opaque raster
+                 images, an average-color placeholder are read during the scan and
+                 cached with it. The widget gives each thumbnail <img> its width and
+                 height and shows the placeholder color until the image loads, so
+                 the picker doesn't reflow as thumbnails arrive. Defaults to False.
+        thumbnail_directory_dedupe: When True, the scan hashes each file's contents and
+                 byte-identical files (e.g. copies in several size or platform
+                 folders) all use the URL of the first one scanned, so the browser
+                 downloads it once. Digests are cached per process by the file's
+                 inode, mtime and size, so rescans only read changed files. The
+                 number of duplicates is recorded as the scan_directory.duplicates
+                 metric. Defaults to False.
+        thumbnail_directory_include: Optional glob pattern, or list of patterns, that
+                 files must match to become choices, e.g. ["*.svg"]. A pattern without
+                 a "/" matches the file name, one with a "/" the path relative to
+                 thumbnail_directory (e.g. "brand/*.svg"). Defaults to every image.
+        thumbnail_directory_exclude: Optional glob pattern, or list of patterns, of
+                 files and directories to leave out, e.g. ["src", "raw", "@2x"].
+                 Excluded directories are pruned before they are listed, so the scan
+                 never reads them.
+        thumbnail_directory_max_depth: Optional depth of the deepest directories to
+                 scan. 0 scans the files directly in thumbnail_directory only.
+                 Deeper directories are pruned before they are listed.
+        callable_cache_timeout: Optional number of seconds for which the result of a
+                 callable `choices`, `thumbnails` or `thumbnail_templates` is reused
+                 instead of calling it again. Results are shared between all blocks
+                 using the same callable. Use invalidate_callable_cache() (e.g. from a
+                 post_save signal receiver) to drop stale results before the timeout
+                 expires. Defaults to None (callables run on every resolution, or once
+                 per request with ThumbnailChoiceRequestCacheMiddleware installed).
+        choice_provider: Optional ChoiceProvider (see providers.py) for choice sets too
+                 large to list in the page editor. The widget renders the current
+                 selection only and searches the provider, a page at a time, as the
+                 editor types; submitted values are validated with one provider.get()
+                 lookup. Mutually exclusive with choices, thumbnails,
+                 thumbnail_templates and thumbnail_directory.
+        thumbnail_inline_svg_max_bytes: Optional size limit, in bytes. SVG thumbnails
+                 (from thumbnail_directory, or `thumbnails` URLs of static files) no
+                 larger than this are minified and sent inside the widget instead
+                 of being fetched by the browser one request at a time. Directory
+                 files are read and minified when the directory is scanned, and the
+                 result is cached with the scan. Defaults to None (no inlining).
+        thumbnail_inline_svg_format: How inlined SVGs are sent: "data_uri" (the
+                 default) replaces the thumbnail URL with a data: URI, which also
+                 works for the thumbnail_is_one_color mask; "markup" puts the <svg>
+                 element itself in the option. With thumbnail_is_one_color, markup
+                 is used for monochrome SVGs only, repainted with
+                 fill="currentColor" so they are tinted without a CSS mask. SVGs
+                 containing scripts, event handlers or <style> are always sent as
+                 data URIs.
         **kwargs: Additional arguments passed to ChoiceBlock
 
     Please note: if you are using thumbnail_templates, the Wagtail interface
@@ -214,6 +303,19 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
     they are being loaded in Wagtail.
     """
 
+    # Class-level cache keyed by thumbnail_directory string. Populated the first
+    # time a given directory is scanned (auto_reload=False). Avoids redundant
+    # filesystem walks when many block instances share the same directory (e.g.
+    # multiple fields on the same page model or across Telepath serialisation).
+    _scan_cache: ClassVar[dict] = {}
+    # Lets concurrent misses for one _scan_cache key wait for a single scan.
+    _scan_flights = SingleFlight()
+    # Class-level memo for callable choices/thumbnails/thumbnail_templates, keyed
+    # by the callable itself and holding (resolved_at, result) pairs. Only used
+    # by blocks constructed with callable_cache_timeout; each block applies its
+    # own timeout when reading, so blocks sharing a callable share one entry.
+    _callable_cache: ClassVar[dict] = {}
+
     def __init__(
         self,
         choices=None,
@@ -227,6 +329,16 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
         thumbnail_directory_sort_key=None,
         thumbnail_directory_label_fn=None,
         thumbnail_directory_value_fn=None,
+        thumbnail_directory_storage=None,
+        thumbnail_directory_metadata=False,
+        thumbnail_directory_dedupe=False,
+        thumbnail_directory_include=None,
+        thumbnail_directory_exclude=None,
+        thumbnail_directory_max_depth=None,
+        callable_cache_timeout=None,
+        choice_provider=None,
+        thumbnail_inline_svg_max_bytes=None,
+        thumbnail_inline_svg_format=svg.DATA_URI,
         **kwargs,
     ):
         if thumbnail_directory is not None and any(
@@ -236,6 +348,29 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
                 "'thumbnail_directory' is mutually exclusive with 'choices', 'thumbnails', "
                 "and 'thumbnail_templates'."
             )
+        if thumbnail_directory_storage is not None and thumbnail_directory is None:
+            raise ValueError(
+                "'thumbnail_directory_storage' requires 'thumbnail_directory'."
+            )
+        if choice_provider is not None and any(
+            [choices, thumbnails, thumbnail_templates, thumbnail_directory]
+        ):
+            raise ValueError(
+                "'choice_provider' is mutually exclusive with 'choices', 'thumbnails', "
+                "'thumbnail_templates' and 'thumbnail_directory'."
+            )
+        if thumbnail_inline_svg_format not in svg.FORMATS:
+            raise ValueError(
+                f"'thumbnail_inline_svg_format' must be one of {svg.FORMATS!r}."
+            )
+        if isinstance(thumbnail_directory_storage, str):
+            thumbnail_directory_storage = storages[thumbnail_directory_storage]
+        if isinstance(thumbnail_directory, (list, tuple)):
+            # Scanned in order; _thumbnail_directory names them all in messages
+            self._thumbnail_directories = tuple(thumbnail_directory)
+            thumbnail_directory = ", ".join(thumbnail_directory)
+        else:
+            self._thumbnail_directories = (thumbnail_directory,)
 
         # Store sources (may be callable in non-directory mode)
         self._choices_source = choices
@@ -253,35 +388,59 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
             thumbnail_directory_label_fn or self._default_label_fn
         )
         self._thumbnail_directory_value_fn = thumbnail_directory_value_fn
+        self._thumbnail_directory_storage = thumbnail_directory_storage
+        self._thumbnail_directory_metadata = thumbnail_directory_metadata
+        self._thumbnail_directory_dedupe = thumbnail_directory_dedupe
+        self._thumbnail_directory_include = self._patterns(thumbnail_directory_include)
+        self._thumbnail_directory_exclude = self._patterns(thumbnail_directory_exclude)
+        self._thumbnail_directory_max_depth = thumbnail_directory_max_depth
+        self._callable_cache_timeout = callable_cache_timeout
+        self._choice_provider = choice_provider
+        self._inline_svg_max_bytes = thumbnail_inline_svg_max_bytes
+        self._inline_svg_format = thumbnail_inline_svg_format
+        # (thumbnails dict, _widget_thumbnails result) for the last dict seen
+        self._widget_thumbnails_memo = None
+        if choice_provider is not None:
+            # Lets the search endpoint find the provider by name
+            register_choice_provider(choice_provider)
 
         if self._thumbnail_directory:
-            # Cache key includes value_fn so two blocks pointing at the same directory
-            # but with different value_fns do not share a cache entry. Module-level
-            # functions are hashable by identity; None is also hashable. Lambdas are
-            # hashable but have a distinct identity per literal — two block instances
-            # with semantically identical lambdas will not share the cache (performance
-            # concern, not a correctness bug; use a module-level function to avoid this).
-            cache_key = (self._thumbnail_directory, self._thumbnail_directory_value_fn)
+            cache_key = self._scan_cache_key()
             if (
                 not self._thumbnail_directory_auto_reload
                 and cache_key in ThumbnailChoiceBlock._scan_cache
             ):
+                metrics.incr(
+                    "scan_cache.hit", instance=self, directory=self._thumbnail_directory
+                )
                 resolved_choices, thumbnail_map, tree_items = (
                     ThumbnailChoiceBlock._scan_cache[cache_key]
                 )
             else:
-                resolved_choices, thumbnail_map, tree_items = self._scan_directory()
-                if not self._thumbnail_directory_auto_reload:
-                    ThumbnailChoiceBlock._scan_cache[cache_key] = (
-                        resolved_choices,
-                        thumbnail_map,
-                        tree_items,
+                metrics.incr(
+                    "scan_cache.miss",
+                    instance=self,
+                    directory=self._thumbnail_directory,
+                )
+                if self._thumbnail_directory_auto_reload:
+                    resolved_choices, thumbnail_map, tree_items = self._scan_directory()
+                else:
+                    resolved_choices, thumbnail_map, tree_items = (
+                        ThumbnailChoiceBlock._scan_flights.do(
+                            cache_key,
+                            lambda: self._fill_scan_cache(cache_key),
+                            instance=self,
+                        )
                     )
             self._tree_items = tree_items
             self._thumbnails_source = thumbnail_map
             self._choices_source = (
                 resolved_choices  # store raw (no blank) for bookkeeping
             )
+        elif self._choice_provider is not None:
+            # Choices are looked up through the provider, never listed
+            self._tree_items = None
+            resolved_choices = []
         else:
             self._tree_items = None
             resolved_choices = self._resolve_callable(choices)
@@ -299,50 +458,120 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
     def _default_sort_key(path) -> str:
         return path.name.lower()
 
-    def _find_static_directory(self) -> Path:
+    def _fill_scan_cache(self, cache_key):
+        """
+        Store this block's scan, from the frozen scans or a fresh walk of the
+        directory, in _scan_cache under `cache_key`, and return it.
+        """
+        scan = ThumbnailChoiceBlock._scan_cache.get(cache_key)
+        if scan is None:
+            scan = get_frozen_scan(self._frozen_scan_key())
+            if scan is not None:
+                metrics.incr(
+                    "frozen_scan.hit",
+                    instance=self,
+                    directory=self._thumbnail_directory,
+                )
+            else:
+                scan = self._scan_directory()
+            ThumbnailChoiceBlock._scan_cache[cache_key] = scan
+        return scan
+
+    def _scan_cache_key(self):
+        """
+        Return the key of this block's scan in _scan_cache. The callables are
+        identified by frozen.callable_key, so blocks with equivalent lambdas,
+        closures or partials share a scan, and blocks with different label or
+        sort functions don't. Callables it can't identify are keyed on the
+        object itself.
+        """
+        callables = (
+            self._thumbnail_directory_value_fn,
+            self._thumbnail_directory_label_fn,
+            self._thumbnail_directory_sort_key,
+        )
+        return (
+            self._thumbnail_directories,
+            *(callable_key(fn) or fn for fn in callables),
+            self._thumbnail_directory_storage,
+            *self._scan_options().items(),
+        )
+
+    def _frozen_scan_key(self):
+        """Return the key this block's scan is frozen under (see frozen.scan_key)."""
+        return scan_key(
+            self._thumbnail_directory,
+            self._thumbnail_directory_value_fn,
+            self._thumbnail_directory_label_fn,
+            self._thumbnail_directory_sort_key,
+            self._thumbnail_directory_storage,
+            **self._scan_options(),
+        )
+
+    def _scan_options(self):
+        """
+        Return {name: value} for the options, other than the directory, its
+        storage and callables, that change the result of _scan_directory.
+        They are part of both the scan cache and frozen scan keys.
+        """
+        return {
+            "inline_svg_max_bytes": self._inline_svg_max_bytes,
+            "metadata": self._thumbnail_directory_metadata,
+            "dedupe": self._thumbnail_directory_dedupe,
+            "include": self._thumbnail_directory_include,
+            "exclude": self._thumbnail_directory_exclude,
+            "max_depth": self._thumbnail_directory_max_depth,
+        }
+
+    @staticmethod
+    def _patterns(patterns):
+        """Return glob `patterns` (None, a string or an iterable) as a tuple."""
+        if patterns is None:
+            return ()
+        if isinstance(patterns, str):
+            return (patterns,)
+        return tuple(patterns)
+
+    @metrics.timed("find_static_directory")
+    def _find_static_directory(self, directory) -> Path:
         """
-        Locate thumbnail_directory on the filesystem via staticfiles finders,
-        falling back to STATIC_ROOT for production deployments.
+        Locate `directory`, one of the thumbnail_directory roots, on the
+        filesystem via staticfiles finders, falling back to STATIC_ROOT for
+        production deployments.
 
-        Note: Only Django's built-in AppDirectoriesFinder and FileSystemFinder are
-        actively searched via their internal 'storages' and 'locations' attributes.
-        These are not part of Django's public staticfiles API; getattr with safe
-        defaults is intentional — if a future Django version renames them, or a
-        custom finder lacks them, the finder is silently skipped rather than
-        crashing. STATIC_ROOT remains the guaranteed fallback.
+        The static roots are indexed once per process (see finders.py), so
+        locating a directory doesn't stat every app's static folder.
 
         STATICFILES_DIRS entries with a URL prefix (e.g. [('myprefix', '/path/')])
         are not supported.
         """
-        from django.contrib.staticfiles.finders import get_finders
-
-        for finder in get_finders():
-            for storage in getattr(finder, "storages", {}).values():
-                loc = getattr(storage, "location", None)
-                if loc:
-                    candidate = Path(loc) / self._thumbnail_directory
-                    if candidate.is_dir():
-                        return candidate
-            for _prefix, root in getattr(finder, "locations", []):
-                candidate = Path(root) / self._thumbnail_directory
-                if candidate.is_dir():
-                    return candidate
-
-        # Production fallback: STATIC_ROOT
-        static_root = getattr(settings, "STATIC_ROOT", None)
-        if static_root:
-            candidate = Path(static_root) / self._thumbnail_directory
-            if candidate.is_dir():
-                return candidate
-
-        raise ImproperlyConfigured(
-            f"ThumbnailChoiceBlock: thumbnail_directory '{self._thumbnail_directory}' not found "
+        path = find_static_directory(directory)
+        if path is None:
+            raise self._directory_not_found(directory)
+        return path
+
+    @staticmethod
+    def _directory_not_found(directory) -> ImproperlyConfigured:
+        """Return the error for a thumbnail_directory root that doesn't exist."""
+        return ImproperlyConfigured(
+            f"ThumbnailChoiceBlock: thumbnail_directory '{directory}' not found "
             f"in any staticfiles location or STATIC_ROOT."
         )
 
-    def _scan_directory(self) -> tuple:
+    @metrics.timed("scan_directory")
+    def _scan_directory(self, url_for=None) -> tuple:
         """
-        Walk self._thumbnail_directory, located via staticfiles finders (STATIC_ROOT fallback).
+        Walk the thumbnail_directory roots, located via staticfiles finders
+        (STATIC_ROOT fallback), or listed through self._thumbnail_directory_storage
+        if set. Several roots are walked as one merged tree, and an option in a
+        later root replaces the options with the same value in earlier ones.
+
+        Args:
+            url_for: Optional callable returning the URL for a static path (e.g.
+                     "icons/arrows/left.svg"). Defaults to STATIC_URL + path, or
+                     STATIC_URL + hashed name if the static files storage has a
+                     manifest (see _manifest_url_for). With a storage, defaults
+                     to storage.url.
 
         Returns:
             choices       — [(value, label), ...] for field validation
@@ -350,28 +579,102 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
             tree_items    — [{"type": "heading"|"option", "label": str,
                               "depth": int, "value": str,
                               "thumbnail_url": str}, ...]
+
+        Options for SVGs within thumbnail_inline_svg_max_bytes also have an
+        "inline_svg" key holding the minified file and, if it is monochrome, a
+        "current_color_svg" key holding it repainted in currentColor (see
+        svg.current_color_svg). With thumbnail_directory_metadata, options
+        also have the "width", "height" and "placeholder" keys found by
+        metadata.image_metadata.
         """
-        root = self._find_static_directory()
         static_url = getattr(settings, "STATIC_URL", "/static/").rstrip("/")
-        dir_prefix = f"{static_url}/{self._thumbnail_directory}"
+        directories = self._thumbnail_directories
+        storage = self._thumbnail_directory_storage
+        if storage is not None:
+            roots, list_dir = self._storage_lister(storage)
+            if url_for is None:
+                url_for = storage.url
+
+            def open_file(path, mode):
+                return storage.open(str(path), mode)
+
+            def file_size(path):
+                return storage.size(str(path))
+
+            def file_digest(path):
+                return digests.storage_digest(storage, str(path))
+
+        else:
+            roots = [
+                self._find_static_directory(directory) for directory in directories
+            ]
+            open_file = Path.open
+            file_digest = digests.path_digest
+
+            def file_size(path):
+                return path.stat().st_size
+
+            def list_dir(path):
+                return [
+                    (entry, entry.is_dir())
+                    for entry in path.iterdir()
+                    if entry.is_dir() or entry.is_file()
+                ]
+
+            if url_for is None:
+                url_for = self._manifest_url_for(static_url)
 
         choices = []
         thumbnail_map = {}
-        tree_items = []
-        seen = {}  # {transformed_value: Path} — populated only when value_fn is set
-
-        def walk(path, depth, rel_parts):
+        seen = {}  # {(root index, transformed_value): Path} — populated only when value_fn is set
+        owners = {}  # {value: (root index, [option items])} — the items shown for it
+        files = []  # (option item, root index, Path, relative path), in tree order
+        dedupe = self._thumbnail_directory_dedupe
+        include = self._thumbnail_directory_include
+        exclude = self._thumbnail_directory_exclude
+        max_depth = self._thumbnail_directory_max_depth
+        canonical_urls = {}  # {content digest: URL of the first such file}
+        duplicates = []  # Paths of files whose content appeared earlier
+        inline_svg_max_bytes = self._inline_svg_max_bytes
+
+        def read_file(path):
+            with open_file(path, "rb") as f:
+                return f.read()
+
+        def read_inline_svg(path):
+            try:
+                size = file_size(path)
+            except (OSError, NotImplementedError):
+                return None
+            return svg.read_svg(lambda: read_file(path), size, inline_svg_max_bytes)
+
+        def walk(nodes, depth, rel_parts):
+            # `nodes` are the (root index, path) of the directories at
+            # `rel_parts` in each root, walked as one merged directory
             local_items = []
-            local_choices = []
-            local_thumbnail_map = {}
 
-            entries = sorted(path.iterdir(), key=self._thumbnail_directory_sort_key)
-            for entry in entries:
-                if entry.name.startswith("."):
-                    continue
-                if entry.is_dir():
-                    sub_items, sub_choices, sub_map = walk(
-                        entry, depth + 1, rel_parts + [entry.name]
+            sort_key = self._thumbnail_directory_sort_key
+            entries = []
+            subdirectories = {}  # {name: [(root index, path), ...]}
+            for index, path in nodes:
+                for entry, is_dir in list_dir(path):
+                    if entry.name.startswith("."):
+                        continue
+                    if is_dir:
+                        if entry.name in subdirectories:
+                            subdirectories[entry.name].append((index, entry))
+                            continue
+                        subdirectories[entry.name] = [(index, entry)]
+                    entries.append((entry, is_dir, index))
+            entries.sort(key=lambda item: sort_key(item[0]))
+            for entry, is_dir, index in entries:
+                rel_path = posixpath.join(*rel_parts, entry.name)
+                if is_dir:
+                    # Pruned directories are never listed
+                    if is_pruned(rel_path, depth + 1, exclude, max_depth):
+                        continue
+                    sub_items = walk(
+                        subdirectories[entry.name], depth + 1, rel_parts + [entry.name]
                     )
                     if sub_items:  # only emit heading if directory has descendants
                         heading_label = self._thumbnail_directory_label_fn(entry.name)
@@ -379,54 +682,263 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
                             {"type": "heading", "label": heading_label, "depth": depth}
                         )
                         local_items.extend(sub_items)
-                        local_choices.extend(sub_choices)
-                        local_thumbnail_map.update(sub_map)
-                elif entry.is_file() and entry.suffix.lower() in IMAGE_EXTENSIONS:
+                elif entry.suffix.lower() in IMAGE_EXTENSIONS:
+                    if match_patterns(rel_path, exclude) or (
+                        include and not match_patterns(rel_path, include)
+                    ):
+                        continue
                     stem = entry.stem
                     value_parts = rel_parts + [stem]
                     rel_path_without_ext = posixpath.join(*value_parts)
 
                     if self._thumbnail_directory_value_fn:
                         value = self._thumbnail_directory_value_fn(rel_path_without_ext)
-                        if value in seen:
+                        if (index, value) in seen:
                             raise ImproperlyConfigured(
                                 f"ThumbnailChoiceBlock: thumbnail_directory_value_fn produced the "
-                                f"duplicate value {value!r} for both '{seen[value]}' and '{entry}' "
-                                f"inside '{self._thumbnail_directory}'. The first file scanned has "
+                                f"duplicate value {value!r} for both '{seen[index, value]}' and '{entry}' "
+                                f"inside '{directories[index]}'. The first file scanned has "
                                 f"already claimed this value. To resolve this, either: (1) update "
                                 f"thumbnail_directory_value_fn to return a different value for one "
                                 f"of these paths — use more path components to distinguish them — "
                                 f"or (2) rename or remove one of the files."
                             )
-                        seen[value] = entry
+                        seen[index, value] = entry
                     else:
                         value = rel_path_without_ext
 
-                    label = self._thumbnail_directory_label_fn(stem)
-                    rel_with_ext = posixpath.join(*(rel_parts + [entry.name]))
-                    thumbnail_url = f"{dir_prefix}/{rel_with_ext}"
-                    local_items.append(
-                        {
-                            "type": "option",
-                            "label": label,
-                            "depth": depth,
-                            "value": value,
-                            "thumbnail_url": thumbnail_url,
-                        }
+                    item = {
+                        "type": "option",
+                        "label": self._thumbnail_directory_label_fn(stem),
+                        "depth": depth,
+                        "value": value,
+                    }
+                    # Files in later roots shadow those with the same value in
+                    # earlier roots
+                    owner_index, owner_items = owners.get(value, (index, []))
+                    if owner_index < index:
+                        for owner_item in owner_items:
+                            owner_item["shadowed"] = True
+                        owners[value] = (index, [item])
+                    elif owner_index > index:
+                        item["shadowed"] = True
+                    else:
+                        owner_items.append(item)
+                        owners[value] = (index, owner_items)
+                    local_items.append(item)
+                    files.append((item, index, entry, rel_path))
+
+            return local_items
+
+        tree_items = walk(list(enumerate(roots)), depth=0, rel_parts=[])
+        if len(roots) > 1:
+            tree_items = self._drop_shadowed(tree_items)
+        for item, index, entry, rel_with_ext in files:
+            if item.get("shadowed"):
+                continue
+            digest = thumbnail_url = None
+            if dedupe:
+                try:
+                    digest = file_digest(entry)
+                except OSError:
+                    pass
+                thumbnail_url = canonical_urls.get(digest)
+                if thumbnail_url is not None:
+                    duplicates.append(entry)
+            if thumbnail_url is None:
+                if url_for is None:
+                    thumbnail_url = f"{static_url}/{directories[index]}/{rel_with_ext}"
+                else:
+                    thumbnail_url = url_for(f"{directories[index]}/{rel_with_ext}")
+                if digest is not None:
+                    canonical_urls[digest] = thumbnail_url
+            item["thumbnail_url"] = thumbnail_url
+            if inline_svg_max_bytes is not None and entry.suffix.lower() == ".svg":
+                inline_svg = read_inline_svg(entry)
+                if inline_svg:
+                    item["inline_svg"] = inline_svg
+                    current_color = svg.current_color_svg(inline_svg)
+                    if current_color:
+                        item["current_color_svg"] = current_color
+            if self._thumbnail_directory_metadata:
+                item.update(
+                    image_metadata(
+                        entry.suffix,
+                        lambda entry=entry: open_file(entry, "rb"),
+                        svg=item.get("inline_svg"),
+                    )
+                )
+            choices.append((item["value"], item["label"]))
+            thumbnail_map[item["value"]] = thumbnail_url
+
+        metrics.observe(
+            "scan_directory.entries",
+            len(choices),
+            instance=self,
+            directory=self._thumbnail_directory,
+        )
+        if dedupe:
+            metrics.observe(
+                "scan_directory.duplicates",
+                len(duplicates),
+                instance=self,
+                directory=self._thumbnail_directory,
+            )
+        return choices, thumbnail_map, tree_items
+
+    @staticmethod
+    def _drop_shadowed(tree_items):
+        """
+        Return `tree_items` without the options marked "shadowed" by a file
+        with the same value in a later root, or the headings left with no
+        options below them.
+        """
+        kept = []
+        for item in reversed(tree_items):
+            if item.get("shadowed"):
+                continue
+            # A heading's options are the items after it with a greater depth
+            if item["type"] == "heading" and not (
+                kept and kept[-1]["depth"] > item["depth"]
+            ):
+                continue
+            kept.append(item)
+        kept.reverse()
+        return kept
+
+    def _storage_lister(self, storage):
+        """
+        Return (roots, list_dir) for walking the thumbnail_directory roots in
+        `storage`. The whole tree is listed up front (see listing.py); entries
+        are PurePosixPaths of storage names, so a custom sort key can use
+        .name, .stem and .suffix but not filesystem calls such as .stat().
+        """
+        listing = {}
+        for directory in self._thumbnail_directories:
+            try:
+                listing.update(
+                    list_storage_directory(
+                        storage,
+                        directory,
+                        use_cache=not self._thumbnail_directory_auto_reload,
+                        exclude=self._thumbnail_directory_exclude,
+                        max_depth=self._thumbnail_directory_max_depth,
                     )
-                    local_choices.append((value, label))
-                    local_thumbnail_map[value] = thumbnail_url
+                )
+            except FileNotFoundError:
+                if storage.exists(directory):
+                    raise  # a subdirectory went away mid-listing
+                raise self._directory_not_found(directory) from None
+
+        def list_dir(path):
+            dirs, files = listing.get(str(path), ((), ()))
+            return [(path / name, True) for name in dirs] + [
+                (path / name, False) for name in files
+            ]
 
-            return local_items, local_choices, local_thumbnail_map
+        roots = [
+            PurePosixPath(directory.strip("/"))
+            for directory in self._thumbnail_directories
+        ]
+        return roots, list_dir
 
-        tree_items, choices, thumbnail_map = walk(root, depth=0, rel_parts=[])
-        return choices, thumbnail_map, tree_items
+    @staticmethod
+    def _manifest_url_for(static_url):
+        """
+        Return a url_for callable that maps static paths to their hashed names in
+        the static files storage's manifest (e.g. ManifestStaticFilesStorage), or
+        None if there is no manifest or DEBUG is on, as for static().
+
+        The manifest is the storage's in-memory hashed_files dict, so each file
+        costs one dict lookup rather than a storage.url() call. Paths missing
+        from the manifest keep their unhashed URL.
+        """
+        if settings.DEBUG:
+            return None
+        from django.contrib.staticfiles.storage import staticfiles_storage
+
+        hashed_files = getattr(staticfiles_storage, "hashed_files", None)
+        if not hashed_files:
+            return None
+
+        def url_for(path):
+            return f"{static_url}/{hashed_files.get(posixpath.normpath(path), path)}"
+
+        return url_for
 
     def get_thumbnail_url(self, value: str) -> str:
         """Return the static URL for the thumbnail for the given stored value, or '' if not found."""
+        if self._choice_provider is not None:
+            return self.get_thumbnail_urls([value])[value]
         thumbnails = self._resolve_callable(self._thumbnails_source) or {}
         return thumbnails.get(value, "")
 
+    def get_thumbnail_urls(self, values) -> dict:
+        """
+        Return {value: thumbnail URL} for every value in `values`, resolving the
+        `thumbnails` source once for the whole batch. Unknown values map to ''.
+        With a choice_provider, the values are looked up in one get_many() call.
+        """
+        if self._choice_provider is not None:
+            choices = self._choice_provider.get_many(list(dict.fromkeys(values)))
+            return {
+                value: (choices.get(value) or {}).get("thumbnail_url") or ""
+                for value in values
+            }
+        thumbnails = self._resolve_callable(self._thumbnails_source) or {}
+        return {value: thumbnails.get(value, "") for value in values}
+
+    def get_thumbnails(self, values) -> dict:
+        """
+        Return {value: {"url": str, "html": str}} for every value in `values`.
+
+        `url` is the thumbnail URL (as returned by get_thumbnail_url) and `html`
+        is the rendered `thumbnail_templates` entry for the value, marked safe,
+        or '' if it has none. The choices, thumbnails and thumbnail_templates
+        sources are resolved once for the whole batch and each distinct value
+        is rendered once, however often it occurs in `values`.
+        """
+        values = list(dict.fromkeys(values))
+        if self._choice_provider is not None:
+            return {
+                value: {"url": url, "html": ""}
+                for value, url in self.get_thumbnail_urls(values).items()
+            }
+        choices, thumbnails, thumbnail_templates = self._resolve_sources(
+            self._choices_source,
+            self._thumbnails_source,
+            self._thumbnail_templates_source,
+        )
+        thumbnails = thumbnails or {}
+        thumbnail_templates = thumbnail_templates or {}
+        labels = self._choice_labels(choices) if thumbnail_templates else {}
+
+        return {
+            value: {
+                "url": thumbnails.get(value, ""),
+                "html": mark_safe(
+                    render_thumbnail_template(
+                        thumbnail_templates.get(value),
+                        value,
+                        labels.get(value, value),
+                        instance=self,
+                    )
+                ),
+            }
+            for value in values
+        }
+
+    @staticmethod
+    def _choice_labels(choices) -> dict:
+        """Return {value: label} for a choices list, looking inside optgroups."""
+        labels = {}
+        for key, label in choices or []:
+            if isinstance(label, (list, tuple)):
+                labels.update(label)
+            else:
+                labels[key] = label
+        return labels
+
     def _resolve_callable(self, value):
         """
         Resolve a value that may be a callable or static data.
@@ -437,9 +949,105 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
         Returns:
             The resolved value
         """
-        if callable(value):
-            return value()
-        return value
+        return self._resolve_sources(value)[0]
+
+    def _resolve_sources(self, *sources):
+        """
+        Resolve several values that may each be a callable or static data.
+
+        Callables may be `async def` functions (or otherwise return an awaitable).
+        All awaitables are gathered concurrently in a single event loop, so
+        resolving several I/O-bound sources takes as long as the slowest one.
+        This must be called from synchronous code; Wagtail renders blocks
+        synchronously, including under ASGI.
+
+        Returns:
+            A list of resolved values, in the order of `sources`
+        """
+        resolved = list(sources)
+        pending = {}  # {source: awaitable} for sources that returned awaitables
+
+        for index, source in enumerate(sources):
+            if not callable(source) or source in pending:
+                continue
+            hit, result = self._get_memoized(source)
+            metrics.incr(
+                "callable_cache.hit" if hit else "callable_cache.miss", instance=self
+            )
+            if not hit:
+                with metrics.timer("resolve_callable", instance=self):
+                    result = source()
+                if inspect.isawaitable(result):
+                    pending[source] = result
+                    continue
+                self._memoize(source, result)
+            resolved[index] = result
+
+        if pending:
+
+            async def gather():
+                return await asyncio.gather(*pending.values())
+
+            with metrics.timer("resolve_callable", instance=self, concurrent=True):
+                results = dict(zip(pending, async_to_sync(gather)()))
+            for source, result in results.items():
+                self._memoize(source, result)
+            for index, source in enumerate(sources):
+                if callable(source) and source in results:
+                    resolved[index] = results[source]
+
+        return resolved
+
+    def _get_memoized(self, source):
+        """Return (True, result) if source has a memoized result, else (False, None)."""
+        request_cache = get_request_cache()
+        if request_cache is not None and source in request_cache:
+            return True, request_cache[source]
+
+        if self._callable_cache_timeout is not None:
+            cached = ThumbnailChoiceBlock._callable_cache.get(source)
+            if (
+                cached is not None
+                and time.monotonic() - cached[0] < self._callable_cache_timeout
+            ):
+                return True, cached[1]
+
+        return False, None
+
+    def _memoize(self, source, result):
+        """Record the result of calling source in the active memos."""
+        request_cache = get_request_cache()
+        if request_cache is not None:
+            request_cache[source] = result
+        if self._callable_cache_timeout is not None:
+            ThumbnailChoiceBlock._callable_cache[source] = (time.monotonic(), result)
+
+    @classmethod
+    def invalidate_callable_cache(cls, *sources, **kwargs):
+        """
+        Drop memoized results of callable sources (see callable_cache_timeout),
+        including any memoized for the current request.
+
+        With no arguments every memoized result is dropped; otherwise only the
+        results of the given callables are. Extra keyword arguments are ignored
+        so that a bound partial can be connected directly to a model signal:
+
+            post_save.connect(
+                partial(ThumbnailChoiceBlock.invalidate_callable_cache, get_user_choices),
+                sender=User,
+                weak=False,
+            )
+        """
+        caches = [cls._callable_cache]
+        request_cache = get_request_cache()
+        if request_cache is not None:
+            caches.append(request_cache)
+
+        for cache in caches:
+            if not sources:
+                cache.clear()
+            for source in sources:
+                cache.pop(source, None)
 
     def _add_blank_choice(self, choices, required):
         """
@@ -467,11 +1075,24 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
 
         return choices_list
 
+    def normalize_choice(self, value):
+        """
+        Convert a value coming from JSON deserialization back to the original
+        choice key type, using the field's choice index rather than scanning
+        the choices list. Unknown values are returned unchanged.
+        """
+        if value is None:
+            return None
+        return self.field.choice_index.get(force_str(value), value)
+
     def get_form_state(self, value):
         """
         Override to ensure we have fresh choices and thumbnails when rendering the form.
         This is called when the block is rendered in the admin interface.
         """
+        if self._choice_provider is not None:
+            # Nothing to refresh: the widget searches the provider
+            return super().get_form_state(value)
         if self._thumbnail_directory and self._thumbnail_directory_auto_reload:
             choices, thumbnail_map, tree_items = self._scan_directory()
             choices_with_blank = self._add_blank_choice(choices, self._required)
@@ -481,15 +1102,25 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
             # Push changes to the already-constructed widget
             self.field.widget._tree_items = tree_items
             self.field.widget.choices = choices_with_blank
-            self.field.widget.thumbnail_mapping = thumbnail_map
+            (
+                self.field.widget.thumbnail_mapping,
+                self.field.widget.thumbnail_html_mapping,
+            ) = self._widget_thumbnails(thumbnail_map)
+            self.field.widget.thumbnail_metadata_mapping = self._metadata_mapping(
+                tree_items
+            )
             self.field.choices = choices_with_blank
         else:
             # Resolve choices, thumbnails, and thumbnail_templates at render time
-            resolved_choices = self._resolve_callable(self._choices_source)
-            resolved_thumbnails = self._resolve_callable(self._thumbnails_source) or {}
-            resolved_thumbnail_templates = (
-                self._resolve_callable(self._thumbnail_templates_source) or {}
+            resolved_choices, resolved_thumbnails, resolved_thumbnail_templates = (
+                self._resolve_sources(
+                    self._choices_source,
+                    self._thumbnails_source,
+                    self._thumbnail_templates_source,
+                )
             )
+            resolved_thumbnails = resolved_thumbnails or {}
+            resolved_thumbnail_templates = resolved_thumbnail_templates or {}
 
             # Add blank choice if field is not required
             resolved_choices = self._add_blank_choice(resolved_choices, self._required)
@@ -499,9 +1130,12 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
                 self.field.choices = resolved_choices
                 self.field.widget.choices = resolved_choices
 
-            # Update the thumbnail mapping in the widget
+            # Update the thumbnail mappings in the widget
             if hasattr(self.field.widget, "thumbnail_mapping"):
-                self.field.widget.thumbnail_mapping = resolved_thumbnails
+                (
+                    self.field.widget.thumbnail_mapping,
+                    self.field.widget.thumbnail_html_mapping,
+                ) = self._widget_thumbnails(resolved_thumbnails)
 
             # Update the thumbnail template mapping in the widget
             if hasattr(self.field.widget, "thumbnail_template_mapping"):
@@ -516,6 +1150,8 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
         Override get_field to create widget with current thumbnails.
         This is called by the parent ChoiceBlock during initialization.
         """
+        if self._choice_provider is not None:
+            return self._get_provider_field(**kwargs)
         if self._thumbnail_directory:
             # Directory mode: thumbnail_map is already in self._thumbnails_source (a dict)
             resolved_thumbnails = self._thumbnails_source or {}
@@ -524,14 +1160,18 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
                 self._choices_source, self._required
             )
         else:
-            # Resolve thumbnails and thumbnail_templates at field creation time
-            resolved_thumbnails = self._resolve_callable(self._thumbnails_source) or {}
-            resolved_thumbnail_templates = (
-                self._resolve_callable(self._thumbnail_templates_source) or {}
+            # Resolve choices, thumbnails and thumbnail_templates at field creation time
+            resolved_choices, resolved_thumbnails, resolved_thumbnail_templates = (
+                self._resolve_sources(
+                    self._choices_source,
+                    self._thumbnails_source,
+                    self._thumbnail_templates_source,
+                )
             )
+            resolved_thumbnails = resolved_thumbnails or {}
+            resolved_thumbnail_templates = resolved_thumbnail_templates or {}
 
-            # Resolve choices and add blank choice if not required
-            resolved_choices = self._resolve_callable(self._choices_source)
+            # Add blank choice if not required
             resolved_choices = self._add_blank_choice(resolved_choices, self._required)
 
         # Update the stored choices with the resolved ones
@@ -540,20 +1180,28 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
             self.choices = resolved_choices
 
         # Create the custom widget with the resolved choices
+        thumbnail_mapping, thumbnail_html_mapping = self._widget_thumbnails(
+            resolved_thumbnails
+        )
         widget = ThumbnailRadioSelect(
             choices=resolved_choices if resolved_choices else [],
-            thumbnail_mapping=resolved_thumbnails,
+            thumbnail_mapping=thumbnail_mapping,
             thumbnail_template_mapping=resolved_thumbnail_templates,
             thumbnail_size=self._thumbnail_size,
             thumbnail_is_one_color=self._thumbnail_is_one_color,
             tree_items=self._tree_items,
+            thumbnail_html_mapping=thumbnail_html_mapping,
+            thumbnail_metadata_mapping=self._metadata_mapping(self._tree_items),
         )
+        # Lets instrumentation attribute the widget's renders to this block
+        widget.block = self
 
-        # Pass the widget to parent's get_field
+        # Pass the widget to the field
         kwargs["widget"] = widget
 
-        # Get the field from the parent
-        field = super().get_field(**kwargs)
+        # ThumbnailChoiceField validates values against a dict index of the
+        # choices rather than ChoiceField's linear scan.
+        field = ThumbnailChoiceField(**kwargs)
 
         # Override the field's choices to ensure no extra blank choices are added
         if resolved_choices is not None:
@@ -561,3 +1209,168 @@ class ThumbnailChoiceBlock(blocks.ChoiceBlock):
             field.widget.choices = resolved_choices
 
         return field
+
+    @staticmethod
+    def _metadata_mapping(tree_items):
+        """
+        Return the widget's thumbnail_metadata_mapping for a directory scan's
+        tree_items: {value: {"width", "height"[, "placeholder"]}} for every
+        option whose metadata was read (see thumbnail_directory_metadata).
+        """
+        return {
+            item["value"]: {
+                key: item[key]
+                for key in ("width", "height", "placeholder")
+                if key in item
+            }
+            for item in tree_items or []
+            if item.get("width")
+        }
+
+    def _widget_thumbnails(self, thumbnails):
+        """
+        Return the widget's (thumbnail_mapping, thumbnail_html_mapping) for the
+        resolved `thumbnails`, with SVGs within thumbnail_inline_svg_max_bytes
+        inlined: replaced by data URIs in the first, or moved into the second
+        as <svg> markup. The result for the last `thumbnails` dict is reused,
+        so a directory's (or a static `thumbnails` dict's) SVGs are encoded
+        once rather than on every form render.
+
+        One-color blocks inline monochrome SVGs as markup repainted in
+        currentColor, which the admin CSS tints like a template thumbnail, so
+        they need no mask. Other SVGs keep the mask, from a data URI.
+        """
+        if self._inline_svg_max_bytes is None or not thumbnails:
+            return thumbnails, {}
+        memo = self._widget_thumbnails_memo
+        if memo is not None and memo[0] is thumbnails and memo[1] is self._tree_items:
+            return memo[2]
+
+        as_markup = self._inline_svg_format == svg.MARKUP
+        one_color = self._thumbnail_is_one_color
+        if self._thumbnail_directory:
+            inline_svgs = {
+                item["value"]: (item["inline_svg"], item.get("current_color_svg"))
+                for item in self._tree_items or []
+                if item.get("inline_svg")
+            }
+        else:
+            inline_svgs = {}
+            for value, url in thumbnails.items():
+                if isinstance(url, str):
+                    inline_svg = svg.get_static_svg(url, self._inline_svg_max_bytes)
+                    if inline_svg:
+                        current_color = None
+                        if as_markup and one_color:
+                            current_color = svg.current_color_svg(inline_svg)
+                        inline_svgs[value] = (inline_svg, current_color)
+
+        thumbnail_mapping = dict(thumbnails)
+        html_mapping = {}
+        for value, (inline_svg, current_color) in inline_svgs.items():
+            markup = current_color if one_color else inline_svg
+            if as_markup and markup and svg.is_safe_markup(markup):
+                html_mapping[value] = mark_safe(markup)
+                thumbnail_mapping.pop(value, None)
+            else:
+                thumbnail_mapping[value] = svg.svg_data_uri(inline_svg)
+        metrics.observe("inline_svg.count", len(inline_svgs), instance=self)
+
+        result = (thumbnail_mapping, html_mapping)
+        self._widget_thumbnails_memo = (thumbnails, self._tree_items, result)
+        return result
+
+    def _get_provider_field(self, **kwargs):
+        """Return the field for a block with a choice_provider."""
+        widget = ThumbnailSearchSelect(
+            self._choice_provider,
+            thumbnail_size=self._thumbnail_size,
+            thumbnail_is_one_color=self._thumbnail_is_one_color,
+            allow_blank=not self._required,
+        )
+        widget.block = self
+        kwargs["widget"] = widget
+        field = ThumbnailChoiceField(**kwargs)
+        field.provider = self._choice_provider
+        return field
+
+
+def iter_thumbnail_choice_blocks(block, path=""):
+    """
+    Yield a (path, ThumbnailChoiceBlock) pair for every ThumbnailChoiceBlock
+    in the definition of `block`, descending into StreamBlock, StructBlock and
+    ListBlock children. `path` is the dotted child block path (e.g.
+    "hero.icon"), prefixed with the `path` passed in.
+    """
+    if isinstance(block, ThumbnailChoiceBlock):
+        yield path, block
+    elif isinstance(block, (blocks.StreamBlock, blocks.StructBlock)):
+        for name, child_block in block.child_blocks.items():
+            yield from iter_thumbnail_choice_blocks(
+                child_block, f"{path}.{name}" if path else name
+            )
+    elif isinstance(block, blocks.ListBlock):
+        yield from iter_thumbnail_choice_blocks(block.child_block, path)
+
+
+def iter_thumbnail_choice_values(block, value):
+    """
+    Yield a (ThumbnailChoiceBlock, value) pair for every non-empty
+    ThumbnailChoiceBlock value inside `value`, a value of `block`. Descends
+    into StreamBlock, StructBlock and ListBlock values.
+    """
+    if isinstance(block, ThumbnailChoiceBlock):
+        if value not in (None, ""):
+            yield block, value
+    elif isinstance(block, blocks.StreamBlock):
+        for child in value or []:
+            yield from iter_thumbnail_choice_values(child.block, child.value)
+    elif isinstance(block, blocks.StructBlock):
+        for name, child_block in block.child_blocks.items():
+            yield from iter_thumbnail_choice_values(
+                child_block, (value or {}).get(name)
+            )
+    elif isinstance(block, blocks.ListBlock):
+        for item in value or []:
+            yield from iter_thumbnail_choice_values(block.child_block, item)
+
+
+def get_stream_thumbnails(stream_values) -> dict:
+    """
+    Return {id(block): {value: {"url": str, "html": str}}} for every
+    ThumbnailChoiceBlock value in a StreamValue, or in an iterable of
+    StreamValues (e.g. the bodies of every page on a listing page).
+
+    Values are grouped by block so that each block resolves its sources once
+    via ThumbnailChoiceBlock.get_thumbnails. Results are keyed by block as well
+    as value because two blocks can give the same value different thumbnails;
+    use get_bound_thumbnail to look up the thumbnail of a bound block.
+    """
+    if isinstance(stream_values, StreamValue):
+        stream_values = [stream_values]
+
+    grouped = {}  # {id(block): (block, [values])}; blocks aren't hashable
+    for stream_value in stream_values:
+        if stream_value is None:
+            continue
+        for block, value in iter_thumbnail_choice_values(
+            stream_value.stream_block, stream_value
+        ):
+            grouped.setdefault(id(block), (block, []))[1].append(value)
+
+    return {
+        block_id: block.get_thumbnails(values)
+        for block_id, (block, values) in grouped.items()
+    }
+
+
+def get_bound_thumbnail(thumbnails, bound_block) -> dict:
+    """
+    Return the {"url": str, "html": str} thumbnail of a bound block (a
+    StreamValue child, or an item of a StructValue's or ListValue's
+    bound_blocks) from a get_stream_thumbnails result, or {} if it has none.
+    """
+    block = getattr(bound_block, "block", None)
+    if block is None:
+        return {}
+    return thumbnails.get(id(block), {}).get(bound_block.value, {})
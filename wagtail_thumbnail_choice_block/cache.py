@@ -0,0 +1,81 @@
+"""
+Caching helpers for Wagtail Thumbnail Choice Block.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# Per-request memo of resolved callable sources, keyed by the callable itself.
+# None outside of a request_cache_scope(), in which case nothing is memoized.
+_request_cache = ContextVar(
+    "wagtail_thumbnail_choice_block_request_cache", default=None
+)
+
+
+def get_request_cache():
+    """Return the memo dict for the current request scope, or None outside one."""
+    return _request_cache.get()
+
+
+@contextmanager
+def request_cache_scope():
+    """
+    Memoize callable sources for the duration of the block.
+
+    Inside the scope each distinct callable passed as `choices`, `thumbnails`
+    or `thumbnail_templates` runs at most once, however many blocks use it.
+    ThumbnailChoiceRequestCacheMiddleware opens one scope per HTTP request;
+    use this directly for work outside the request cycle (e.g. management
+    commands rendering many blocks). Nested scopes start with an empty memo.
+    """
+    token = _request_cache.set({})
+    try:
+        yield
+    finally:
+        _request_cache.reset(token)
+
+
+def _configured_cache(setting):
+    """
+    Return (cache, options) for a {"CACHE", "TIMEOUT", "VERSION",
+    "LOCK_TIMEOUT"} cache setting, or None if it is not set. `options` holds
+    the `timeout` and `version` to pass to cache.set(), and the `lock_timeout`
+    for singleflight.build_shared.
+    """
+    config = getattr(settings, setting, None)
+    if not config:
+        return None
+    options = {
+        "timeout": config.get("TIMEOUT", DEFAULT_TIMEOUT),
+        "version": config.get("VERSION"),
+        "lock_timeout": config.get("LOCK_TIMEOUT"),
+    }
+    return caches[config.get("CACHE", DEFAULT_CACHE_ALIAS)], options
+
+
+def get_shared_render_cache():
+    """
+    Return (cache, options) for the shared render cache configured by the
+    WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE setting, or None if it is not set:
+
+        WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE = {
+            "CACHE": "default",  # cache alias
+            "TIMEOUT": 86400,  # seconds; defaults to the cache's own timeout
+            "VERSION": RELEASE_ID,  # e.g. a release id, to start fresh on deploy
+            "LOCK_TIMEOUT": 30,  # seconds; lets one process at a time fill a miss
+        }
+    """
+    return _configured_cache("WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE")
+
+
+def get_listing_cache():
+    """
+    Return (cache, options) for the storage listing cache configured by the
+    WAGTAIL_THUMBNAIL_CHOICE_LISTING_CACHE setting (same format as
+    WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE), or None if it is not set.
+    """
+    return _configured_cache("WAGTAIL_THUMBNAIL_CHOICE_LISTING_CACHE")
@@ -0,0 +1,63 @@
+"""
+Content digests for Wagtail Thumbnail Choice Block.
+
+With thumbnail_directory_dedupe=True, directory scans hash every thumbnail
+file so that byte-identical files (e.g. the same icon copied into several
+size or platform folders) share one URL, and the browser downloads each
+image once. Digests are kept for the life of the process, keyed on the
+file's (device, inode, mtime, size), so rescans (thumbnail_directory_auto_reload,
+other blocks on the same directory) only read files that changed.
+"""
+
+import hashlib
+
+CHUNK_SIZE = 64 * 1024
+
+_digests = {}  # {file identity: hex digest}
+
+
+def _digest_file(f):
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def path_digest(path):
+    """Return the content digest of the local file at `path` (a pathlib.Path)."""
+    stat = path.stat()
+    key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        with path.open("rb") as f:
+            _digests[key] = _digest_file(f)
+    return _digests[key]
+
+
+def storage_digest(storage, name):
+    """
+    Return the content digest of the file `name` in `storage`. Storages have
+    no inodes; digests are reused while the file's size and modification time
+    are unchanged, or not at all if the storage can't report them.
+    """
+    try:
+        key = (
+            f"{type(storage).__module__}.{type(storage).__qualname__}",
+            str(getattr(storage, "location", "")),
+            name,
+            storage.size(name),
+            storage.get_modified_time(name),
+        )
+    except (NotImplementedError, OSError):
+        key = None
+    if key is None or key not in _digests:
+        with storage.open(name, "rb") as f:
+            digest = _digest_file(f)
+        if key is None:
+            return digest
+        _digests[key] = digest
+    return _digests[key]
+
+
+def clear_digests():
+    """Forget every cached digest."""
+    _digests.clear()
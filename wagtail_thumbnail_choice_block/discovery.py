@@ -0,0 +1,36 @@
+"""
+Discovery of the ThumbnailChoiceBlocks used by a project's models.
+"""
+
+from django.apps import apps
+from wagtail.fields import StreamField
+from wagtail.models import get_page_models
+
+from .blocks import iter_thumbnail_choice_blocks
+
+
+def get_stream_field_models():
+    """Return the page models and, if wagtail.snippets is installed, snippet models."""
+    models = get_page_models()
+    if apps.is_installed("wagtail.snippets"):
+        from wagtail.snippets.models import get_snippet_models
+
+        models += [model for model in get_snippet_models() if model not in models]
+    return models
+
+
+def find_thumbnail_choice_blocks(models):
+    """
+    Return [(path, block)] for every distinct ThumbnailChoiceBlock in the
+    StreamFields of `models`, where path is e.g. "home.HomePage.body.hero.icon".
+    A block definition shared by several fields is listed once.
+    """
+    found = {}  # {id(block): (path, block)}; blocks aren't hashable
+    for model in models:
+        for field in model._meta.get_fields():
+            if not isinstance(field, StreamField):
+                continue
+            prefix = f"{model._meta.label}.{field.name}"
+            for path, block in iter_thumbnail_choice_blocks(field.stream_block, prefix):
+                found.setdefault(id(block), (path, block))
+    return list(found.values())
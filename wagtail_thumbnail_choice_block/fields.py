@@ -0,0 +1,58 @@
+"""
+Form field classes for Wagtail Thumbnail Choice Block.
+"""
+
+from django import forms
+
+
+def build_choice_index(choices):
+    """
+    Map the string form of every choice value to the value itself, looking
+    inside optgroups. Earlier choices win if two values share a string form,
+    matching the first-match behaviour of a linear scan.
+    """
+    index = {}
+    for key, label in choices:
+        if isinstance(label, (list, tuple)):
+            for sub_key, _sub_label in label:
+                index.setdefault(str(sub_key), sub_key)
+        else:
+            index.setdefault(str(key), key)
+    return index
+
+
+class ThumbnailChoiceField(forms.ChoiceField):
+    """
+    ChoiceField that looks up submitted values in a dict index of its choices
+    instead of scanning the choices list for every value.
+
+    The index is rebuilt lazily whenever a new choices list is assigned, so
+    ThumbnailChoiceBlock refreshing callable choices at render time keeps it
+    current. Choices that are not a plain list (e.g. Django's
+    CallableChoiceIterator) are re-indexed on every lookup, since their
+    contents can change without the object changing.
+
+    If `provider` is set (see providers.py), submitted values are validated
+    with a single provider.get() lookup instead.
+    """
+
+    provider = None
+    _choice_index = None
+    _choice_index_source = None
+
+    @property
+    def choice_index(self):
+        """Return {str(value): value} for every choice value."""
+        choices = self._choices
+        if not isinstance(choices, list):
+            return build_choice_index(choices)
+        if self._choice_index_source is not choices:
+            self._choice_index = build_choice_index(choices)
+            self._choice_index_source = choices
+        return self._choice_index
+
+    def valid_value(self, value):
+        """Check to see if the provided value is a valid choice."""
+        if self.provider is not None:
+            return self.provider.get(str(value)) is not None
+        return str(value) in self.choice_index
@@ -0,0 +1,124 @@
+"""
+Index of static file roots for Wagtail Thumbnail Choice Block.
+
+Locating a thumbnail_directory means checking it against every static root:
+each app's static/ folder, each STATICFILES_DIRS entry and STATIC_ROOT.
+Instead of one stat per root for every directory-mode block, the roots are
+listed once per process. The index maps each top-level directory name to the
+roots that contain it, so a lookup only checks the roots that can match.
+"""
+
+import os
+import posixpath
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Settings that change the set of static roots.
+STATIC_ROOT_SETTINGS = {
+    "INSTALLED_APPS",
+    "STATICFILES_DIRS",
+    "STATICFILES_FINDERS",
+    "STATIC_ROOT",
+}
+
+_index = None  # {top-level directory name: [root, ...]}, in search order
+_resolved = {}  # {relative directory: absolute Path}
+
+
+def get_static_roots():
+    """
+    Return the filesystem roots searched for thumbnail directories, in order:
+    the storage locations and locations of each staticfiles finder, then
+    STATIC_ROOT.
+
+    Note: Only Django's built-in AppDirectoriesFinder and FileSystemFinder are
+    searched, via their internal 'storages' and 'locations' attributes. These
+    are not part of Django's public staticfiles API; getattr with safe defaults
+    is intentional — if a future Django version renames them, or a custom finder
+    lacks them, the finder is silently skipped rather than crashing. STATIC_ROOT
+    remains the guaranteed fallback.
+    """
+    from django.contrib.staticfiles.finders import get_finders
+
+    roots = []
+    for finder in get_finders():
+        for storage in getattr(finder, "storages", {}).values():
+            loc = getattr(storage, "location", None)
+            if loc:
+                roots.append(Path(loc))
+        for _prefix, root in getattr(finder, "locations", []):
+            roots.append(Path(root))
+
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if static_root:
+        roots.append(Path(static_root))
+
+    # FileSystemFinder reports each root both as a storage and as a location.
+    return list(dict.fromkeys(roots))
+
+
+def _build_index():
+    index = {}
+    for root in get_static_roots():
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        index.setdefault(entry.name, []).append(root)
+        except OSError:
+            # Roots that don't exist (e.g. STATIC_ROOT before collectstatic)
+            continue
+    return index
+
+
+def _search(relative):
+    first = PurePosixPath(relative).parts[0]
+    for root in _index.get(first, []):
+        candidate = root / relative
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def find_static_directory(relative):
+    """
+    Return the absolute path of `relative` (e.g. "icons/arrows") under the first
+    static root that contains it as a directory, or None if none does (or
+    `relative` is empty). Leading and trailing slashes are ignored.
+    """
+    global _index
+    relative = posixpath.normpath(relative.strip("/")) if relative else ""
+    if relative in ("", "."):
+        return None
+    resolved = _resolved.get(relative)
+    if resolved is not None and resolved.is_dir():
+        return resolved
+
+    if _index is None:
+        _index = _build_index()
+    resolved = _search(relative)
+    if resolved is None:
+        # The directory may have been created since the index was built
+        # (e.g. in development); rebuild once before giving up.
+        _index = _build_index()
+        resolved = _search(relative)
+
+    if resolved is not None:
+        _resolved[relative] = resolved
+    return resolved
+
+
+def clear_index():
+    """Forget the static roots index, e.g. after adding a static root at runtime."""
+    global _index
+    _index = None
+    _resolved.clear()
+
+
+@receiver(setting_changed)
+def _clear_index_on_setting_changed(setting, **kwargs):
+    if setting in STATIC_ROOT_SETTINGS:
+        clear_index()
@@ -0,0 +1,213 @@
+"""
+Frozen directory scans for Wagtail Thumbnail Choice Block.
+
+The thumbnail_choice_freeze management command records, for every
+ThumbnailChoiceBlock in directory mode, the result of scanning its
+thumbnail_directory (files, choices, thumbnail URLs and tree) in a JSON file.
+Run it after collectstatic at build time and point production at the file:
+
+    WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS = BASE_DIR / "thumbnail-choices.json"
+
+Blocks then load their scan from the file instead of walking the staticfiles
+locations, and their thumbnail URLs are the ones the static files storage
+returned at build time (e.g. ManifestStaticFilesStorage's hashed names).
+"""
+
+import functools
+import hashlib
+import json
+import re
+import types
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+FORMAT_VERSION = 1
+
+_frozen_scans = None
+
+
+def _value_key(value):
+    """
+    Return a string identifying `value` (an argument, default or closure
+    variable of a callable) by its contents, or None if it has no such string.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    if isinstance(value, (tuple, list, set, frozenset)):
+        items = [_value_key(item) for item in value]
+        if None in items:
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()
+        return f"{type(value).__name__}({', '.join(items)})"
+    if isinstance(value, dict):
+        items = [(_value_key(key), _value_key(item)) for key, item in value.items()]
+        if any(None in pair for pair in items):
+            return None
+        return f"dict({', '.join(f'{key}: {item}' for key, item in sorted(items))})"
+    if isinstance(value, re.Pattern):
+        return f"re({value.pattern!r}, {value.flags})"
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if callable(value):
+        return callable_key(value)
+    return None
+
+
+def _code_key(code):
+    """Return a digest of a code object's bytecode, constants and names."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            digest.update(_code_key(const).encode())
+        else:
+            digest.update(repr(const).encode())
+    digest.update(repr(code.co_names).encode())
+    return digest.hexdigest()
+
+
+def callable_key(fn):
+    """
+    Return a string identifying `fn` that is stable across processes running the
+    same code, or None if there is no such string (e.g. a callable object, or
+    a function closing over one).
+
+    Functions are identified by module and qualified name. Lambdas and nested
+    functions share a qualified name with their siblings, so a digest of their
+    code is added: identical lambdas share a key, different ones don't. The
+    defaults and closure variables of a function, the arguments of a
+    functools.partial and the class of a classmethod are part of the key.
+    """
+    if fn is None:
+        return ""
+    if isinstance(fn, functools.partial):
+        parts = [callable_key(fn.func), _value_key(fn.args), _value_key(fn.keywords)]
+        return None if None in parts else f"partial({', '.join(parts)})"
+    if isinstance(fn, types.MethodType):
+        # Methods bound to instances depend on the instance's state
+        if not isinstance(fn.__self__, type):
+            return None
+        return f"{_value_key(fn.__self__)}.{fn.__name__}"
+    module = getattr(fn, "__module__", None) or getattr(
+        getattr(fn, "__objclass__", None), "__module__", None
+    )
+    qualname = getattr(fn, "__qualname__", None)
+    if not module or not qualname:
+        return None
+    key = f"{module}.{qualname}"
+    code = getattr(fn, "__code__", None)
+    if "<" in qualname:
+        if code is None:
+            return None
+        key = f"{key}:{_code_key(code)}"
+    if isinstance(fn, types.FunctionType):
+        try:
+            # A recursive nested function closes over itself
+            closure = [
+                cell.cell_contents
+                for cell in fn.__closure__ or ()
+                if cell.cell_contents is not fn
+            ]
+        except ValueError:  # A closure variable that isn't assigned yet
+            return None
+        state = [
+            _value_key(value)
+            for value in (fn.__defaults__, fn.__kwdefaults__, closure)
+            if value
+        ]
+        if None in state:
+            return None
+        if state:
+            key = f"{key}({', '.join(state)})"
+    return key
+
+
+def scan_key(directory, value_fn, label_fn, sort_key, storage=None, **options):
+    """
+    Return the key a scan is frozen under, or None if one of the callables
+    cannot be identified across processes. Scans through a storage (see
+    thumbnail_directory_storage) are told apart by its class and location.
+    Other `options` that change a scan's result (see
+    ThumbnailChoiceBlock._scan_options) are added as "name=value" for those
+    that are set.
+    """
+    parts = [callable_key(fn) for fn in (value_fn, label_fn, sort_key)]
+    if None in parts:
+        return None
+    if storage is not None:
+        storage_class = type(storage)
+        location = getattr(storage, "location", "")
+        parts.append(
+            f"{storage_class.__module__}.{storage_class.__qualname__}:{location}"
+        )
+    for name, value in sorted(options.items()):
+        if value not in (None, False, ()):
+            parts.append(f"{name}={value!r}")
+    return "|".join([directory, *parts])
+
+
+def freeze_scan(scan, files):
+    """Return the JSON-serialisable form of a (choices, thumbnail_map, tree_items) scan."""
+    choices, thumbnail_map, tree_items = scan
+    return {
+        "files": files,
+        "choices": [list(choice) for choice in choices],
+        "thumbnails": thumbnail_map,
+        "tree": tree_items,
+    }
+
+
+def write_frozen_scans(path, scans):
+    """Write {scan_key: freeze_scan(...)} to `path` as JSON."""
+    Path(path).write_text(
+        json.dumps({"version": FORMAT_VERSION, "scans": scans}, indent=2)
+    )
+
+
+def _load_frozen_scans():
+    path = getattr(settings, "WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS", None)
+    if not path:
+        return {}
+    try:
+        data = json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        raise ImproperlyConfigured(
+            f"WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS file '{path}' does not exist. "
+            f"Run 'manage.py thumbnail_choice_freeze' after collectstatic."
+        )
+    if data.get("version") != FORMAT_VERSION:
+        raise ImproperlyConfigured(
+            f"WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS file '{path}' was written by a "
+            f"different version of wagtail-thumbnail-choice-block. Run "
+            f"'manage.py thumbnail_choice_freeze' again."
+        )
+    return data["scans"]
+
+
+def get_frozen_scan(key):
+    """
+    Return the frozen (choices, thumbnail_map, tree_items) scan for `key`, or
+    None if there is none. The file is read once per process.
+    """
+    global _frozen_scans
+    if key is None:
+        return None
+    if _frozen_scans is None:
+        _frozen_scans = _load_frozen_scans()
+    frozen = _frozen_scans.get(key)
+    if frozen is None:
+        return None
+    choices = [tuple(choice) for choice in frozen["choices"]]
+    return choices, frozen["thumbnails"], frozen["tree"]
+
+
+@receiver(setting_changed)
+def _reset_frozen_scans(setting, **kwargs):
+    global _frozen_scans
+    if setting == "WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS":
+        _frozen_scans = None
@@ -0,0 +1,123 @@
+"""
+Storage listings for Wagtail Thumbnail Choice Block.
+
+Directory mode normally walks a local static folder. With
+thumbnail_directory_storage, it lists a Django Storage instead (e.g. S3 via
+django-storages), through the public Storage.listdir() API. Remote listdir()
+calls are slow, so:
+
+- the directories at each depth are listed concurrently, one batch per level,
+  rather than one request after another, and
+- the complete listing can be kept in a Django cache shared by all processes:
+
+    WAGTAIL_THUMBNAIL_CHOICE_LISTING_CACHE = {
+        "CACHE": "default",  # cache alias
+        "TIMEOUT": 3600,  # seconds; defaults to the cache's own timeout
+        "VERSION": RELEASE_ID,  # e.g. a release id, to start fresh on deploy
+    }
+"""
+
+import hashlib
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+
+from .cache import get_listing_cache
+from .singleflight import build_shared
+
+# Maximum number of concurrent listdir() calls per level.
+MAX_WORKERS = 8
+
+
+def match_patterns(rel_path, patterns):
+    """
+    Return True if `rel_path` (a "/"-separated path relative to a
+    thumbnail_directory) matches one of the glob `patterns`. As in
+    .gitignore, a pattern without a "/" matches the last path component
+    (e.g. "@2x" or "*.png"), and one with a "/" the whole path (e.g.
+    "brand/*/src"). "*" matches across "/" in either.
+    """
+    name = posixpath.basename(rel_path)
+    return any(
+        fnmatchcase(rel_path if "/" in pattern else name, pattern)
+        for pattern in patterns
+    )
+
+
+def is_pruned(rel_path, depth, exclude=(), max_depth=None):
+    """
+    Return True if the directory at `rel_path`, `depth` levels below a
+    thumbnail_directory, is excluded by thumbnail_directory_exclude or
+    thumbnail_directory_max_depth and so must not be listed.
+    """
+    return (max_depth is not None and depth > max_depth) or match_patterns(
+        rel_path, exclude
+    )
+
+
+def listing_cache_key(storage, directory, exclude=(), max_depth=None):
+    """Return the listing cache key for `directory` in `storage`."""
+    identity = (
+        f"{type(storage).__module__}.{type(storage).__qualname__}",
+        str(getattr(storage, "location", "")),
+        str(getattr(storage, "base_url", "")),
+        directory,
+    )
+    if exclude or max_depth is not None:
+        identity += (tuple(exclude), max_depth)
+    digest = hashlib.sha256(repr(identity).encode()).hexdigest()
+    return f"wagtail_thumbnail_choice_listing:{digest}"
+
+
+def list_storage_directory(
+    storage, directory, use_cache=True, exclude=(), max_depth=None
+):
+    """
+    Return {path: (dirs, files)} for `directory` and every directory below it
+    in `storage`, as returned by storage.listdir(). Hidden (dot) directories,
+    and those pruned by `exclude` and `max_depth` (see is_pruned), are not
+    listed.
+
+    Args:
+        storage: A Django Storage
+        directory: The directory to list, relative to the storage root
+        use_cache: Whether to read and write WAGTAIL_THUMBNAIL_CHOICE_LISTING_CACHE
+        exclude: Glob patterns of directories not to descend into
+        max_depth: The depth of the deepest directories to list; `directory`
+                   itself is depth 0
+    """
+    directory = directory.strip("/")
+    cache = get_listing_cache() if use_cache else None
+    if cache is None:
+        return _list_tree(storage, directory, exclude, max_depth)
+
+    cache, options = cache
+    key = listing_cache_key(storage, directory, exclude, max_depth)
+    listing = cache.get(key, version=options["version"])
+    if listing is not None:
+        return listing
+    return build_shared(
+        cache, key, lambda: _list_tree(storage, directory, exclude, max_depth), options
+    )
+
+
+def _list_tree(storage, directory, exclude, max_depth):
+    listing = {}
+    level = [directory]
+    depth = 0
+    prefix = len(directory) + 1 if directory else 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        while level:
+            results = executor.map(storage.listdir, level)
+            next_level = []
+            depth += 1
+            for path, (dirs, files) in zip(level, results):
+                listing[path] = (sorted(dirs), sorted(files))
+                for name in dirs:
+                    if name.startswith("."):
+                        continue
+                    child = posixpath.join(path, name)
+                    if not is_pruned(child[prefix:], depth, exclude, max_depth):
+                        next_level.append(child)
+            level = next_level
+    return listing
@@ -0,0 +1,89 @@
+"""
+Management command to freeze thumbnail_directory scans into a JSON file.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.encoding import force_str
+
+from wagtail_thumbnail_choice_block.discovery import (
+    find_thumbnail_choice_blocks,
+    get_stream_field_models,
+)
+from wagtail_thumbnail_choice_block.frozen import freeze_scan, write_frozen_scans
+
+
+def recording_url_for(storage, files):
+    """
+    Return a url_for callable for ThumbnailChoiceBlock._scan_directory that
+    returns storage URLs and appends each path it is called with to `files`.
+    """
+
+    def url_for(static_path):
+        files.append(static_path)
+        return force_str(storage.url(static_path))
+
+    return url_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Scan the thumbnail_directory of every directory-mode ThumbnailChoiceBlock "
+        "used by page and snippet StreamFields and write the results, with URLs "
+        "from the static files storage, to a JSON file. Run it after collectstatic "
+        "and set WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS to the file in production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="File to write (default: WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS).",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(
+            settings, "WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS", None
+        )
+        if not output:
+            raise CommandError(
+                "Pass --output or set WAGTAIL_THUMBNAIL_CHOICE_FROZEN_SCANS."
+            )
+
+        scans = {}
+        for path, block in find_thumbnail_choice_blocks(get_stream_field_models()):
+            if not block._thumbnail_directory:
+                continue
+            key = block._frozen_scan_key()
+            if key is None:
+                self.stderr.write(
+                    self.style.WARNING(
+                        f"{path}: skipped, its thumbnail_directory_* callables "
+                        f"cannot be identified across processes (e.g. callable "
+                        f"objects). It will be scanned at runtime."
+                    )
+                )
+                continue
+            if key in scans:
+                continue
+
+            files = []
+            storage = block._thumbnail_directory_storage or staticfiles_storage
+            start = time.perf_counter()
+            scan = block._scan_directory(url_for=recording_url_for(storage, files))
+            scans[key] = freeze_scan(scan, files)
+            summary = f"{len(files)} files"
+            if block._thumbnail_directory_dedupe:
+                # Duplicates reuse an earlier file's URL, so url_for skips them
+                summary += f" ({len(scan[0]) - len(files)} duplicates)"
+            self.stdout.write(
+                f"{path}: {block._thumbnail_directory}, {summary}, "
+                f"scanned in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+
+        write_frozen_scans(output, scans)
+        self.stdout.write(
+            self.style.SUCCESS(f"Froze {len(scans)} directory scan(s) to {output}.")
+        )
@@ -0,0 +1,41 @@
+"""
+Management command to dump the thumbnail choice block metrics counters.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail_thumbnail_choice_block import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the metrics recorded by the configured thumbnail choice metrics "
+        "backend as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        backend = metrics.get_backend()
+        if not getattr(backend, "shared", False):
+            # This command runs in its own process, so a backend that keeps
+            # per-process totals (or none) would only ever report its own.
+            raise CommandError(
+                f"The metrics backend {type(backend).__name__} does not share "
+                f"its counters between processes, so this command cannot read "
+                f"them. Set WAGTAIL_THUMBNAIL_CHOICE_METRICS to use "
+                f"CacheMetricsBackend."
+            )
+        snapshot = backend.snapshot()
+
+        self.stdout.write(json.dumps(snapshot, indent=2, sort_keys=True))
+
+        if options["reset"]:
+            backend.reset()
@@ -0,0 +1,96 @@
+"""
+Management command to prewarm the thumbnail choice render cache.
+"""
+
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import translation
+
+from wagtail_thumbnail_choice_block.cache import (
+    get_shared_render_cache,
+    request_cache_scope,
+)
+from wagtail_thumbnail_choice_block.discovery import (
+    find_thumbnail_choice_blocks,
+    get_stream_field_models,
+)
+from wagtail_thumbnail_choice_block.widgets import ThumbnailRadioSelect
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every ThumbnailChoiceBlock used by page and snippet StreamFields "
+        "into the render cache, so that the first editor after a deploy does not "
+        "pay for cold caches. Run it once per release, with "
+        "WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE pointing at a cache shared by all "
+        "web processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            action="append",
+            dest="languages",
+            help=(
+                "Admin language to render for; repeat for several "
+                "(default: LANGUAGE_CODE)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        languages = options["languages"] or [settings.LANGUAGE_CODE]
+        if get_shared_render_cache() is None:
+            self.stderr.write(
+                self.style.WARNING(
+                    "WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE is not set, so the "
+                    "rendered HTML only warms this process's cache."
+                )
+            )
+
+        found = find_thumbnail_choice_blocks(get_stream_field_models())
+        total_start = time.perf_counter()
+        # Resolve each callable source once, however many blocks share it.
+        with request_cache_scope():
+            for path, block in found:
+                self.warm_block(path, block, languages)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {len(found)} block(s) in {len(languages)} language(s) "
+                f"in {(time.perf_counter() - total_start) * 1000:.1f}ms."
+            )
+        )
+
+    def warm_block(self, path, block, languages):
+        # Accessing block.field builds the field and its widget, resolving
+        # callable choices and mappings.
+        start = time.perf_counter()
+        widget = block.field.widget
+        resolve_time = time.perf_counter() - start
+
+        if not isinstance(widget, ThumbnailRadioSelect):
+            # e.g. a choice_provider block, which renders its selection only
+            self.stdout.write(f"{path}: nothing to warm")
+            return
+
+        render_times = []
+        for language in languages:
+            with translation.override(language):
+                # What Wagtail's telepath adapter sends to the page editor.
+                ThumbnailRadioSelect._render_cache.pop(
+                    widget.js_state_cache_key(), None
+                )
+                start = time.perf_counter()
+                state = widget.get_js_state()
+                render_times.append(time.perf_counter() - start)
+
+        size = len(json.dumps(state, separators=(",", ":")).encode())
+        source = block._thumbnail_directory or "choices"
+        self.stdout.write(
+            f"{path}: {source}, {len(widget.choices)} options, "
+            f"resolve {resolve_time * 1000:.1f}ms, "
+            f"render {sum(render_times) * 1000:.1f}ms, {size} bytes"
+        )
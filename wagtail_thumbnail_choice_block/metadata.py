@@ -0,0 +1,88 @@
+"""
+Thumbnail metadata for Wagtail Thumbnail Choice Block.
+
+With thumbnail_directory_metadata=True, each image's intrinsic size (and, for
+opaque raster images, an average-color placeholder) is read when the
+directory is scanned and cached with the scan. The widget then gives every
+<img> its width and height, and paints the placeholder until it loads.
+"""
+
+import re
+
+_SVG_TAG = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+_VIEW_BOX = re.compile(r"\sviewBox\s*=\s*[\"']([^\"']*)[\"']", re.IGNORECASE)
+_LENGTH = r"\s{name}\s*=\s*[\"']\s*([0-9.]+)\s*(?:px)?\s*[\"']"
+_WIDTH = re.compile(_LENGTH.format(name="width"), re.IGNORECASE)
+_HEIGHT = re.compile(_LENGTH.format(name="height"), re.IGNORECASE)
+
+
+def _number(value):
+    number = float(value)
+    return int(number) if number.is_integer() else round(number, 3)
+
+
+def svg_metadata(svg):
+    """
+    Return {"width", "height"} for an SVG document: its viewBox size, or its
+    width and height attributes if it has no viewBox. Returns {} if neither
+    is usable (e.g. percentages).
+    """
+    root = _SVG_TAG.search(svg)
+    if root is None:
+        return {}
+    tag = root.group(0)
+    view_box = _VIEW_BOX.search(tag)
+    try:
+        if view_box is not None:
+            _x, _y, width, height = re.split(r"[\s,]+", view_box.group(1).strip())
+        else:
+            width, height = _WIDTH.search(tag).group(1), _HEIGHT.search(tag).group(1)
+        width, height = _number(width), _number(height)
+    except (AttributeError, ValueError):
+        return {}
+    if width <= 0 or height <= 0:
+        return {}
+    return {"width": width, "height": height}
+
+
+def raster_metadata(file):
+    """
+    Return {"width", "height", "placeholder"} for the raster image in the
+    open binary `file`. The size comes from the image header; "placeholder"
+    is the image's average color as "#rrggbb", present only for images with
+    no transparent pixels (a placeholder would show through). Returns {} if
+    Pillow cannot read the image.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(file) as image:
+            metadata = {"width": image.width, "height": image.height}
+            # Lets JPEG decode at a fraction of its size
+            image.draft("RGB", (32, 32))
+            image = image.convert("RGBA")
+            if image.getextrema()[3][0] == 255:
+                red, green, blue, _alpha = image.resize((1, 1), Image.BOX).getpixel(
+                    (0, 0)
+                )
+                metadata["placeholder"] = f"#{red:02x}{green:02x}{blue:02x}"
+            return metadata
+    except (OSError, UnidentifiedImageError, ValueError, Image.DecompressionBombError):
+        return {}
+
+
+def image_metadata(suffix, open_file, svg=None):
+    """
+    Return the metadata for an image file with extension `suffix`, opened by
+    open_file(). `svg` is the file's text, if it has already been read.
+    """
+    try:
+        if suffix.lower() == ".svg":
+            if svg is None:
+                with open_file() as f:
+                    svg = f.read().decode("utf-8")
+            return svg_metadata(svg)
+        with open_file() as f:
+            return raster_metadata(f)
+    except (OSError, UnicodeDecodeError):
+        return {}
@@ -0,0 +1,319 @@
+"""
+Instrumentation for Wagtail Thumbnail Choice Block.
+
+The block and widget record timings, cache hits/misses, entry counts and
+rendered sizes on their hot paths. Every measurement is:
+
+- sent as the `metric_recorded` Django signal, and
+- passed to the configured metrics backend.
+
+The default backend discards everything. Configure another one with:
+
+    WAGTAIL_THUMBNAIL_CHOICE_METRICS = {
+        "BACKEND": "wagtail_thumbnail_choice_block.metrics.CacheMetricsBackend",
+        "OPTIONS": {"cache": "default"},
+    }
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import Signal, receiver
+from django.utils.module_loading import import_string
+
+# Sent for every measurement with the keyword arguments:
+#   name     — metric name (one of METRICS)
+#   kind     — "counter", "timing" (value in seconds) or "value"
+#   value    — the count, duration or measured value
+#   instance — the block or widget the measurement relates to, if any
+#   tags     — dict of extra context (e.g. {"directory": "icons"})
+metric_recorded = Signal()
+
+COUNTER = "counter"
+TIMING = "timing"
+VALUE = "value"
+
+# Every metric recorded by this package, with its kind.
+METRICS = {
+    "find_static_directory": TIMING,
+    "scan_directory": TIMING,
+    "scan_directory.entries": VALUE,
+    "scan_directory.duplicates": VALUE,
+    "inline_svg.count": VALUE,
+    "scan_cache.hit": COUNTER,
+    "scan_cache.miss": COUNTER,
+    "frozen_scan.hit": COUNTER,
+    "resolve_callable": TIMING,
+    "callable_cache.hit": COUNTER,
+    "callable_cache.miss": COUNTER,
+    "render_template": TIMING,
+    "widget_render": TIMING,
+    "widget_render.bytes": VALUE,
+    "widget_state.bytes": VALUE,
+    "widget_render.options": VALUE,
+    "render_cache.hit": COUNTER,
+    "render_cache.miss": COUNTER,
+    "shared_render_cache.hit": COUNTER,
+    "shared_render_cache.miss": COUNTER,
+    "single_flight.wait": COUNTER,
+    "cache_lock.wait": COUNTER,
+    "provider_search": TIMING,
+    "provider_lookup": TIMING,
+}
+
+DEFAULT_BACKEND = "wagtail_thumbnail_choice_block.metrics.NoopMetricsBackend"
+
+_backend = None
+
+
+class NoopMetricsBackend:
+    """Discards all measurements. The default backend."""
+
+    # Whether snapshot() reports the totals of every process, so that another
+    # process (e.g. the thumbnail_choice_metrics command) can read them.
+    shared = False
+
+    def __init__(self, **options):
+        pass
+
+    def incr(self, name, count, tags):
+        pass
+
+    def timing(self, name, seconds, tags):
+        pass
+
+    def observe(self, name, value, tags):
+        pass
+
+    def snapshot(self):
+        """Return the recorded metrics, or None if this backend keeps none."""
+
+    def reset(self):
+        pass
+
+
+class InMemoryMetricsBackend(NoopMetricsBackend):
+    """
+    Aggregates measurements in process memory. Counters are summed; timings and
+    values keep their count, total and maximum. Useful in development and
+    tests; each worker process keeps its own totals.
+    """
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timings = {}
+        self._values = {}
+
+    def incr(self, name, count, tags):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    def timing(self, name, seconds, tags):
+        self._aggregate(self._timings, name, seconds)
+
+    def observe(self, name, value, tags):
+        self._aggregate(self._values, name, value)
+
+    def _aggregate(self, store, name, value):
+        with self._lock:
+            stats = store.setdefault(name, {"count": 0, "total": 0, "max": 0})
+            stats["count"] += 1
+            stats["total"] += value
+            stats["max"] = max(stats["max"], value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timings": {k: dict(v) for k, v in self._timings.items()},
+                "values": {k: dict(v) for k, v in self._values.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._timings = {}
+            self._values = {}
+
+
+class CacheMetricsBackend(NoopMetricsBackend):
+    """
+    Aggregates measurements in a Django cache so that totals are shared by all
+    worker processes and can be read by the thumbnail_choice_metrics management
+    command. Use a cache that supports atomic incr() across processes (e.g.
+    Redis or Memcached). Timings are stored in microseconds and reported in
+    seconds; maximums are not tracked.
+
+    Options:
+        cache: Cache alias to use (default: "default")
+        key_prefix: Prefix for cache keys (default: "wagtail_thumbnail_choice_metrics")
+    """
+
+    shared = True
+
+    def __init__(self, cache="default", key_prefix="wagtail_thumbnail_choice_metrics"):
+        self.cache_alias = cache
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, name, field):
+        return f"{self.key_prefix}:{name}:{field}"
+
+    def _incr(self, key, delta):
+        self.cache.add(key, 0, timeout=None)
+        try:
+            self.cache.incr(key, delta)
+        except ValueError:
+            # Evicted between add() and incr(); start again from this delta.
+            self.cache.set(key, delta, timeout=None)
+
+    def incr(self, name, count, tags):
+        self._incr(self._key(name, "count"), count)
+
+    def timing(self, name, seconds, tags):
+        self._incr(self._key(name, "count"), 1)
+        self._incr(self._key(name, "total_us"), int(seconds * 1_000_000))
+
+    def observe(self, name, value, tags):
+        self._incr(self._key(name, "count"), 1)
+        self._incr(self._key(name, "total"), int(value))
+
+    def snapshot(self):
+        keys = [
+            self._key(name, field)
+            for name in METRICS
+            for field in ("count", "total_us", "total")
+        ]
+        stored = self.cache.get_many(keys)
+        result = {"counters": {}, "timings": {}, "values": {}}
+        for name, kind in METRICS.items():
+            count = stored.get(self._key(name, "count"))
+            if count is None:
+                continue
+            if kind == COUNTER:
+                result["counters"][name] = count
+            elif kind == TIMING:
+                total = stored.get(self._key(name, "total_us"), 0) / 1_000_000
+                result["timings"][name] = {"count": count, "total": total}
+            else:
+                total = stored.get(self._key(name, "total"), 0)
+                result["values"][name] = {"count": count, "total": total}
+        return result
+
+    def reset(self):
+        self.cache.delete_many(
+            [
+                self._key(name, field)
+                for name in METRICS
+                for field in ("count", "total_us", "total")
+            ]
+        )
+
+
+class StatsdMetricsBackend(NoopMetricsBackend):
+    """
+    Forwards measurements to a StatsD-style client: counters via
+    client.incr(name, count), timings via client.timing(name, milliseconds)
+    and values via client.timing(name, value), so that byte sizes and entry
+    counts get the same percentile aggregation as durations.
+
+    Options:
+        client: A client object, or the dotted path to one
+                (e.g. "myproject.metrics.statsd_client")
+        prefix: Metric name prefix (default: "wagtail_thumbnail_choice")
+    """
+
+    def __init__(self, client, prefix="wagtail_thumbnail_choice"):
+        self.client = import_string(client) if isinstance(client, str) else client
+        self.prefix = prefix
+
+    def _name(self, name):
+        return f"{self.prefix}.{name}" if self.prefix else name
+
+    def incr(self, name, count, tags):
+        self.client.incr(self._name(name), count)
+
+    def timing(self, name, seconds, tags):
+        self.client.timing(self._name(name), seconds * 1000)
+
+    def observe(self, name, value, tags):
+        self.client.timing(self._name(name), value)
+
+
+def get_backend():
+    """Return the configured metrics backend, instantiating it on first use."""
+    global _backend
+    if _backend is None:
+        config = getattr(settings, "WAGTAIL_THUMBNAIL_CHOICE_METRICS", None) or {}
+        backend_class = import_string(config.get("BACKEND", DEFAULT_BACKEND))
+        _backend = backend_class(**config.get("OPTIONS", {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting == "WAGTAIL_THUMBNAIL_CHOICE_METRICS":
+        _backend = None
+
+
+def _send(name, kind, value, instance, tags):
+    metric_recorded.send(
+        sender=type(instance) if instance is not None else None,
+        name=name,
+        kind=kind,
+        value=value,
+        instance=instance,
+        tags=tags,
+    )
+
+
+def incr(name, count=1, instance=None, **tags):
+    """Add `count` to the counter `name`."""
+    get_backend().incr(name, count, tags)
+    _send(name, COUNTER, count, instance, tags)
+
+
+def timing(name, seconds, instance=None, **tags):
+    """Record a duration, in seconds, for `name`."""
+    get_backend().timing(name, seconds, tags)
+    _send(name, TIMING, seconds, instance, tags)
+
+
+def observe(name, value, instance=None, **tags):
+    """Record a measured value (e.g. a size or count) for `name`."""
+    get_backend().observe(name, value, tags)
+    _send(name, VALUE, value, instance, tags)
+
+
+@contextmanager
+def timer(name, instance=None, **tags):
+    """Record the time spent in the with-block as a timing for `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing(name, time.perf_counter() - start, instance=instance, **tags)
+
+
+def timed(name):
+    """Decorate a method so that each call is recorded as a timing for `name`."""
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with timer(name, instance=self):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
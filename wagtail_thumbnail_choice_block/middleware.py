@@ -0,0 +1,39 @@
+"""
+Middleware for Wagtail Thumbnail Choice Block.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .cache import request_cache_scope
+
+
+class ThumbnailChoiceRequestCacheMiddleware:
+    """
+    Resolve each callable choices/thumbnails/thumbnail_templates source at most
+    once per HTTP request.
+
+    A Wagtail edit page renders every ThumbnailChoiceBlock occurrence in its
+    StreamFields, and each one resolves its callable sources again. With this
+    middleware installed, the first resolution of a callable is reused for the
+    rest of the request.
+
+    Works under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_cache_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_cache_scope():
+            return await self.get_response(request)
@@ -0,0 +1,130 @@
+"""
+Django Debug Toolbar panel for Wagtail Thumbnail Choice Block.
+
+Lists every ThumbnailChoiceBlock rendered during the request with its option
+count, render cache hits/misses, thumbnail template render time, callable
+resolution time, and the bytes emitted: rendered HTML, and the JSON widget
+state the page editor builds its pickers from. Enable it with:
+
+    DEBUG_TOOLBAR_PANELS = [
+        ...
+        "wagtail_thumbnail_choice_block.panels.ThumbnailChoicePanel",
+    ]
+"""
+
+from contextvars import ContextVar
+
+from debug_toolbar.panels import Panel
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from django.utils.translation import ngettext
+
+from . import metrics
+
+# The panel collecting metrics for the request running in this context. A
+# context variable (rather than a receiver per panel) keeps concurrent requests
+# from recording into each other's panels.
+_active_panel = ContextVar("wagtail_thumbnail_choice_panel", default=None)
+
+
+@receiver(metrics.metric_recorded)
+def _record_metric(name, value, instance, **kwargs):
+    panel = _active_panel.get()
+    if panel is not None and instance is not None:
+        panel.record_metric(name, value, instance)
+
+
+class ThumbnailChoicePanel(Panel):
+    """Per-block rendering costs of ThumbnailChoiceBlock for the current request."""
+
+    title = _("Thumbnail choices")
+    template = "wagtail_thumbnail_choice_block/debug_toolbar/panel.html"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rows = {}  # {id(block or widget): (block or widget, row)}
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        count = len(stats.get("blocks", []))
+        return ngettext(
+            "%(count)d block in %(time).2fms",
+            "%(count)d blocks in %(time).2fms",
+            count,
+        ) % {"count": count, "time": stats.get("total_time", 0)}
+
+    def enable_instrumentation(self):
+        _active_panel.set(self)
+
+    def disable_instrumentation(self):
+        if _active_panel.get() is self:
+            _active_panel.set(None)
+
+    def record_metric(self, name, value, instance):
+        """Add one measurement to the row of the block it relates to."""
+        # Widgets created by a block report against that block.
+        owner = getattr(instance, "block", None)
+        if owner is None:
+            owner = instance
+        if id(owner) not in self._rows:
+            self._rows[id(owner)] = (owner, self._new_row(owner))
+        row = self._rows[id(owner)][1]
+
+        if name == "render_cache.hit":
+            row["render_cache_hits"] += value
+        elif name == "render_cache.miss":
+            row["render_cache_misses"] += value
+        elif name == "widget_render":
+            row["render_time"] += value * 1000
+        elif name == "widget_render.bytes":
+            row["bytes"] += value
+        elif name == "widget_state.bytes":
+            row["state_bytes"] += value
+        elif name == "render_template":
+            row["template_renders"] += 1
+            row["template_time"] += value * 1000
+        elif name == "resolve_callable":
+            row["callable_time"] += value * 1000
+
+        if hasattr(instance, "choices") and name.startswith(
+            ("render_cache.", "widget_render", "widget_state")
+        ):
+            row["options"] = len(instance.choices)
+
+    @staticmethod
+    def _new_row(owner):
+        directory = getattr(owner, "_thumbnail_directory", None)
+        return {
+            "name": getattr(owner, "name", "") or "",
+            "label": str(getattr(owner, "label", "") or ""),
+            "block_class": type(owner).__name__,
+            "source": directory or "",
+            "options": None,
+            "render_cache_hits": 0,
+            "render_cache_misses": 0,
+            "render_time": 0,
+            "template_renders": 0,
+            "template_time": 0,
+            "callable_time": 0,
+            "bytes": 0,
+            "state_bytes": 0,
+        }
+
+    def generate_stats(self, request, response):
+        rows = []
+        for _owner, row in self._rows.values():
+            # Template renders for the widget happen inside its render, so
+            # they are already part of render_time.
+            row["total_time"] = row["render_time"] + row["callable_time"]
+            rows.append(row)
+        # Most expensive first, so the offending configuration is at the top.
+        rows.sort(key=lambda row: row["total_time"], reverse=True)
+        self.record_stats(
+            {
+                "blocks": rows,
+                "total_time": sum(row["total_time"] for row in rows),
+                "total_bytes": sum(row["bytes"] for row in rows),
+                "total_state_bytes": sum(row["state_bytes"] for row in rows),
+            }
+        )
@@ -0,0 +1,217 @@
+"""
+Choice providers for Wagtail Thumbnail Choice Block.
+
+A ThumbnailChoiceBlock built with `choice_provider` does not list its choices
+in the page editor. The widget renders the current selection only and asks an
+admin endpoint for matching choices, a page at a time, as the editor types.
+The endpoint and the block's validation both go through the provider:
+
+- search(query, offset, limit) returns one page of matching choices, and
+- get(value) looks up a single submitted value.
+
+Choices are dicts with "value", "label" and "thumbnail_url" keys. Providers
+are registered under their `name` when a block using them is constructed, so
+the endpoint can find them; the name must be the same in every process.
+"""
+
+from abc import ABC, abstractmethod
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import force_str
+
+from . import metrics
+
+_registry = {}
+
+
+def register_choice_provider(provider):
+    """Register `provider` under its name, for the search endpoint."""
+    if not provider.name:
+        raise ImproperlyConfigured(
+            f"{type(provider).__name__} must have a name to be used as a "
+            f"ThumbnailChoiceBlock choice_provider."
+        )
+    _registry[provider.name] = provider
+    return provider
+
+
+def get_choice_provider(name):
+    """Return the provider registered under `name`, or None."""
+    return _registry.get(name)
+
+
+@deconstructible
+class ChoiceProvider(ABC):
+    """
+    Base class for choice providers. Subclasses must implement search() and
+    get(), and may override get_many() with a batched lookup.
+
+    Args:
+        name: The name the provider is registered under. Must be unique and the
+              same in every process (it appears in the search endpoint's URL).
+        page_size: The number of choices returned per search request
+    """
+
+    page_size = 20
+
+    def __init__(self, name=None, page_size=None):
+        self.name = name
+        if page_size is not None:
+            self.page_size = page_size
+
+    @abstractmethod
+    def search(self, query, offset, limit):
+        """
+        Return up to `limit` choice dicts matching `query` (which may be
+        empty), skipping the first `offset` matches.
+        """
+
+    @abstractmethod
+    def get(self, value):
+        """Return the choice dict for `value`, or None if it is not a valid choice."""
+
+    def get_many(self, values):
+        """Return {value: choice dict} for every valid value in `values`."""
+        choices = {}
+        for value in values:
+            choice = self.get(value)
+            if choice is not None:
+                choices[value] = choice
+        return choices
+
+    def search_page(self, query, page):
+        """
+        Return (choices, has_next) for the 1-based `page` of search results.
+        One extra choice is requested to tell whether there is a next page.
+        """
+        offset = (page - 1) * self.page_size
+        with metrics.timer("provider_search", instance=self, provider=self.name):
+            choices = list(self.search(query, offset, self.page_size + 1))
+        return choices[: self.page_size], len(choices) > self.page_size
+
+
+class QuerySetChoiceProvider(ChoiceProvider):
+    """
+    Provide the objects of a model as choices.
+
+    Searching filters on `search_fields` with `icontains`; looking up a value
+    filters on `value_field`, which should be indexed (the primary key by
+    default). Override get_queryset() to restrict or order the objects.
+
+    Example:
+        ```python
+        from wagtail_thumbnail_choice_block.providers import QuerySetChoiceProvider
+
+        class IconProvider(QuerySetChoiceProvider):
+            def get_thumbnail_url(self, obj):
+                return obj.image.url
+
+        icon = ThumbnailChoiceBlock(
+            choice_provider=IconProvider(
+                "icons.Icon", value_field="slug", label_field="title"
+            )
+        )
+        ```
+
+    Args:
+        model: A model class or "app_label.ModelName" string
+        value_field: The field stored as the block's value. Defaults to "pk".
+        label_field: The field shown as the choice label. Defaults to str(obj).
+        search_fields: The fields searched with `icontains`. Defaults to
+                       [label_field], which is required if label_field is not set.
+        name: Defaults to "<app_label>.<model_name>.<value_field>"
+        page_size: The number of choices returned per search request
+    """
+
+    def __init__(
+        self,
+        model,
+        value_field="pk",
+        label_field=None,
+        search_fields=None,
+        name=None,
+        page_size=None,
+    ):
+        if not isinstance(model, str):
+            model = model._meta.label
+        if search_fields is None:
+            if label_field is None:
+                raise ImproperlyConfigured(
+                    "QuerySetChoiceProvider needs search_fields if it has no "
+                    "label_field."
+                )
+            search_fields = [label_field]
+        self.model_label = model
+        self.value_field = value_field
+        self.label_field = label_field
+        self.search_fields = list(search_fields)
+        super().__init__(
+            name=name or f"{model.lower()}.{value_field}", page_size=page_size
+        )
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def get_queryset(self):
+        """Return the objects that are valid choices."""
+        return self.model._default_manager.all()
+
+    def get_label(self, obj):
+        """Return the choice label for `obj`."""
+        if self.label_field is None:
+            return str(obj)
+        return force_str(getattr(obj, self.label_field))
+
+    def get_thumbnail_url(self, obj):
+        """Return the thumbnail URL for `obj`. Override to show thumbnails."""
+        return ""
+
+    def to_choice(self, obj):
+        """Return the choice dict for `obj`."""
+        return {
+            "value": force_str(getattr(obj, self.value_field)),
+            "label": self.get_label(obj),
+            "thumbnail_url": self.get_thumbnail_url(obj),
+        }
+
+    def search(self, query, offset, limit):
+        queryset = self.get_queryset()
+        query = query.strip()
+        if query:
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f"{field}__icontains": query})
+            queryset = queryset.filter(condition)
+        if not queryset.ordered:
+            queryset = queryset.order_by(*(self.search_fields[:1] or ["pk"]))
+        return [self.to_choice(obj) for obj in queryset[offset : offset + limit]]
+
+    def get(self, value):
+        return self.get_many([value]).get(value)
+
+    def get_many(self, values):
+        values = [value for value in values if value not in (None, "")]
+        if not values:
+            return {}
+        with metrics.timer("provider_lookup", instance=self, provider=self.name):
+            try:
+                objects = list(
+                    self.get_queryset().filter(**{f"{self.value_field}__in": values})
+                )
+            except (TypeError, ValueError, ValidationError):
+                # A value that cannot be converted to the field's type is not
+                # a valid choice (e.g. "abc" for an integer primary key).
+                return {}
+        choices = {}
+        for obj in objects:
+            choice = self.to_choice(obj)
+            choices[choice["value"]] = choice
+        return {
+            value: choices[force_str(value)]
+            for value in values
+            if force_str(value) in choices
+        }
@@ -0,0 +1,112 @@
+"""
+Single-flight cache fills for Wagtail Thumbnail Choice Block.
+
+Right after a deploy, the first requests all miss the scan and render caches.
+Under threaded workers each would scan the same directory, or render the same
+widget, at the same time and then race to store the same result. A
+SingleFlight lets the first thread compute a key while the others wait for
+its result.
+
+Misses in the shared Django caches (WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE and
+WAGTAIL_THUMBNAIL_CHOICE_LISTING_CACHE) can be coordinated across processes
+too: with a "LOCK_TIMEOUT" in the setting, build_shared lets one process at a
+time build a missing entry while the others poll the cache for it.
+"""
+
+import threading
+import time
+
+from . import metrics
+
+# Seconds between checks of the shared cache while another process builds
+POLL_INTERVAL = 0.05
+
+
+class _Flight:
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # {key: _Flight} for the computations in progress
+
+    def do(self, key, compute, instance=None):
+        """
+        Return compute(). If another thread is already computing `key`, wait
+        for it and return its result, or raise its exception, instead.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.thread == threading.get_ident():
+                # compute() for `key` needs `key` again; waiting would deadlock
+                return compute()
+            metrics.incr("single_flight.wait", instance=instance)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+
+def build_shared(cache, key, build, options, instance=None):
+    """
+    Return build() for a `key` missing from the Django `cache`, after storing
+    it there with `options` (see cache._configured_cache).
+
+    With options["lock_timeout"] set, the process that adds "<key>:lock" to
+    the cache builds the value; the others poll the cache for it instead of
+    building it too. A lock expires after lock_timeout seconds, so if its
+    holder dies (or takes longer than that), the waiting processes build the
+    value themselves.
+    """
+    lock_timeout = options["lock_timeout"]
+    version = options["version"]
+    if not lock_timeout:
+        result = build()
+        cache.set(key, result, timeout=options["timeout"], version=version)
+        return result
+
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + lock_timeout
+    locked = cache.add(lock_key, 1, timeout=lock_timeout, version=version)
+    if not locked:
+        metrics.incr("cache_lock.wait", instance=instance)
+    while not locked and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        result = cache.get(key, version=version)
+        if result is not None:
+            return result
+        locked = cache.add(lock_key, 1, timeout=lock_timeout, version=version)
+
+    try:
+        # The previous holder may have stored the value as it let go
+        result = cache.get(key, version=version) if locked else None
+        if result is None:
+            result = build()
+            cache.set(key, result, timeout=options["timeout"], version=version)
+    finally:
+        if locked:
+            cache.delete(lock_key, version=version)
+    return result
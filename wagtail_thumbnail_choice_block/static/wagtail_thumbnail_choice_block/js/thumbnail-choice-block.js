@@ -8,8 +8,9 @@
     'use strict';
 
     function initThumbnailChoiceBlocks() {
-        // Find all thumbnail radio selects
-        const containers = document.querySelectorAll('.thumbnail-radio-select');
+        // Find all thumbnail radio selects (search-driven ones are handled by
+        // initThumbnailSearchSelects)
+        const containers = document.querySelectorAll('.thumbnail-radio-select:not(.thumbnail-search-select)');
 
         containers.forEach(container => {
             // Skip if already initialized
@@ -385,24 +386,397 @@
         });
     }
 
+    // Delay between the last keystroke and the search request, in milliseconds
+    const SEARCH_DELAY = 200;
+
+    function initThumbnailSearchSelects() {
+        // Search-driven widgets (ThumbnailChoiceBlock with a choice_provider):
+        // only the selection is rendered, other choices are fetched as the editor types
+        const containers = document.querySelectorAll('.thumbnail-search-select');
+
+        containers.forEach(container => {
+            if (container.dataset.initialized) return;
+            container.dataset.initialized = 'true';
+
+            const searchUrl = container.dataset.searchUrl;
+            const valueInput = container.querySelector('input[type="hidden"]');
+            const filterInput = container.querySelector('.thumbnail-filter-input');
+            const dropdown = container.querySelector('.thumbnail-dropdown');
+            const results = container.querySelector('.thumbnail-search-results');
+            const noResultsMessage = container.querySelector('.thumbnail-no-results');
+            const thumbnailPreview = container.querySelector('.thumbnail-selected-preview');
+            const placeholder = filterInput.dataset.placeholder || '';
+
+            let selected = null;  // {value, label, thumbnail_url} of the current selection
+            let query = '';
+            let page = 1;
+            let hasNext = false;
+            let request = null;  // AbortController of the in-flight search
+            let searchTimer = null;
+
+            function showSelection(choice) {
+                selected = choice;
+                filterInput.value = choice ? choice.label : '';
+                if (choice) {
+                    filterInput.removeAttribute('placeholder');
+                } else {
+                    filterInput.setAttribute('placeholder', placeholder);
+                }
+                thumbnailPreview.innerHTML = '';
+                const url = choice && choice.thumbnail_url;
+                thumbnailPreview.classList.toggle('visible', !!url);
+                filterInput.classList.toggle('has-thumbnail', !!url);
+                if (url) {
+                    const img = document.createElement('img');
+                    img.src = url;
+                    img.alt = '';
+                    img.className = 'thumbnail-image';
+                    thumbnailPreview.appendChild(img);
+                    thumbnailPreview.style.setProperty('--thumbnail-mask', 'url("' + encodeURI(url) + '")');
+                }
+            }
+
+            function select(choice) {
+                valueInput.value = choice ? choice.value : '';
+                valueInput.dispatchEvent(new Event('change', { bubbles: true }));
+                showSelection(choice);
+                closeDropdown();
+            }
+
+            function buildOption(choice) {
+                const option = document.createElement('div');
+                option.className = 'thumbnail-radio-option';
+                option.setAttribute('role', 'option');
+                if (selected && selected.value === choice.value) {
+                    option.classList.add('selected');
+                }
+                const wrapper = document.createElement('span');
+                wrapper.className = 'thumbnail-wrapper';
+                if (choice.thumbnail_url) {
+                    wrapper.style.setProperty('--thumbnail-mask', 'url("' + encodeURI(choice.thumbnail_url) + '")');
+                    const img = document.createElement('img');
+                    img.src = choice.thumbnail_url;
+                    img.alt = choice.label;
+                    img.className = 'thumbnail-image';
+                    img.loading = 'lazy';
+                    wrapper.appendChild(img);
+                } else {
+                    const placeholderSpan = document.createElement('span');
+                    placeholderSpan.className = 'thumbnail-placeholder';
+                    wrapper.appendChild(placeholderSpan);
+                }
+                const label = document.createElement('span');
+                label.className = 'thumbnail-label';
+                label.textContent = choice.label;
+                option.appendChild(wrapper);
+                option.appendChild(label);
+                option.addEventListener('click', function(e) {
+                    e.stopPropagation();
+                    select(choice);
+                });
+                return option;
+            }
+
+            function fetchPage(reset) {
+                if (request) request.abort();
+                request = new AbortController();
+                const url = new URL(searchUrl, window.location.href);
+                url.searchParams.set('q', query);
+                url.searchParams.set('page', page);
+                fetch(url, { signal: request.signal, credentials: 'same-origin' })
+                    .then(response => response.json())
+                    .then(data => {
+                        request = null;
+                        if (reset) {
+                            results.innerHTML = '';
+                            if (container.hasAttribute('data-allow-blank') && query === '') {
+                                results.appendChild(buildOption({ value: '', label: '---', thumbnail_url: '' }));
+                            }
+                        }
+                        data.results.forEach(choice => results.appendChild(buildOption(choice)));
+                        hasNext = data.has_next;
+                        noResultsMessage.style.display = results.children.length ? 'none' : 'block';
+                    })
+                    .catch(error => {
+                        if (error.name !== 'AbortError') request = null;
+                    });
+            }
+
+            function search(value) {
+                query = value.trim();
+                page = 1;
+                fetchPage(true);
+            }
+
+            function openDropdown() {
+                dropdown.classList.add('show');
+                container.classList.add('open');
+                filterInput.removeAttribute('readonly');
+                filterInput.select();
+                search('');
+            }
+
+            function closeDropdown() {
+                dropdown.classList.remove('show');
+                container.classList.remove('open');
+                filterInput.setAttribute('readonly', 'readonly');
+                clearTimeout(searchTimer);
+                if (request) request.abort();
+                showSelection(selected);
+            }
+
+            filterInput.addEventListener('click', function(e) {
+                e.stopPropagation();
+                if (dropdown.classList.contains('show')) {
+                    closeDropdown();
+                } else {
+                    openDropdown();
+                }
+            });
+
+            filterInput.addEventListener('input', function(e) {
+                clearTimeout(searchTimer);
+                const value = e.target.value;
+                searchTimer = setTimeout(() => search(value), SEARCH_DELAY);
+            });
+
+            filterInput.addEventListener('keydown', function(e) {
+                if (e.key === 'Escape') {
+                    e.preventDefault();
+                    closeDropdown();
+                } else if (e.key === 'Enter') {
+                    e.preventDefault();
+                    if (!dropdown.classList.contains('show')) {
+                        openDropdown();
+                    } else if (results.children.length === 1) {
+                        results.children[0].click();
+                    }
+                }
+            });
+
+            // Load the next page when the editor scrolls to the end of the results
+            dropdown.addEventListener('scroll', function() {
+                if (hasNext && !request
+                        && dropdown.scrollTop + dropdown.clientHeight >= dropdown.scrollHeight - 20) {
+                    page += 1;
+                    fetchPage(false);
+                }
+            });
+
+            document.addEventListener('click', function(e) {
+                if (!container.contains(e.target) && dropdown.classList.contains('show')) {
+                    closeDropdown();
+                }
+            });
+
+            // Look up the label and thumbnail of a value set on the hidden input
+            function showValue() {
+                const value = valueInput.value;
+                if (!value) {
+                    showSelection(null);
+                    return;
+                }
+                const url = new URL(searchUrl, window.location.href);
+                url.searchParams.set('value', value);
+                fetch(url, { credentials: 'same-origin' })
+                    .then(response => response.json())
+                    .then(data => {
+                        if (valueInput.value === value) showSelection(data.results[0] || null);
+                    });
+            }
+
+            // Dispatched by ThumbnailSearchSelectDefinition when Telepath sets
+            // the value (e.g. when a block is duplicated or pasted)
+            container.addEventListener('thumbnail-search-select:set-state', showValue);
+
+            // Telepath renders the widget empty and then sets the hidden input's
+            // value, so look up the label and thumbnail of a value set that way.
+            if (filterInput.value) {
+                selected = { value: valueInput.value, label: filterInput.value, thumbnail_url: '' };
+                const img = thumbnailPreview.querySelector('img');
+                if (img) selected.thumbnail_url = img.getAttribute('src');
+            } else if (valueInput.value) {
+                showValue();
+            }
+        });
+    }
+
+    function initAll() {
+        initThumbnailChoiceBlocks();
+        initThumbnailSearchSelects();
+    }
+
     // Initialize on page load
     if (document.readyState === 'loading') {
-        document.addEventListener('DOMContentLoaded', initThumbnailChoiceBlocks);
+        document.addEventListener('DOMContentLoaded', initAll);
     } else {
-        initThumbnailChoiceBlocks();
+        initAll();
     }
 
-    // Re-initialize when Wagtail adds new blocks dynamically
+    // Re-initialize when Wagtail adds new blocks dynamically. Deferred so that
+    // Telepath has set the new widgets' values first.
     document.addEventListener('wagtail:block-added', function() {
         initThumbnailChoiceBlocks();
+        setTimeout(initThumbnailSearchSelects, 0);
     });
 
+    function escapeHtml(value) {
+        return String(value)
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;')
+            .replace(/'/g, '&#x27;');
+    }
+
+    // Same escaping as _css_escape_single_quoted in widgets.py
+    function escapeCssString(value) {
+        return value.replace(/\\/g, '\\\\').replace(/'/g, "\\'");
+    }
+
+    /**
+     * Telepath widget definition for ThumbnailRadioSelectAdapter.
+     *
+     * The server sends a compact state (see ThumbnailRadioSelect.get_js_state)
+     * instead of rendered HTML. The markup of thumbnail_radio_select.html is
+     * built from it here and handed to Wagtail's RadioSelect widget, which
+     * reads and sets the value.
+     */
+    class ThumbnailRadioSelectDefinition {
+        constructor(state) {
+            this.state = state;
+        }
+
+        html(name, id) {
+            const state = this.state;
+            const attrs = state.attrs || {};
+            const inputAttrs = Object.keys(attrs)
+                .filter(key => key !== 'id')
+                .map(key => (attrs[key] === true ? ` ${key}` : ` ${key}="${escapeHtml(attrs[key])}"`))
+                .join('');
+            const escapedName = escapeHtml(name);
+            const parts = [
+                `<div${id ? ` id="${escapeHtml(id)}"` : ''} class="thumbnail-radio-select${attrs.class ? ' ' + escapeHtml(attrs.class) : ''}" style="--thumbnail-size: ${state.size}px;">`,
+                '<div class="thumbnail-filter-wrapper"><div class="thumbnail-selected-preview"></div>',
+                `<input type="text" class="thumbnail-filter-input" placeholder="${escapeHtml(state.placeholder)}" autocomplete="off" readonly></div>`,
+                '<div class="thumbnail-dropdown">',
+            ];
+            let index = 0;
+            state.options.forEach(row => {
+                const [value, label, depth = 0, urlIndex = null, fragmentIndex = null, imageIndex = null] = row;
+                const lower = escapeHtml(String(label).toLowerCase());
+                if (value === null) {
+                    parts.push(
+                        `<div class="thumbnail-radio-heading" data-type="heading" data-depth="${depth}" data-label="${lower}" style="--heading-depth: ${depth};">${escapeHtml(label)}</div>`
+                    );
+                    return;
+                }
+                const optionId = id ? `${id}_${index}` : '';
+                index += 1;
+                const url = urlIndex === null ? '' : state.urlPrefix + state.urls[urlIndex];
+                let thumbnail;
+                let style = '';
+                if (fragmentIndex !== null) {
+                    thumbnail = state.fragments[fragmentIndex];
+                } else if (url) {
+                    const [width, height, placeholderColor] = imageIndex === null ? [] : state.images[imageIndex];
+                    const size = width ? ` width="${escapeHtml(width)}" height="${escapeHtml(height)}"` : '';
+                    const placeholder = placeholderColor ? ` --thumbnail-placeholder: ${escapeHtml(placeholderColor)};` : '';
+                    thumbnail = `<img src="${escapeHtml(url)}" alt="${escapeHtml(label)}" class="thumbnail-image"${size}>`;
+                    style = ` style="--thumbnail-mask: url('${escapeHtml(escapeCssString(url))}');${placeholder}"`;
+                } else {
+                    thumbnail = '<span class="thumbnail-placeholder"></span>';
+                }
+                parts.push(
+                    `<label${optionId ? ` for="${escapeHtml(optionId)}"` : ''} class="thumbnail-radio-option" data-label="${lower}" data-depth="${depth}">`
+                    + `<input type="radio" name="${escapedName}" value="${escapeHtml(value)}"${inputAttrs}${optionId ? ` id="${escapeHtml(optionId)}"` : ''}>`
+                    + `<span class="thumbnail-wrapper"${style}>${thumbnail}</span>`
+                    + `<span class="thumbnail-label">${escapeHtml(label)}</span></label>`
+                );
+            });
+            parts.push(`<div class="thumbnail-no-results" style="display: none;">${escapeHtml(state.noResults)}</div></div></div>`);
+            return parts.join('');
+        }
+
+        radioSelect(name, id) {
+            return window.telepath.unpack({
+                _type: 'wagtail.widgets.RadioSelect',
+                _args: [this.html(name, id)],
+            });
+        }
+
+        render(placeholder, name, id, initialState, parentCapabilities, options) {
+            const boundWidget = this.radioSelect(name, id).render(
+                placeholder, name, id, initialState, parentCapabilities, options
+            );
+            initThumbnailChoiceBlocks();
+            return boundWidget;
+        }
+
+        getByName(name, element) {
+            return this.radioSelect(name, '').getByName(name, element);
+        }
+    }
+
+    /**
+     * Telepath widget definition for ThumbnailSearchSelectAdapter.
+     *
+     * Wagtail's generic Widget renders the HTML and reads and sets the hidden
+     * input. Widgets it renders are initialized straight away, and setState()
+     * updates the displayed selection as well as the input.
+     */
+    class ThumbnailSearchSelectDefinition {
+        constructor(html) {
+            this.widget = window.telepath.unpack({
+                _type: 'wagtail.widgets.Widget',
+                _args: [html],
+            });
+        }
+
+        render(placeholder, name, id, initialState, parentCapabilities, options) {
+            const boundWidget = this.widget.render(
+                placeholder, name, id, initialState, parentCapabilities, options
+            );
+            initThumbnailSearchSelects();
+            const container = boundWidget.input.closest('.thumbnail-search-select');
+            const setState = boundWidget.setState.bind(boundWidget);
+            boundWidget.setState = state => {
+                setState(state);
+                container.dispatchEvent(new Event('thumbnail-search-select:set-state'));
+            };
+            return boundWidget;
+        }
+
+        getByName(name, element) {
+            return this.widget.getByName(name, element);
+        }
+    }
+
+    function registerTelepathWidget() {
+        window.telepath.register(
+            'wagtail_thumbnail_choice_block.widgets.ThumbnailRadioSelect',
+            ThumbnailRadioSelectDefinition
+        );
+        window.telepath.register(
+            'wagtail_thumbnail_choice_block.widgets.ThumbnailSearchSelect',
+            ThumbnailSearchSelectDefinition
+        );
+    }
+
+    if (window.telepath) {
+        registerTelepathWidget();
+    } else {
+        document.addEventListener('DOMContentLoaded', () => {
+            if (window.telepath) registerTelepathWidget();
+        });
+    }
+
     // Fallback: Initialize on first interaction with any thumbnail filter input
     document.addEventListener('click', function(e) {
         if (e.target.classList.contains('thumbnail-filter-input')) {
             const container = e.target.closest('.thumbnail-radio-select');
             if (container && !container.dataset.initialized) {
-                initThumbnailChoiceBlocks();
+                initAll();
             }
         }
     }, true);
@@ -0,0 +1,183 @@
+"""
+SVG inlining for Wagtail Thumbnail Choice Block.
+
+With thumbnail_inline_svg_max_bytes set, SVG thumbnails up to that file size
+are read and minified once (at scan time in directory mode) and sent inside
+the widget, as data URIs or as inline <svg> markup, instead of as URLs the
+browser fetches one by one.
+"""
+
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Values of thumbnail_inline_svg_format
+DATA_URI = "data_uri"
+MARKUP = "markup"
+FORMATS = (DATA_URI, MARKUP)
+
+# Namespaces drawing tools add for their own bookkeeping.
+EDITOR_NAMESPACES = ("sodipodi", "inkscape", "sketch", "serif", "rdf", "cc", "dc")
+
+_EDITOR_PREFIXES = "|".join(EDITOR_NAMESPACES)
+_MINIFY_PATTERNS = [
+    (re.compile(r"<\?xml.*?\?>", re.DOTALL), ""),
+    (re.compile(r"<!DOCTYPE[^>]*>", re.DOTALL | re.IGNORECASE), ""),
+    (re.compile(r"<!--.*?-->", re.DOTALL), ""),
+    (re.compile(r"<metadata\b.*?</metadata>", re.DOTALL), ""),
+    (re.compile(r"<metadata\b[^>]*/>", re.DOTALL), ""),
+    (re.compile(rf"<({_EDITOR_PREFIXES}):([\w-]+)\b[^>]*/>", re.DOTALL), ""),
+    (re.compile(rf"<({_EDITOR_PREFIXES}):([\w-]+)\b.*?</\1:\2>", re.DOTALL), ""),
+    (re.compile(rf"\s+xmlns:(?:{_EDITOR_PREFIXES})=(\"[^\"]*\"|'[^']*')"), ""),
+    (re.compile(rf"\s+(?:{_EDITOR_PREFIXES}):[\w-]+=(\"[^\"]*\"|'[^']*')"), ""),
+    (re.compile(r">\s+<"), "><"),
+    (re.compile(r"\s+"), " "),
+]
+
+# Markup that could run script, or restyle the rest of the page (<style>
+# rules are global), when an SVG is inlined into the admin page. Element ids
+# are global too: icons exported by the same tool often share ids such as
+# "clip0", and url(#clip0) would then resolve to whichever icon comes first.
+# Files containing any of these are only ever inlined as data URIs, which
+# <img> and CSS masks render in isolation.
+_UNSAFE_MARKUP = re.compile(
+    r"<\s*(?:script|style|foreignObject|iframe|embed|object)\b"
+    r"|\son\w+\s*=|javascript:|\s(?:xml:)?id\s*=",
+    re.IGNORECASE,
+)
+
+# Attributes and CSS properties that paint with a color.
+_PAINT_NAMES = r"(?:fill|stroke|stop-color|flood-color|lighting-color|color)"
+_PAINT_ATTR = re.compile(
+    rf"(?<=\s)({_PAINT_NAMES})(\s*=\s*)(\"[^\"]*\"|'[^']*')", re.IGNORECASE
+)
+_PAINT_PROPERTY = re.compile(
+    rf"(?<![\w-])({_PAINT_NAMES})(\s*:\s*)([^;\"'}}<]+)", re.IGNORECASE
+)
+_SVG_TAG = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+_UNPAINTED = {"", "none", "transparent", "currentcolor", "inherit"}
+_NAMED_COLORS = {"black": "#000000", "white": "#ffffff"}
+
+_static_svgs = {}  # {(url, max_bytes): minified SVG or None}
+
+
+def minify_svg(svg):
+    """
+    Return `svg` without its XML declaration, doctype, comments, <metadata>,
+    drawing-editor elements and attributes (see EDITOR_NAMESPACES), and
+    insignificant whitespace.
+    """
+    for pattern, replacement in _MINIFY_PATTERNS:
+        svg = pattern.sub(replacement, svg)
+    return svg.strip()
+
+
+def is_safe_markup(svg):
+    """Return True if `svg` can be inlined as markup (see _UNSAFE_MARKUP)."""
+    return _UNSAFE_MARKUP.search(svg) is None
+
+
+def svg_data_uri(svg):
+    """Return a percent-encoded (not base64, which is larger) data URI for `svg`."""
+    return "data:image/svg+xml," + quote(svg, safe=" =:/;,'()")
+
+
+def _normalize_color(color):
+    color = color.strip().lower().replace(" ", "")
+    if re.fullmatch(r"#[0-9a-f]{3}", color):
+        color = "#" + "".join(c * 2 for c in color[1:])
+    return _NAMED_COLORS.get(color, color)
+
+
+def current_color_svg(svg):
+    """
+    Return `svg` rewritten to paint in `currentColor`, if it is monochrome:
+    it paints with at most one color (any opacity) and no gradients, patterns
+    or embedded images. Return None for any other SVG.
+
+    The result renders like a CSS mask of the original filled with `color`,
+    so one-color blocks can inline it instead of masking an <img>.
+    """
+    if re.search(r"<image\b", svg, re.IGNORECASE):
+        return None
+    colors = set()
+    for match in (*_PAINT_ATTR.finditer(svg), *_PAINT_PROPERTY.finditer(svg)):
+        value = match.group(3).strip("\"'")
+        color = _normalize_color(value)
+        if color in _UNPAINTED:
+            continue
+        if "url(" in color:
+            return None
+        colors.add(color)
+    if len(colors) > 1:
+        return None
+
+    def repaint(match):
+        name, separator, value = match.groups()
+        if _normalize_color(value.strip("\"'")) in _UNPAINTED:
+            return match.group(0)
+        quote = value[0] if value[:1] in "\"'" else ""
+        return f"{name}{separator}{quote}currentColor{quote}"
+
+    svg = _PAINT_PROPERTY.sub(repaint, _PAINT_ATTR.sub(repaint, svg))
+    # Shapes without a fill of their own inherit the root's, which is black
+    # unless set.
+    root = _SVG_TAG.search(svg)
+    if root is not None and not re.search(r"\sfill\s*=", root.group(0), re.IGNORECASE):
+        end = root.end() - (2 if root.group(0).endswith("/>") else 1)
+        svg = f'{svg[:end]} fill="currentColor"{svg[end:]}'
+    return svg
+
+
+def read_svg(read, size, max_bytes):
+    """
+    Return the minified SVG returned by read() if `size` (the file size in
+    bytes) is at most `max_bytes`, or None if it is larger or unreadable.
+    """
+    if size > max_bytes:
+        return None
+    try:
+        return minify_svg(read().decode("utf-8"))
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def get_static_svg(url, max_bytes):
+    """
+    Return the minified SVG served at `url` if it is a static file of at most
+    `max_bytes`, or None. Used for `thumbnails` URLs, which are looked up once
+    per process.
+    """
+    key = (url, max_bytes)
+    if key not in _static_svgs:
+        _static_svgs[key] = _find_static_svg(url, max_bytes)
+    return _static_svgs[key]
+
+
+def _find_static_svg(url, max_bytes):
+    static_url = settings.STATIC_URL or ""
+    if not static_url or not url.startswith(static_url):
+        return None
+    path = url[len(static_url) :].split("?", 1)[0]
+    if not path.lower().endswith(".svg"):
+        return None
+    found = finders.find(path)
+    if not found:
+        return None
+    try:
+        with open(found, "rb") as f:
+            size = f.seek(0, 2)
+            f.seek(0)
+            return read_svg(f.read, size, max_bytes)
+    except OSError:
+        return None
+
+
+@receiver(setting_changed)
+def _reset_static_svgs(setting, **kwargs):
+    if setting in {"STATIC_URL", "STATICFILES_DIRS", "STATICFILES_FINDERS"}:
+        _static_svgs.clear()
@@ -0,0 +1,37 @@
+"""
+Template tags for rendering ThumbnailChoiceBlock thumbnails on the front end.
+
+    {% load thumbnail_choice_tags %}
+    {% stream_thumbnails page.body as thumbnails %}
+    {% for child in page.body %}
+        <img src="{{ thumbnails|thumbnail_url:child.value.bound_blocks.icon }}" alt="">
+    {% endfor %}
+"""
+
+from django import template
+
+from ..blocks import get_bound_thumbnail, get_stream_thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def stream_thumbnails(stream_values):
+    """
+    Resolve the thumbnails of every ThumbnailChoiceBlock value in a StreamValue
+    (or an iterable of StreamValues) in one pass. Use with `as` and look the
+    result up with the thumbnail_url and thumbnail_html filters.
+    """
+    return get_stream_thumbnails(stream_values)
+
+
+@register.filter
+def thumbnail_url(thumbnails, bound_block):
+    """Return the thumbnail URL for `bound_block` from a stream_thumbnails result."""
+    return get_bound_thumbnail(thumbnails, bound_block).get("url", "")
+
+
+@register.filter
+def thumbnail_html(thumbnails, bound_block):
+    """Return the rendered thumbnail template for `bound_block` from a stream_thumbnails result."""
+    return get_bound_thumbnail(thumbnails, bound_block).get("html", "")
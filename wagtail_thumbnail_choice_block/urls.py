@@ -0,0 +1,18 @@
+"""
+Admin URLs for Wagtail Thumbnail Choice Block, included by wagtail_hooks.py.
+"""
+
+from django.urls import path
+
+from . import views
+
+app_name = "wagtail_thumbnail_choice_block"
+
+urlpatterns = [
+    path("search/<str:provider>/", views.search, name="search"),
+    path(
+        "archives/<str:archive>/<path:name>",
+        views.archive_file,
+        name="archive_file",
+    ),
+]
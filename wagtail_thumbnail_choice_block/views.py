@@ -0,0 +1,80 @@
+"""
+Admin views for Wagtail Thumbnail Choice Block.
+"""
+
+import mimetypes
+
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import etag, require_GET, require_safe
+
+from .archives import get_archive
+from .providers import get_choice_provider
+
+# Archive file URLs change with the file's contents (see ZipArchiveStorage.url)
+ARCHIVE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@require_GET
+def search(request, provider):
+    """
+    Return choices from the choice provider registered as `provider`, as JSON:
+
+        ?q=<query>&page=<n>  ->  {"results": [choice, ...], "has_next": bool}
+        ?value=<value>       ->  {"results": [choice]}, or [] if it is not valid
+
+    Registered under the Wagtail admin's URLs, so only admin users can call it.
+    """
+    choice_provider = get_choice_provider(provider)
+    if choice_provider is None:
+        raise Http404(f"No choice provider named '{provider}'.")
+
+    if "value" in request.GET:
+        choice = choice_provider.get(request.GET["value"])
+        return JsonResponse({"results": [choice] if choice else [], "has_next": False})
+
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    choices, has_next = choice_provider.search_page(request.GET.get("q", ""), page)
+    return JsonResponse({"results": choices, "has_next": has_next})
+
+
+def _archive_file_etag(request, archive, name):
+    storage = get_archive(archive)
+    try:
+        return storage.etag(name) if storage is not None else None
+    except FileNotFoundError:
+        return None
+
+
+@require_safe
+@etag(_archive_file_etag)
+def archive_file(request, archive, name):
+    """
+    Serve the file `name` from the ZipArchiveStorage registered as `archive`,
+    with an ETag and a year-long max-age (see archives.py).
+
+    Registered under the Wagtail admin's URLs; to serve an archive's files to
+    everyone, mount this view with <str:archive> and <path:name> arguments and
+    pass its URL as the storage's base_url.
+    """
+    storage = get_archive(archive)
+    if storage is None:
+        raise Http404(f"No archive named '{archive}'.")
+    try:
+        content = storage.read(name)
+    except FileNotFoundError:
+        raise Http404(f"'{name}' is not in the archive '{archive}'.") from None
+
+    content_type, _encoding = mimetypes.guess_type(name)
+    response = HttpResponse(
+        content, content_type=content_type or "application/octet-stream"
+    )
+    # SVGs opened directly can't run scripts on this origin
+    response["Content-Security-Policy"] = (
+        "default-src 'none'; style-src 'unsafe-inline'"
+    )
+    patch_cache_control(response, public=True, max_age=ARCHIVE_MAX_AGE, immutable=True)
+    return response
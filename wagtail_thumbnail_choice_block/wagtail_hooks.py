@@ -1,8 +1,9 @@
 """
-Wagtail hooks for registering CSS and JS assets.
+Wagtail hooks for registering CSS and JS assets and admin URLs.
 """
 
 from django.templatetags.static import static
+from django.urls import include, path
 from django.utils.html import format_html
 
 from wagtail import hooks
@@ -24,3 +25,9 @@ def thumbnail_choice_block_js():
         '<script src="{}"></script>',
         static("wagtail_thumbnail_choice_block/js/thumbnail-choice-block.js"),
     )
+
+
+@hooks.register("register_admin_urls")
+def register_thumbnail_choice_urls():
+    """Register the choice provider search endpoint (see providers.py)."""
+    return [path("thumbnail-choice/", include("wagtail_thumbnail_choice_block.urls"))]
@@ -2,9 +2,42 @@
 Widget classes for Wagtail Thumbnail Choice Block.
 """
 
+import hashlib
+import json
+import posixpath
+from pathlib import Path
+
 from django.forms import RadioSelect, Widget
+from django.forms.renderers import get_default_renderer
+from django.template import TemplateDoesNotExist
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.utils import translation
+from django.utils.encoding import force_str
+from django.utils.html import conditional_escape
+from django.utils.safestring import SafeData, mark_safe
+from django.utils.translation import gettext
+
+try:
+    from wagtail.admin.telepath import register
+    from wagtail.admin.telepath.widgets import WidgetAdapter
+except ImportError:  # Wagtail < 6.1
+    from wagtail.telepath import register
+    from wagtail.widget_adapters import WidgetAdapter
+
+from . import metrics
+from .cache import get_shared_render_cache
+from .singleflight import SingleFlight, build_shared
+
+# The template shipped with the package, which ThumbnailRadioSelect.iter_render
+# reproduces.
+_STOCK_TEMPLATE = (
+    Path(__file__).resolve().parent
+    / "templates"
+    / "wagtail_thumbnail_choice_block"
+    / "widgets"
+    / "thumbnail_radio_select.html"
+)
 
 
 def _css_escape_single_quoted(value):
@@ -23,6 +56,91 @@ def _css_escape_single_quoted(value):
     return value.replace("\\", "\\\\").replace("'", "\\'")
 
 
+# Precompiled markup fragments used by ThumbnailRadioSelect.iter_render. Each
+# mirrors a part of thumbnail_radio_select.html; every value is escaped before
+# it is formatted in.
+_OPEN_HTML = (
+    '<div{id_attr} class="{css_class}" style="--thumbnail-size: {size}px;">'
+    '<div class="thumbnail-filter-wrapper">'
+    '<div class="thumbnail-selected-preview"></div>'
+    '<input type="text" class="thumbnail-filter-input" placeholder="{placeholder}" '
+    'autocomplete="off" readonly></div><div class="thumbnail-dropdown">'
+)
+_HEADING_HTML = (
+    '<div class="thumbnail-radio-heading" data-type="heading" data-depth="{depth}" '
+    'data-label="{lower}" style="--heading-depth: {depth};">{label}</div>'
+)
+_OPTION_HTML = (
+    '<label{for_attr} class="thumbnail-radio-option{selected}" data-label="{lower}" '
+    'data-depth="{depth}"><input type="radio" name="{name}"{value_attr}{attrs}>'
+    '<span class="thumbnail-wrapper"{style}>{thumbnail}</span>'
+    '<span class="thumbnail-label">{label}</span></label>'
+)
+_IMAGE_HTML = '<img src="{url}" alt="{label}" class="thumbnail-image"{size}>'
+_SIZE_ATTRS = ' width="{width}" height="{height}"'
+_MASK_STYLE = " style=\"--thumbnail-mask: url('{url}');{placeholder}\""
+_PLACEHOLDER_STYLE = " --thumbnail-placeholder: {color};"
+_PLACEHOLDER_HTML = '<span class="thumbnail-placeholder"></span>'
+_CLOSE_HTML = (
+    '<div class="thumbnail-no-results" style="display: none;">{no_results}</div>'
+    "</div></div>"
+)
+
+
+def _lower(value):
+    """Lowercase a label, keeping it safe if it was, like the `lower` filter."""
+    lowered = value.lower()
+    return mark_safe(lowered) if isinstance(value, SafeData) else lowered
+
+
+def _html_attrs(attrs):
+    """Format an attrs dict as a template's `{% for name, value in attrs.items %}` would."""
+    return "".join(
+        f" {name}" if value is True else f' {name}="{conditional_escape(value)}"'
+        for name, value in attrs.items()
+    )
+
+
+def render_thumbnail_template(config, value, label, instance=None):
+    """
+    Render one thumbnail_template_mapping entry for the given choice.
+
+    Args:
+        config: Either a template path string, or a dict with 'template' (path)
+                and optional 'context' (dict) keys. Any other value renders nothing.
+        value: The choice value, added to the template context as `value`
+        label: The choice label, added to the template context as `label`
+        instance: The block or widget rendering the thumbnail, for metrics
+
+    Returns:
+        The rendered HTML, or '' if there is nothing to render or rendering fails
+    """
+    # Handle both string (template path) and dict (template + context)
+    if isinstance(config, str):
+        template_path = config
+        context = {"value": value, "label": label}
+    elif isinstance(config, dict):
+        template_path = config.get("template")
+        # Copy so that the shared mapping isn't mutated by the defaults below
+        context = dict(config.get("context", {}))
+        # Add value and label to context by default
+        context.setdefault("value", value)
+        context.setdefault("label", label)
+    else:
+        return ""
+
+    if not template_path:
+        return ""
+    try:
+        with metrics.timer(
+            "render_template", instance=instance, template=template_path
+        ):
+            return render_to_string(template_path, context)
+    except Exception:
+        # Fallback gracefully if template rendering fails
+        return ""
+
+
 class ThumbnailRadioSelect(RadioSelect):
     """
     Custom radio select widget that displays thumbnails for each option.
@@ -37,6 +155,13 @@ class ThumbnailRadioSelect(RadioSelect):
         thumbnail_template_mapping: Dictionary mapping choice values to either:
                                    - A string (template path), or
                                    - A dict with 'template' and 'context' keys
+        thumbnail_html_mapping: Dictionary mapping choice values to safe HTML
+                                shown as the thumbnail when there is no
+                                template for the value (e.g. inlined SVGs)
+        thumbnail_metadata_mapping: Dictionary mapping choice values to dicts
+                                    with the thumbnail image's "width" and
+                                    "height", and optionally a "placeholder"
+                                    color shown until it loads
 
     Example (with image URLs):
         widget = ThumbnailRadioSelect(
@@ -67,6 +192,15 @@ class ThumbnailRadioSelect(RadioSelect):
     # per-instance render() calls (one per block occurrence in the page tree)
     # collapse to a single real render followed by fast dictionary lookups.
     _render_cache = {}
+    # Lets concurrent misses for one key wait for a single render.
+    _render_flights = SingleFlight()
+
+    # The ThumbnailChoiceBlock this widget was created for, if any.
+    block = None
+
+    # Render with iter_render's precompiled fragments instead of the template
+    # when the template hasn't been overridden (see _can_stream).
+    streaming_render = True
 
     class Media:
         css = {
@@ -83,10 +217,14 @@ class ThumbnailRadioSelect(RadioSelect):
         thumbnail_size=None,
         thumbnail_is_one_color=False,
         tree_items=None,
+        thumbnail_html_mapping=None,
+        thumbnail_metadata_mapping=None,
     ):
         super().__init__(attrs, choices)
         self.thumbnail_mapping = thumbnail_mapping or {}
         self.thumbnail_template_mapping = thumbnail_template_mapping or {}
+        self.thumbnail_html_mapping = thumbnail_html_mapping or {}
+        self.thumbnail_metadata_mapping = thumbnail_metadata_mapping or {}
         self._tree_items = tree_items
         self.thumbnail_is_one_color = thumbnail_is_one_color
 
@@ -118,9 +256,10 @@ class ThumbnailRadioSelect(RadioSelect):
         context["widget"]["tree_items"] = self._build_tree_context(name, value, attrs)
         return context
 
-    def _build_tree_context(self, name, value, attrs):
+    def _iter_tree(self, value):
         """
-        Build the flat list of heading/option dicts passed to the template.
+        Yield the widget's entries in display order:
+        ("heading", label, depth) or ("option", value, label, depth, selected).
 
         Flat-choices mode (self._tree_items is None):
             Iterates self.choices directly. The blank choice (if any) is already
@@ -130,6 +269,43 @@ class ThumbnailRadioSelect(RadioSelect):
             The tree was built from the raw directory scan (no blank choice).
             If self.choices starts with ("", ...) a blank option is prepended at
             depth 0 before iterating the tree items.
+        """
+        # Stringify the current value once rather than once per option.
+        value_str = str(value)
+
+        if self._tree_items is None:
+            for choice_value, choice_label in self.choices:
+                yield (
+                    "option",
+                    choice_value,
+                    choice_label,
+                    0,
+                    str(choice_value) == value_str,
+                )
+            return
+
+        choices_list = list(self.choices)
+        if choices_list and choices_list[0][0] == "":
+            blank_value, blank_label = choices_list[0]
+            yield "option", blank_value, blank_label, 0, str(blank_value) == value_str
+
+        for item in self._tree_items:
+            if item["type"] == "heading":
+                yield "heading", item["label"], item["depth"]
+            else:
+                item_value = item["value"]
+                yield (
+                    "option",
+                    item_value,
+                    item["label"],
+                    item.get("depth", 0),
+                    str(item_value) == value_str,
+                )
+
+    def _build_tree_context(self, name, value, attrs):
+        """
+        Build the flat list of heading/option dicts passed to the template,
+        from the entries of _iter_tree.
 
         A running integer counter (option_index) is incremented for every option
         and passed as the `index` argument to create_option so that Django generates
@@ -141,66 +317,169 @@ class ThumbnailRadioSelect(RadioSelect):
 
         result = []
         option_index = 0
+        for entry in self._iter_tree(value):
+            if entry[0] == "heading":
+                _type, label, depth = entry
+                result.append({"type": "heading", "label": label, "depth": depth})
+                continue
+            _type, option_value, label, depth, selected = entry
+            option = self.create_option(
+                name, option_value, label, selected, option_index, attrs=full_attrs
+            )
+            option["depth"] = depth
+            result.append(option)
+            option_index += 1
 
-        if self._tree_items is None:
-            # Flat-choices mode: derive everything from self.choices
-            for choice_value, choice_label in self.choices:
-                selected = str(choice_value) == str(value)
-                option = self.create_option(
-                    name,
-                    choice_value,
-                    choice_label,
-                    selected,
-                    option_index,
-                    attrs=full_attrs,
+        return result
+
+    def iter_render(self, name, value, attrs=None):
+        """
+        Yield the widget's HTML in chunks, one per heading or option.
+
+        Produces the same markup as thumbnail_radio_select.html (without its
+        indentation) from precompiled string fragments, without building a
+        context dict per option or rendering the template. Only valid while
+        the stock template and option logic are in use; see _can_stream.
+        """
+        widget_attrs = self.build_attrs(self.attrs, attrs)
+        widget_id = widget_attrs.get("id")
+        extra_class = widget_attrs.get("class")
+        css_class = "thumbnail-radio-select"
+        if extra_class:
+            css_class = f"{css_class} {extra_class}"
+        yield _OPEN_HTML.format(
+            id_attr=f' id="{conditional_escape(widget_id)}"' if widget_id else "",
+            css_class=conditional_escape(css_class),
+            size=conditional_escape(self.thumbnail_size),
+            placeholder=conditional_escape(gettext("Select an option...")),
+        )
+
+        # Attributes every radio input shares, in create_option's order: the
+        # widget attrs, with its id replaced in place by a per-option one.
+        names = list(widget_attrs)
+        split = names.index("id") if widget_id else len(names)
+        before_id_html = _html_attrs({k: widget_attrs[k] for k in names[:split]})
+        after_id_html = _html_attrs({k: widget_attrs[k] for k in names[split + 1 :]})
+        checked_html = _html_attrs(self.checked_attribute)
+        escaped_name = conditional_escape(name)
+        thumbnail_mapping = self.thumbnail_mapping
+        template_mapping = self.thumbnail_template_mapping
+        html_mapping = self.thumbnail_html_mapping
+        metadata_mapping = self.thumbnail_metadata_mapping
+
+        option_index = 0
+        for entry in self._iter_tree(value):
+            if entry[0] == "heading":
+                _type, label, depth = entry
+                label = force_str(label)
+                yield _HEADING_HTML.format(
+                    depth=conditional_escape(depth),
+                    lower=conditional_escape(_lower(label)),
+                    label=conditional_escape(label),
                 )
-                option["depth"] = 0
-                result.append(option)
-                option_index += 1
-        else:
-            # Directory mode: prepend blank choice if present in self.choices
-            choices_list = list(self.choices)
-            if choices_list and choices_list[0][0] == "":
-                blank_value, blank_label = choices_list[0]
-                selected = str(blank_value) == str(value)
-                option = self.create_option(
-                    name,
-                    blank_value,
-                    blank_label,
-                    selected,
-                    option_index,
-                    attrs=full_attrs,
+                continue
+
+            _type, option_value, label, depth, selected = entry
+            label = force_str(label)
+            option_id = (
+                self.id_for_label(widget_id, str(option_index)) if widget_id else ""
+            )
+            option_index += 1
+
+            thumbnail_url = thumbnail_mapping.get(option_value, "")
+            template_html = ""
+            if template_mapping:
+                template_html = render_thumbnail_template(
+                    template_mapping.get(option_value),
+                    option_value,
+                    label,
+                    instance=self,
                 )
-                option["depth"] = 0
-                result.append(option)
-                option_index += 1
-
-            for item in self._tree_items:
-                if item["type"] == "heading":
-                    result.append(
-                        {
-                            "type": "heading",
-                            "label": item["label"],
-                            "depth": item["depth"],
-                        }
-                    )
-                else:
-                    item_value = item["value"]
-                    item_label = item["label"]
-                    selected = str(item_value) == str(value)
-                    option = self.create_option(
-                        name,
-                        item_value,
-                        item_label,
-                        selected,
-                        option_index,
-                        attrs=full_attrs,
+            if not template_html and html_mapping:
+                template_html = html_mapping.get(option_value, "")
+            metadata = metadata_mapping.get(option_value) if metadata_mapping else None
+            if template_html:
+                thumbnail = template_html
+            elif thumbnail_url:
+                thumbnail = _IMAGE_HTML.format(
+                    url=conditional_escape(thumbnail_url),
+                    label=conditional_escape(label),
+                    size=(
+                        _SIZE_ATTRS.format(
+                            width=conditional_escape(metadata["width"]),
+                            height=conditional_escape(metadata["height"]),
+                        )
+                        if metadata and metadata.get("width")
+                        else ""
+                    ),
+                )
+            else:
+                thumbnail = _PLACEHOLDER_HTML
+
+            yield _OPTION_HTML.format(
+                for_attr=f' for="{conditional_escape(option_id)}"' if option_id else "",
+                selected=" selected" if selected and option_value else "",
+                lower=conditional_escape(_lower(label)),
+                depth=conditional_escape(depth),
+                name=escaped_name,
+                value_attr=(
+                    f' value="{conditional_escape(option_value)}"'
+                    if option_value is not None
+                    else ""
+                ),
+                attrs=(
+                    before_id_html
+                    + (f' id="{conditional_escape(option_id)}"' if option_id else "")
+                    + after_id_html
+                    + (checked_html if selected else "")
+                ),
+                style=(
+                    _MASK_STYLE.format(
+                        url=conditional_escape(
+                            _css_escape_single_quoted(thumbnail_url)
+                        ),
+                        placeholder=(
+                            _PLACEHOLDER_STYLE.format(
+                                color=conditional_escape(metadata["placeholder"])
+                            )
+                            if metadata and metadata.get("placeholder")
+                            else ""
+                        ),
                     )
-                    option["depth"] = item.get("depth", 0)
-                    result.append(option)
-                    option_index += 1
+                    if thumbnail_url and not template_html
+                    else ""
+                ),
+                thumbnail=thumbnail,
+                label=conditional_escape(label),
+            )
 
-        return result
+        yield _CLOSE_HTML.format(
+            no_results=conditional_escape(gettext("No matching options found."))
+        )
+
+    def _can_stream(self, renderer):
+        """
+        Return True if iter_render produces what the template would: streaming
+        is enabled, the option and context logic isn't overridden, and the
+        template the renderer would use is the stock one (not an override in
+        a project or app templates directory).
+        """
+        if not self.streaming_render:
+            return False
+        widget_class = type(self)
+        if (
+            widget_class.create_option is not ThumbnailRadioSelect.create_option
+            or widget_class.get_context is not ThumbnailRadioSelect.get_context
+            or self.template_name != ThumbnailRadioSelect.template_name
+        ):
+            return False
+        renderer = renderer or get_default_renderer()
+        try:
+            origin = renderer.get_template(self.template_name).origin.name
+        except (TemplateDoesNotExist, AttributeError):
+            # Not found, or a template backend without origins
+            return False
+        return bool(origin) and Path(origin).resolve() == _STOCK_TEMPLATE
 
     def render(self, name, value, attrs=None, renderer=None):
         """
@@ -213,6 +492,30 @@ class ThumbnailRadioSelect(RadioSelect):
         The cache key is based on mapping *content* rather than object identity so
         that distinct instances built from the same choices list (which each create
         a new dict object) correctly share a cache entry.
+
+        If WAGTAIL_THUMBNAIL_CHOICE_RENDER_CACHE is set, misses in this
+        per-process cache fall back to a shared Django cache before rendering, so
+        that HTML rendered by one process (e.g. the thumbnail_choice_warm
+        command) is reused by the others.
+        """
+        key = self.render_cache_key(name, value, attrs)
+        if key is None:
+            html = self._render_uncached(name, value, attrs, renderer)
+        else:
+            html = self._get_cached(
+                key, lambda: self._render_uncached(name, value, attrs, renderer)
+            )
+
+        # Recorded for cache hits too, so it reflects the HTML actually emitted.
+        # isascii() is O(1), which keeps this cheap on the cached path.
+        size = len(html) if html.isascii() else len(html.encode())
+        metrics.observe("widget_render.bytes", size, instance=self)
+        return html
+
+    def render_cache_key(self, name, value, attrs=None):
+        """
+        Return the render cache key for render(name, value, attrs), or None if
+        the mappings are not hashable and the HTML cannot be cached.
         """
         try:
             thumbnail_mapping_key = tuple(sorted(self.thumbnail_mapping.items()))
@@ -225,6 +528,13 @@ class ThumbnailRadioSelect(RadioSelect):
                     for k, v in self.thumbnail_template_mapping.items()
                 )
             )
+            html_mapping_key = tuple(sorted(self.thumbnail_html_mapping.items()))
+            metadata_mapping_key = tuple(
+                sorted(
+                    (k, tuple(sorted(v.items())))
+                    for k, v in self.thumbnail_metadata_mapping.items()
+                )
+            )
             tree_key = tuple(
                 (
                     item["type"],
@@ -241,6 +551,8 @@ class ThumbnailRadioSelect(RadioSelect):
                 tuple(c[0] for c in self.choices),
                 thumbnail_mapping_key,
                 template_mapping_key,
+                html_mapping_key,
+                metadata_mapping_key,
                 self.thumbnail_is_one_color,
                 translation.get_language(),
                 tree_key,
@@ -249,13 +561,187 @@ class ThumbnailRadioSelect(RadioSelect):
         except TypeError:
             # Mapping values are not fully hashable (e.g. nested dicts with
             # non-hashable context values) — render without caching.
-            return super().render(name, value, attrs, renderer)
+            return None
+        return key
 
-        if key not in ThumbnailRadioSelect._render_cache:
-            ThumbnailRadioSelect._render_cache[key] = super().render(
-                name, value, attrs, renderer
-            )
-        return ThumbnailRadioSelect._render_cache[key]
+    def shared_render_cache_key(self, key):
+        """
+        Return the shared cache key for a render_cache_key() key: a digest of
+        the key and the choice labels, which the per-process key leaves out.
+        """
+        labels = tuple(force_str(choice[1]) for choice in self.choices)
+        digest = hashlib.sha256(repr((key, labels)).encode()).hexdigest()
+        return f"wagtail_thumbnail_choice_render:{digest}"
+
+    def _get_cached(self, key, build):
+        """
+        Return the value for a render cache `key`, calling `build` (through the
+        shared render cache, if configured) on a miss. Concurrent misses for
+        the same key wait for the first one's result rather than building it
+        again.
+        """
+        cache = ThumbnailRadioSelect._render_cache
+        if key in cache:
+            metrics.incr("render_cache.hit", instance=self)
+            return cache[key]
+
+        metrics.incr("render_cache.miss", instance=self)
+
+        def fill():
+            if key not in cache:
+                cache[key] = self._get_shared(key, build, "shared_render_cache")
+            return cache[key]
+
+        return ThumbnailRadioSelect._render_flights.do(key, fill, instance=self)
+
+    def _get_shared(self, key, build, metric):
+        """
+        Return the value for a render cache `key` from the shared render
+        cache, calling `build` and storing its result on a miss. Without a
+        shared cache configured, just return build().
+        """
+        shared = get_shared_render_cache()
+        if shared is None:
+            return build()
+
+        cache, options = shared
+        shared_key = self.shared_render_cache_key(key)
+        result = cache.get(shared_key, version=options["version"])
+        if result is not None:
+            metrics.incr(f"{metric}.hit", instance=self)
+            return result
+
+        metrics.incr(f"{metric}.miss", instance=self)
+        return build_shared(cache, shared_key, build, options, instance=self)
+
+    def js_state_cache_key(self):
+        """
+        Return the render cache key for get_js_state(), or None if the
+        mappings are not hashable and the state cannot be cached.
+        """
+        key = self.render_cache_key(None, None)
+        if key is None:
+            return None
+        # The state also carries the widget's own size and attrs, which
+        # render() only sees through the template context.
+        key = (
+            "js_state",
+            self.thumbnail_size,
+            tuple(sorted(self.attrs.items())),
+            *key,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get_js_state(self):
+        """
+        Return the compact description of the widget that
+        ThumbnailRadioSelectAdapter sends to the page editor in place of
+        pre-rendered HTML. The admin JS builds the widget's DOM from it:
+
+            {
+                "size": thumbnail_size,
+                "attrs": widget attrs (e.g. {"class": "one-color-icons"}),
+                "placeholder": ..., "noResults": ...,  # translated strings
+                "urlPrefix": common prefix of every thumbnail URL,
+                "urls": [thumbnail URL without urlPrefix, ...],  # distinct
+                "fragments": [thumbnail HTML (templates, inline SVGs), ...],  # distinct
+                "images": [[width, height, placeholder color], ...],  # distinct
+                "options": [
+                    [value, label, depth, url index, fragment index, image index],
+                    [None, heading label, depth],
+                    ...
+                ],
+            }
+
+        Trailing option fields are left out when they are empty (depth 0, or
+        no URL, fragment or image metadata). States are cached like render()'s HTML, in the
+        per-process render cache and, if configured, the shared one.
+        """
+        key = self.js_state_cache_key()
+        if key is None:
+            state, size = self._build_js_state()
+        else:
+            state, size = self._get_cached(key, self._build_js_state)
+        metrics.observe("widget_state.bytes", size, instance=self)
+        return state
+
+    def _build_js_state(self):
+        """Return (get_js_state() state, its size as JSON in bytes)."""
+        with metrics.timer("widget_render", instance=self):
+            urls = {}  # {url: index}
+            fragments = {}  # {html: index}
+            images = {}  # {(width, height, placeholder): index}
+            options = []
+            thumbnail_mapping = self.thumbnail_mapping
+            template_mapping = self.thumbnail_template_mapping
+            html_mapping = self.thumbnail_html_mapping
+            metadata_mapping = self.thumbnail_metadata_mapping
+            for entry in self._iter_tree(None):
+                if entry[0] == "heading":
+                    _type, label, depth = entry
+                    options.append([None, force_str(label), depth])
+                    continue
+                _type, value, label, depth, _selected = entry
+                label = force_str(label)
+                # Storage URLs may be lazy (see archives.ZipArchiveStorage.url)
+                url = force_str(thumbnail_mapping.get(value, ""))
+                html = ""
+                if template_mapping:
+                    html = render_thumbnail_template(
+                        template_mapping.get(value), value, label, instance=self
+                    )
+                if not html and html_mapping:
+                    html = html_mapping.get(value, "")
+                image = None
+                metadata = metadata_mapping.get(value) if metadata_mapping else None
+                if metadata and metadata.get("width"):
+                    image = (
+                        metadata["width"],
+                        metadata["height"],
+                        metadata.get("placeholder"),
+                    )
+                row = [
+                    "" if value is None else force_str(value),
+                    label,
+                    depth,
+                    urls.setdefault(url, len(urls)) if url else None,
+                    fragments.setdefault(html, len(fragments)) if html else None,
+                    images.setdefault(image, len(images)) if image else None,
+                ]
+                # Drop empty trailing fields
+                while len(row) > 2 and row[-1] == (0 if len(row) == 3 else None):
+                    row.pop()
+                options.append(row)
+
+            url_prefix = posixpath.commonprefix(list(urls)) if len(urls) > 1 else ""
+            state = {
+                "size": self.thumbnail_size,
+                "attrs": dict(self.attrs),
+                "placeholder": gettext("Select an option..."),
+                "noResults": gettext("No matching options found."),
+                "urlPrefix": url_prefix,
+                "urls": [url[len(url_prefix) :] for url in urls],
+                "fragments": list(fragments),
+                "images": [list(image if image[2] else image[:2]) for image in images],
+                "options": options,
+            }
+            size = len(json.dumps(state, separators=(",", ":")).encode())
+        metrics.observe("widget_render.options", len(self.choices), instance=self)
+        return state, size
+
+    def _render_uncached(self, name, value, attrs, renderer):
+        """Render the widget HTML, recording its render time and option count."""
+        with metrics.timer("widget_render", instance=self):
+            if self._can_stream(renderer):
+                html = mark_safe("".join(self.iter_render(name, value, attrs)))
+            else:
+                html = super().render(name, value, attrs, renderer)
+        metrics.observe("widget_render.options", len(self.choices), instance=self)
+        return html
 
     def create_option(
         self, name, value, label, selected, index, subindex=None, attrs=None
@@ -274,33 +760,120 @@ class ThumbnailRadioSelect(RadioSelect):
         option["thumbnail_mask_url"] = (
             _css_escape_single_quoted(thumbnail_url) if thumbnail_url else ""
         )
+        metadata = self.thumbnail_metadata_mapping.get(value) or {}
+        option["thumbnail_width"] = metadata.get("width")
+        option["thumbnail_height"] = metadata.get("height")
+        option["thumbnail_placeholder"] = metadata.get("placeholder")
 
-        # Add rendered template HTML to the option context.
-        thumbnail_template_config = self.thumbnail_template_mapping.get(value)
-
-        if thumbnail_template_config:
-            # Handle both string (template path) and dict (template + context)
-            if isinstance(thumbnail_template_config, str):
-                template_path = thumbnail_template_config
-                context = {"value": value, "label": label}
-            elif isinstance(thumbnail_template_config, dict):
-                template_path = thumbnail_template_config.get("template")
-                context = thumbnail_template_config.get("context", {})
-                # Add value and label to context by default
-                context.setdefault("value", value)
-                context.setdefault("label", label)
-            else:
-                template_path = None
-                context = {}
-
-            if template_path:
-                try:
-                    rendered_html = render_to_string(template_path, context)
-                    option["thumbnail_template_html"] = rendered_html
-                except Exception:
-                    # Fallback gracefully if template rendering fails
-                    option["thumbnail_template_html"] = ""
-        else:
-            option["thumbnail_template_html"] = ""
+        # Add rendered template HTML (or fixed HTML, such as an inlined SVG) to
+        # the option context.
+        option["thumbnail_template_html"] = render_thumbnail_template(
+            self.thumbnail_template_mapping.get(value), value, label, instance=self
+        ) or self.thumbnail_html_mapping.get(value, "")
 
         return option
+
+
+class ThumbnailSearchSelect(Widget):
+    """
+    Widget for a ThumbnailChoiceBlock with a `choice_provider`.
+
+    Only the current selection is rendered, looked up through the provider.
+    The admin JS fetches other choices from the provider's search endpoint,
+    a page at a time, as the editor types. The value is kept in a hidden
+    input, which ThumbnailSearchSelectAdapter reads and sets.
+
+    Args:
+        provider: The ChoiceProvider to look up and search choices with
+        attrs: HTML attributes for the widget
+        thumbnail_size: The thumbnail size, in pixels
+        thumbnail_is_one_color: Tint thumbnails in the text color (see
+                                ThumbnailChoiceBlock)
+        allow_blank: Whether the editor may clear the selection
+    """
+
+    template_name = (
+        "wagtail_thumbnail_choice_block/widgets/thumbnail_search_select.html"
+    )
+
+    # The ThumbnailChoiceBlock this widget was created for, if any.
+    block = None
+
+    # The same stylesheet and script as ThumbnailRadioSelect
+    Media = ThumbnailRadioSelect.Media
+
+    def __init__(
+        self,
+        provider,
+        attrs=None,
+        thumbnail_size=None,
+        thumbnail_is_one_color=False,
+        allow_blank=True,
+    ):
+        super().__init__(attrs)
+        if thumbnail_size is None:
+            raise ValueError(
+                "thumbnail_size is required. Please provide a thumbnail size in pixels."
+            )
+        self.provider = provider
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_is_one_color = thumbnail_is_one_color
+        self.allow_blank = allow_blank
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        widget = context["widget"]
+        widget["thumbnail_size"] = self.thumbnail_size
+        widget["is_one_color"] = self.thumbnail_is_one_color
+        widget["allow_blank"] = self.allow_blank
+        widget["search_url"] = reverse(
+            "wagtail_thumbnail_choice_block:search", args=[self.provider.name]
+        )
+        widget["selected"] = None
+        if value not in (None, ""):
+            choice = self.provider.get(force_str(value))
+            if choice is not None:
+                widget["selected"] = dict(
+                    choice,
+                    thumbnail_mask_url=_css_escape_single_quoted(
+                        choice.get("thumbnail_url") or ""
+                    ),
+                )
+        return context
+
+    def render(self, name, value, attrs=None, renderer=None):
+        with metrics.timer("widget_render", instance=self):
+            html = super().render(name, value, attrs, renderer)
+        metrics.observe("widget_render.bytes", len(html.encode()), instance=self)
+        return html
+
+
+class ThumbnailRadioSelectAdapter(WidgetAdapter):
+    """
+    Telepath adapter that sends ThumbnailRadioSelect.get_js_state() to the
+    page editor instead of the widget's rendered HTML. The admin JS builds the
+    widget from it and hands it to Wagtail's RadioSelect widget, so values are
+    read and set exactly as for a plain RadioSelect.
+    """
+
+    js_constructor = "wagtail_thumbnail_choice_block.widgets.ThumbnailRadioSelect"
+
+    def js_args(self, widget):
+        return [widget.get_js_state()]
+
+
+register(ThumbnailRadioSelectAdapter(), ThumbnailRadioSelect)
+
+
+class ThumbnailSearchSelectAdapter(WidgetAdapter):
+    """
+    Telepath adapter for ThumbnailSearchSelect. The widget's HTML is sent as
+    for any widget; its admin JS definition starts the search once Telepath
+    has rendered the widget, and shows the selection again when the value is
+    set.
+    """
+
+    js_constructor = "wagtail_thumbnail_choice_block.widgets.ThumbnailSearchSelect"
+
+
+register(ThumbnailSearchSelectAdapter(), ThumbnailSearchSelect)